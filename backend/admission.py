@@ -0,0 +1,220 @@
+"""Admission control: bound the work a process lets through to MySQL.
+
+Every /api request belongs to a route class (cheap reads, default,
+expensive aggregates). A request runs only while the process is under
+``max_inflight`` and its class is under its own ``max_concurrent``.
+Otherwise it waits in a bounded queue for at most ``queue_timeout``
+seconds. A full queue or an expired wait gets an immediate 503 with
+Retry-After, rather than a slow request that holds a socket and later a
+connection.
+
+Freed slots go to waiters by class priority, then arrival, so cheap
+reads like /api/terms get through ahead of queued aggregates.
+
+The queue timeout is an event-loop timer. Most handlers are ``async def``
+and call MySQL synchronously, which blocks the loop, so a waiter can
+overstay ``queue_timeout`` by as long as the running handlers block it.
+The bound holds for handlers that run in the threadpool (plain ``def``,
+or ``run_in_threadpool``).
+"""
+
+import asyncio
+import itertools
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Sequence, Tuple
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+@dataclass
+class RouteClass:
+    name: str
+    # lower is served first
+    priority: int
+    max_concurrent: int
+    max_queue: int
+    queue_timeout: float
+
+
+@dataclass
+class _ClassState:
+    inflight: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    queued: int = 0
+    rejected_queue_full: int = 0
+    rejected_timeout: int = 0
+    wait_seconds: float = 0.0
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    route_class: RouteClass = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class Overloaded(Exception):
+    def __init__(self, reason: str):
+        super().__init__(reason)
+        self.reason = reason
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        classes: Sequence[RouteClass],
+        rules: Sequence[Tuple[str, str]],
+        max_inflight: int,
+        default_class: str = "default",
+    ):
+        self.classes = {c.name: c for c in classes}
+        # (path regex, class name), first match wins
+        self.rules = [(re.compile(pattern), name) for pattern, name in rules]
+        self.default_class = self.classes[default_class]
+        self.max_inflight = max_inflight
+        self.inflight = 0
+        self._state = {name: _ClassState() for name in self.classes}
+        self._waiters: List[_Waiter] = []
+        self._seq = itertools.count()
+
+    def classify(self, path: str) -> RouteClass:
+        for pattern, name in self.rules:
+            if pattern.match(path):
+                return self.classes[name]
+        return self.default_class
+
+    def _has_room(self, route_class: RouteClass) -> bool:
+        return (
+            self.inflight < self.max_inflight
+            and self._state[route_class.name].inflight < route_class.max_concurrent
+        )
+
+    def _admit(self, route_class: RouteClass) -> None:
+        self.inflight += 1
+        state = self._state[route_class.name]
+        state.inflight += 1
+        state.admitted += 1
+
+    async def acquire(self, route_class: RouteClass) -> None:
+        """Wait for a slot; raises Overloaded instead of waiting too long."""
+        state = self._state[route_class.name]
+        ahead = any(w.priority <= route_class.priority for w in self._waiters)
+        if not ahead and self._has_room(route_class):
+            self._admit(route_class)
+            return
+        if state.waiting >= route_class.max_queue:
+            state.rejected_queue_full += 1
+            raise Overloaded("queue_full")
+
+        waiter = _Waiter(
+            route_class.priority,
+            next(self._seq),
+            route_class,
+            asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        state.waiting += 1
+        state.queued += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(waiter.future, route_class.queue_timeout)
+        except asyncio.TimeoutError:
+            state.rejected_timeout += 1
+            raise Overloaded("timeout")
+        except BaseException:
+            # client went away; hand back a slot granted in the meantime
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(route_class)
+            raise
+        finally:
+            state.wait_seconds += time.monotonic() - started
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                state.waiting -= 1
+
+    def release(self, route_class: RouteClass) -> None:
+        self.inflight -= 1
+        self._state[route_class.name].inflight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        for waiter in sorted(self._waiters):
+            if self.inflight >= self.max_inflight:
+                return
+            if waiter.future.done() or not self._has_room(waiter.route_class):
+                continue
+            self._waiters.remove(waiter)
+            self._state[waiter.route_class.name].waiting -= 1
+            self._admit(waiter.route_class)
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        classes = {}
+        for name, state in self._state.items():
+            route_class = self.classes[name]
+            classes[name] = {
+                "priority": route_class.priority,
+                "max_concurrent": route_class.max_concurrent,
+                "max_queue": route_class.max_queue,
+                "inflight": state.inflight,
+                "waiting": state.waiting,
+                "admitted": state.admitted,
+                "queued": state.queued,
+                "rejected_queue_full": state.rejected_queue_full,
+                "rejected_timeout": state.rejected_timeout,
+                "avg_wait_ms": round(state.wait_seconds / state.queued * 1000, 1)
+                if state.queued
+                else 0.0,
+            }
+        return {"max_inflight": self.max_inflight, "inflight": self.inflight, "classes": classes}
+
+
+class AdmissionMiddleware:
+    """Runs /api requests through ``controller``; 503 + Retry-After when shed.
+
+    Paths in ``exempt`` (health checks, metrics) always go through.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        retry_after: int = 1,
+        exempt: Sequence[str] = (),
+    ):
+        self.app = app
+        self.controller = controller
+        self.retry_after = retry_after
+        self.exempt = set(exempt)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if (
+            scope["type"] != "http"
+            or not path.startswith("/api")
+            or path in self.exempt
+            or scope.get("method") == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.controller.classify(path)
+        try:
+            await self.controller.acquire(route_class)
+        except Overloaded as e:
+            response = JSONResponse(
+                {"detail": "Server is busy, please retry shortly", "reason": e.reason},
+                status_code=503,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(route_class)
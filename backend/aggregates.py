@@ -0,0 +1,155 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from singleflight import SingleFlight
+
+
+@dataclass
+class _Entry:
+    value: Any
+    computed_at: float
+    last_read: float = field(default_factory=time.monotonic)
+    dirty: bool = False
+
+
+class AggregateCache:
+    """Stale-while-revalidate cache for the home-page aggregates.
+
+    ``loaders`` maps a name to a blocking function of the entry's params.
+    The first read of a key computes it, coalesced through ``flights``.
+    After that, ``run()`` keeps it fresh in the background. It recomputes
+    entries every ``interval`` seconds, and shortly after ``mark_dirty()``
+    (debounced, so a burst of writes costs one recompute). Readers get the
+    last good value in the meantime.
+
+    A failed refresh keeps the previous value. Values older than
+    ``max_age`` are not served: the reader recomputes instead, which bounds
+    staleness if the refresher stalls. Keys nobody has read for
+    ``idle_expiry`` seconds are dropped.
+    """
+
+    def __init__(
+        self,
+        loaders: Dict[str, Callable[..., Any]],
+        flights: SingleFlight,
+        interval: float = 60.0,
+        max_age: float = 300.0,
+        debounce: float = 1.0,
+        idle_expiry: float = 3600.0,
+    ):
+        self.loaders = loaders
+        self.flights = flights
+        self.interval = interval
+        self.max_age = max_age
+        self.debounce = debounce
+        self.idle_expiry = idle_expiry
+        self._entries: Dict[Tuple[str, Hashable], _Entry] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._counters = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+        }
+
+    async def get(self, name: str, params: Tuple = ()) -> Any:
+        key = (name, params)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None:
+            entry.last_read = now
+            age = now - entry.computed_at
+            if age <= self.max_age:
+                if entry.dirty or age > self.interval:
+                    self._counters["stale_hits"] += 1
+                    self._signal()
+                else:
+                    self._counters["hits"] += 1
+                return entry.value
+            self._counters["expired"] += 1
+        else:
+            self._counters["misses"] += 1
+        return await self._refresh(key)
+
+    def mark_dirty(self, name: Optional[str] = None) -> None:
+        """Schedule a recompute of ``name`` (every aggregate when None).
+
+        Safe to call from worker threads as well as the event loop.
+        """
+        for (entry_name, _), entry in list(self._entries.items()):
+            if name is None or entry_name == name:
+                entry.dirty = True
+        self._signal()
+
+    def _signal(self) -> None:
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _refresh(self, key: Tuple[str, Hashable]) -> Any:
+        name, params = key
+        entry = self._entries.get(key)
+        if entry is not None:
+            # a write during the recompute must trigger another one
+            entry.dirty = False
+        started = time.monotonic()
+        try:
+            value = await self.flights.do(
+                (f"aggregate:{name}", *params), lambda: self.loaders[name](*params)
+            )
+        except Exception:
+            self._counters["refresh_errors"] += 1
+            if entry is not None:
+                entry.dirty = True
+            raise
+        self._counters["refreshes"] += 1
+        current = self._entries.get(key)
+        self._entries[key] = _Entry(
+            value=value,
+            computed_at=started,
+            last_read=current.last_read if current else time.monotonic(),
+            dirty=current.dirty if current else False,
+        )
+        return value
+
+    async def refresh_due(self) -> None:
+        """Recompute dirty and expired-interval entries; drop idle ones."""
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if now - entry.last_read > self.idle_expiry:
+                del self._entries[key]
+                continue
+            if entry.dirty or now - entry.computed_at > self.interval:
+                try:
+                    await self._refresh(key)
+                except Exception as e:
+                    # keep serving the last good value
+                    print(f"[ERROR] Failed to refresh {key[0]}{key[1]}: {e}")
+
+    async def run(self) -> None:
+        """Background loop; start it once per process from the app lifespan."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+                # let a burst of writes settle into one recompute
+                await asyncio.sleep(self.debounce)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.refresh_due()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        ages = [now - entry.computed_at for entry in self._entries.values()]
+        return {
+            **self._counters,
+            "entries": len(self._entries),
+            "dirty": sum(1 for entry in self._entries.values() if entry.dirty),
+            "oldest_age_seconds": round(max(ages), 1) if ages else None,
+        }
@@ -0,0 +1,301 @@
+"""Archival of closed terms out of the hot tables.
+
+A term's posts (found through Post -> Team -> Course.term_id) move, with
+their PostSkill, Comment and MatchRequest rows, into ``<Table>Archive``
+twins created with ``CREATE TABLE ... LIKE``. Match requests sent without
+a post belong to the term of the team they were sent to and move after the
+posts, in chunks of their own. Teams and memberships stay where they are,
+since they're small and profiles still list them. After the move, the home,
+search and popular-post aggregates only see current terms.
+
+Rows move in chunks of posts. Each chunk is one transaction, so a chunk is
+either in the live tables or in the archive, never both. The same code
+runs in reverse to restore a term. scripts/archive_term.py is the CLI;
+GET /api/users/{id}/history reads the archive.
+"""
+
+from typing import Dict, List, Optional, Sequence
+
+import user_activity
+import user_stats
+
+# dependency order: parents first when inserting, children first when deleting
+ARCHIVED_TABLES = ("Post", "PostSkill", "Comment", "MatchRequest")
+
+CREATE_ARCHIVED_TERM_SQL = """
+CREATE TABLE IF NOT EXISTS ArchivedTerm (
+    term_id        VARCHAR(32) PRIMARY KEY,
+    archived_at    TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    post_count     INT NOT NULL DEFAULT 0,
+    comment_count  INT NOT NULL DEFAULT 0,
+    request_count  INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (term_id) REFERENCES Term(term_id)
+)
+"""
+
+
+def archive_table(table: str) -> str:
+    return f"{table}Archive"
+
+
+def create_archive_tables(cursor) -> None:
+    for table in ARCHIVED_TABLES:
+        # LIKE copies columns and indexes but not foreign keys, so archived
+        # rows don't pin (or get pinned by) live ones
+        cursor.execute(f"CREATE TABLE IF NOT EXISTS {archive_table(table)} LIKE {table}")
+    cursor.execute(CREATE_ARCHIVED_TERM_SQL)
+
+
+def closed_terms(cursor) -> List[str]:
+    cursor.execute(
+        "SELECT term_id FROM Term WHERE end_date < CURDATE() ORDER BY end_date"
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def is_closed(cursor, term_id: str) -> bool:
+    cursor.execute(
+        "SELECT end_date < CURDATE() FROM Term WHERE term_id = %s", (term_id,)
+    )
+    row = cursor.fetchone()
+    if row is None:
+        raise ValueError(f"Unknown term: {term_id}")
+    return bool(row[0])
+
+
+def _post_chunk(cursor, post_table: str, term_id: str, after_id: int, size: int) -> List[int]:
+    cursor.execute(
+        f"""
+        SELECT p.post_id
+        FROM {post_table} p
+        JOIN Team t ON p.team_id = t.team_id
+        JOIN Course c ON t.course_id = c.course_id
+        WHERE c.term_id = %s AND p.post_id > %s
+        ORDER BY p.post_id
+        LIMIT %s
+        """,
+        (term_id, after_id, size),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _request_chunk(
+    cursor, request_table: str, term_id: str, after_id: int, size: int
+) -> List[int]:
+    """Requests of ``term_id`` with no post, found through the team they target."""
+    cursor.execute(
+        f"""
+        SELECT mr.request_id
+        FROM {request_table} mr
+        JOIN Team t ON mr.to_team_id = t.team_id
+        JOIN Course c ON t.course_id = c.course_id
+        WHERE c.term_id = %s AND mr.post_id IS NULL AND mr.request_id > %s
+        ORDER BY mr.request_id
+        LIMIT %s
+        """,
+        (term_id, after_id, size),
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _affected_users(cursor, source: Dict[str, str], placeholders: str, ids: Sequence[int]) -> set:
+    cursor.execute(
+        f"""
+        SELECT user_id FROM {source['Post']} WHERE post_id IN ({placeholders})
+        UNION
+        SELECT user_id FROM {source['Comment']} WHERE post_id IN ({placeholders})
+        UNION
+        SELECT from_user_id FROM {source['MatchRequest']} WHERE post_id IN ({placeholders})
+        """,
+        (*ids, *ids, *ids),
+    )
+    return {row[0] for row in cursor.fetchall()}
+
+
+def _move_chunk(cursor, ids: Sequence[int], restore: bool) -> Dict[str, int]:
+    """Copy one chunk to the other side and delete it from this one."""
+    if restore:
+        source = {t: archive_table(t) for t in ARCHIVED_TABLES}
+        target = {t: t for t in ARCHIVED_TABLES}
+    else:
+        source = {t: t for t in ARCHIVED_TABLES}
+        target = {t: archive_table(t) for t in ARCHIVED_TABLES}
+
+    placeholders = ", ".join(["%s"] * len(ids))
+    users = _affected_users(cursor, source, placeholders, ids)
+
+    # every archived table carries post_id, so one filter selects the chunk
+    where = f"post_id IN ({placeholders})"
+    moved = {}
+    for table in ARCHIVED_TABLES:
+        cursor.execute(
+            f"INSERT INTO {target[table]} SELECT * FROM {source[table]} WHERE {where}",
+            tuple(ids),
+        )
+        moved[table] = cursor.rowcount
+    if not restore:
+        cursor.execute(f"DELETE FROM UserPostActivity WHERE {where}", tuple(ids))
+    for table in reversed(ARCHIVED_TABLES):
+        cursor.execute(f"DELETE FROM {source[table]} WHERE {where}", tuple(ids))
+
+    # counters and feeds only describe live data
+    for user_id in sorted(users):
+        user_stats.rebuild(cursor, user_id)
+        if restore:
+            user_activity.rebuild(cursor, user_id)
+    return moved
+
+
+def _move_request_chunk(cursor, ids: Sequence[int], restore: bool) -> int:
+    """Move one chunk of post-less match requests; returns the rows moved."""
+    source, target = "MatchRequest", archive_table("MatchRequest")
+    if restore:
+        source, target = target, source
+
+    where = f"request_id IN ({', '.join(['%s'] * len(ids))})"
+    cursor.execute(f"SELECT DISTINCT from_user_id FROM {source} WHERE {where}", tuple(ids))
+    users = [row[0] for row in cursor.fetchall()]
+    cursor.execute(f"INSERT INTO {target} SELECT * FROM {source} WHERE {where}", tuple(ids))
+    moved = cursor.rowcount
+    cursor.execute(f"DELETE FROM {source} WHERE {where}", tuple(ids))
+
+    for user_id in sorted(users):
+        user_stats.rebuild(cursor, user_id)
+    return moved
+
+
+def move_term(
+    conn,
+    term_id: str,
+    restore: bool = False,
+    chunk_size: int = 500,
+    progress=None,
+) -> Dict[str, int]:
+    """Archive (or restore) every post of ``term_id``, and the match requests
+    sent to its teams without a post, one transaction per chunk.
+
+    Safe to re-run after an interruption: finished chunks are no longer on
+    the source side, so the next run carries on with what is left.
+    """
+    cursor = conn.cursor()
+    totals = {table: 0 for table in ARCHIVED_TABLES}
+    try:
+        # Comment.parent_comment_id points within the same post, so a chunk
+        # always carries whole threads; the checks would only trip on the
+        # order rows are deleted in.
+        cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 0")
+        post_table = archive_table("Post") if restore else "Post"
+        last_id = -1
+        while True:
+            ids = _post_chunk(cursor, post_table, term_id, last_id, chunk_size)
+            if not ids:
+                break
+            moved = _move_chunk(cursor, ids, restore)
+            conn.commit()
+            for table, count in moved.items():
+                totals[table] += count
+            last_id = ids[-1]
+            if progress is not None:
+                progress(totals)
+
+        request_table = archive_table("MatchRequest") if restore else "MatchRequest"
+        last_id = -1
+        while True:
+            ids = _request_chunk(cursor, request_table, term_id, last_id, chunk_size)
+            if not ids:
+                break
+            totals["MatchRequest"] += _move_request_chunk(cursor, ids, restore)
+            conn.commit()
+            last_id = ids[-1]
+            if progress is not None:
+                progress(totals)
+
+        if restore:
+            cursor.execute("DELETE FROM ArchivedTerm WHERE term_id = %s", (term_id,))
+        else:
+            cursor.execute(
+                """
+                INSERT INTO ArchivedTerm (term_id, post_count, comment_count, request_count)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE
+                    archived_at = NOW(),
+                    post_count = post_count + VALUES(post_count),
+                    comment_count = comment_count + VALUES(comment_count),
+                    request_count = request_count + VALUES(request_count)
+                """,
+                (term_id, totals["Post"], totals["Comment"], totals["MatchRequest"]),
+            )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("SET SESSION FOREIGN_KEY_CHECKS = 1")
+        cursor.close()
+    return totals
+
+
+def archived_terms(cursor) -> List[tuple]:
+    cursor.execute(
+        """
+        SELECT a.term_id, tr.name, a.archived_at, a.post_count, a.comment_count, a.request_count
+        FROM ArchivedTerm a
+        JOIN Term tr ON a.term_id = tr.term_id
+        ORDER BY tr.end_date
+        """
+    )
+    return cursor.fetchall()
+
+
+HISTORY_POSTS_SQL = """
+    SELECT
+        p.post_id,
+        p.title,
+        p.content_preview,
+        p.created_at,
+        t.team_id,
+        t.team_name,
+        c.course_id,
+        c.subject,
+        c.number,
+        c.title AS course_title,
+        tr.term_id,
+        tr.name AS term_name
+    FROM PostArchive p
+    LEFT JOIN Team t ON p.team_id = t.team_id
+    LEFT JOIN Course c ON t.course_id = c.course_id
+    LEFT JOIN Term tr ON c.term_id = tr.term_id
+    WHERE p.user_id = %s
+"""
+
+HISTORY_REQUESTS_SQL = """
+    SELECT
+        mr.request_id,
+        mr.post_id,
+        mr.status,
+        mr.message,
+        mr.created_at,
+        t.team_id,
+        t.team_name,
+        c.course_id,
+        c.subject,
+        c.number,
+        tr.term_id,
+        tr.name AS term_name
+    FROM MatchRequestArchive mr
+    LEFT JOIN Team t ON mr.to_team_id = t.team_id
+    LEFT JOIN Course c ON t.course_id = c.course_id
+    LEFT JOIN Term tr ON c.term_id = tr.term_id
+    WHERE mr.from_user_id = %s
+"""
+
+
+def history_queries(term_id: Optional[str]):
+    """(posts_sql, requests_sql, extra params) for a user's archived history."""
+    term_filter = " AND c.term_id = %s" if term_id else ""
+    params = (term_id,) if term_id else ()
+    return (
+        HISTORY_POSTS_SQL + term_filter + " ORDER BY p.created_at DESC",
+        HISTORY_REQUESTS_SQL + term_filter + " ORDER BY mr.created_at DESC",
+        params,
+    )
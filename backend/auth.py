@@ -0,0 +1,171 @@
+"""Signed session tokens and the cached identity behind them.
+
+Tokens are JWTs (HS256, JWT_SECRET from config.py) carrying the user id, so
+a request is authenticated by checking the signature: no DB read. The
+AuthUser record itself (name, avatar) comes from ``user_cache``, a small
+TTL cache that update_profile invalidates.
+
+With no JWT_SECRET configured (see config.py), tokens are neither issued
+nor accepted: login and register answer 503 and every request is
+anonymous.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import time
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from config import (
+    AUTH_USER_CACHE_SIZE,
+    AUTH_USER_CACHE_TTL,
+    JWT_ALGORITHM,
+    JWT_EXPIRATION_HOURS,
+    JWT_SECRET,
+)
+
+# user id of the verified bearer token for the current request, if any
+current_user_id: ContextVar[Optional[int]] = ContextVar("current_user_id", default=None)
+
+_HEADER = {"alg": "HS256", "typ": "JWT"}
+
+if JWT_ALGORITHM != "HS256":
+    raise ValueError(f"Unsupported JWT_ALGORITHM {JWT_ALGORITHM!r}; only HS256 is implemented")
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _sign(signing_input: str) -> str:
+    digest = hmac.new(JWT_SECRET.encode(), signing_input.encode("ascii"), hashlib.sha256).digest()
+    return _b64encode(digest)
+
+
+def require_signing_key() -> None:
+    """503 unless tokens can be issued; call before any other work."""
+    if JWT_SECRET is None:
+        raise HTTPException(status_code=503, detail="Sign-in is disabled: JWT_SECRET is not set")
+
+
+def issue_token(user_id: int, now: Optional[float] = None) -> str:
+    if JWT_SECRET is None:
+        raise RuntimeError("JWT_SECRET is not set")
+    issued_at = int(now if now is not None else time.time())
+    claims = {
+        "sub": str(user_id),
+        "iat": issued_at,
+        "exp": issued_at + JWT_EXPIRATION_HOURS * 3600,
+    }
+    signing_input = ".".join(
+        _b64encode(json.dumps(part, separators=(",", ":")).encode())
+        for part in (_HEADER, claims)
+    )
+    return f"{signing_input}.{_sign(signing_input)}"
+
+
+def verify_token(token: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """The token's claims, or None if it is malformed, forged or expired."""
+    if JWT_SECRET is None:
+        return None
+    try:
+        header_b64, claims_b64, signature = token.split(".")
+        if not hmac.compare_digest(signature, _sign(f"{header_b64}.{claims_b64}")):
+            return None
+        header = json.loads(_b64decode(header_b64))
+        claims = json.loads(_b64decode(claims_b64))
+        if header.get("alg") != "HS256":
+            return None
+        if int(claims["exp"]) <= (now if now is not None else time.time()):
+            return None
+        claims["user_id"] = int(claims["sub"])
+    except (ValueError, KeyError, TypeError):
+        return None
+    return claims
+
+
+class AuthMiddleware:
+    """Sets ``current_user_id`` from an ``Authorization: Bearer`` token.
+
+    Lenient: a missing, expired or pre-JWT token leaves it None and the
+    request goes on, since endpoints still accept an explicit user_id.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api"):
+            await self.app(scope, receive, send)
+            return
+
+        user_id = None
+        authorization = Headers(scope=scope).get("authorization", "")
+        scheme, _, token = authorization.partition(" ")
+        if scheme.lower() == "bearer" and token:
+            claims = verify_token(token.strip())
+            if claims is not None:
+                user_id = claims["user_id"]
+
+        reset = current_user_id.set(user_id)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_user_id.reset(reset)
+
+
+class UserCache:
+    """LRU of AuthUser records by user id, each kept for ``ttl`` seconds.
+
+    Only touched from the event loop, so no locking. ``invalidate`` after a
+    profile write; the TTL bounds staleness for writes made elsewhere.
+    """
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[int, tuple]" = OrderedDict()
+        self._counters = {"hits": 0, "misses": 0, "invalidations": 0}
+
+    def get(self, user_id: int, load: Callable[[int], Any]) -> Any:
+        """Cached record for ``user_id``, calling ``load(user_id)`` on a miss.
+
+        ``load`` returns None for unknown users; that isn't cached.
+        """
+        entry = self._entries.get(user_id)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(user_id)
+            self._counters["hits"] += 1
+            return entry[0]
+        self._counters["misses"] += 1
+        value = load(user_id)
+        if value is not None:
+            self.put(user_id, value)
+        return value
+
+    def put(self, user_id: int, value: Any) -> None:
+        self._entries[user_id] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._counters["invalidations"] += 1
+        self._entries.pop(user_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._counters, "entries": len(self._entries)}
+
+
+user_cache = UserCache(AUTH_USER_CACHE_TTL, AUTH_USER_CACHE_SIZE)
@@ -0,0 +1,120 @@
+"""In-memory course catalog: courses, sections and a course search index.
+
+Courses and sections only change when a term's catalog is imported, but
+course search runs on every keystroke. ``CourseCatalog`` holds both tables
+and answers GET /api/courses/search and /api/courses/{id}/sections without
+a query. main.py keeps one in an AggregateCache, loaded at startup
+(warmup.py) and reloaded every CATALOG_REFRESH_INTERVAL seconds.
+
+Search matches and ranks like the SQL it replaces: case-insensitive
+substring match on the code ("CS 411"), title, subject or number, then
+exact code, code prefix, exact title, title match, exact subject, exact
+number, then subject and number order.
+"""
+
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+COURSES_SQL = """
+    SELECT
+        c.course_id,
+        c.term_id,
+        c.subject,
+        c.number,
+        c.title,
+        c.credits,
+        CONCAT(c.subject, ' ', c.number) AS course_code
+    FROM Course c
+"""
+
+SECTIONS_SQL = """
+    SELECT
+        s.crn,
+        s.instructor,
+        s.location,
+        s.delivery_mode,
+        s.meeting_time,
+        s.course_id
+    FROM Section s
+    ORDER BY s.crn ASC
+"""
+
+
+def _fold(value: Any) -> str:
+    return str(value or "").casefold()
+
+
+class _Entry:
+    __slots__ = ("code", "title", "subject", "number", "order", "row")
+
+    def __init__(self, row: Dict[str, Any]):
+        self.code = _fold(row.get("course_code"))
+        self.title = _fold(row.get("title"))
+        self.subject = _fold(row.get("subject"))
+        self.number = _fold(row.get("number"))
+        self.order = (self.subject, self.number)
+        self.row = row
+
+    def matches(self, needle: str) -> bool:
+        return (
+            needle in self.code
+            or needle in self.title
+            or needle in self.subject
+            or needle in self.number
+        )
+
+    def rank(self, needle: str) -> Tuple[int, Tuple[str, str]]:
+        if self.code == needle:
+            rank = 1
+        elif self.code.startswith(needle):
+            rank = 2
+        elif self.title == needle:
+            rank = 3
+        elif needle in self.title:
+            rank = 4
+        elif self.subject == needle:
+            rank = 5
+        elif self.number == needle:
+            rank = 6
+        else:
+            rank = 7
+        return rank, self.order
+
+
+class CourseCatalog:
+    def __init__(self, courses: List[Dict[str, Any]], sections: List[Dict[str, Any]]):
+        entries = sorted((_Entry(row) for row in courses), key=lambda e: e.order)
+        self._all = entries
+        self._by_term: Dict[str, List[_Entry]] = defaultdict(list)
+        for entry in entries:
+            self._by_term[entry.row["term_id"]].append(entry)
+        self._sections: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in sections:
+            self._sections[row["course_id"]].append(row)
+
+    @classmethod
+    def load(cls, cursor) -> "CourseCatalog":
+        cursor.execute(COURSES_SQL)
+        courses = cursor.fetchall()
+        cursor.execute(SECTIONS_SQL)
+        return cls(courses, cursor.fetchall())
+
+    def search(self, term_id: Optional[str], q: Optional[str], limit: int) -> List[Dict[str, Any]]:
+        entries = self._by_term.get(term_id, []) if term_id else self._all
+        limit = max(limit, 0)
+        needle = (q or "").strip().casefold()
+        if not needle:
+            return [entry.row for entry in entries[:limit]]
+        matches = [entry for entry in entries if entry.matches(needle)]
+        matches.sort(key=lambda entry: entry.rank(needle))
+        return [entry.row for entry in matches[:limit]]
+
+    def sections(self, course_id: str) -> List[Dict[str, Any]]:
+        return self._sections.get(course_id, [])
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "courses": len(self._all),
+            "terms": len(self._by_term),
+            "sections": sum(len(rows) for rows in self._sections.values()),
+        }
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -19,6 +20,12 @@ DB_CONFIG = {
     "collation": "utf8mb4_unicode_ci",
 }
 
+# connections kept open per process (mysql-connector allows at most 32);
+# requests beyond that get a 503 (see ADMISSION_* below). The server holds
+# WEB_WORKERS * DB_POOL_SIZE connections in all.
+DB_POOL_SIZE = int(get_env_or_default("DB_POOL_SIZE", "10"))
+
+
 API_HOST = os.getenv("API_HOST", "0.0.0.0")
 API_PORT = int(os.getenv("API_PORT", 8000))
 
@@ -29,12 +36,118 @@ CORS_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
-JWT_SECRET = os.getenv("JWT_SECRET", "your-secret-key-change-in-production")
+# Session tokens (auth.py) are signed with JWT_SECRET. Without it no token
+# is issued or accepted, since the old default key is public and anyone
+# could forge tokens with it. JWT_ALLOW_DEV_SECRET=true signs with that key
+# anyway, for local development only.
+JWT_DEV_SECRET = "your-secret-key-change-in-production"
+JWT_ALLOW_DEV_SECRET = get_env_or_default("JWT_ALLOW_DEV_SECRET", "false").lower() == "true"
+JWT_SECRET = os.getenv("JWT_SECRET") or (JWT_DEV_SECRET if JWT_ALLOW_DEV_SECRET else None)
 JWT_ALGORITHM = "HS256"
 JWT_EXPIRATION_HOURS = 24
 
+# AuthUser records behind /api/auth/me (auth.py); update_profile invalidates
+AUTH_USER_CACHE_TTL = float(get_env_or_default("AUTH_USER_CACHE_TTL", "300"))
+AUTH_USER_CACHE_SIZE = int(get_env_or_default("AUTH_USER_CACHE_SIZE", "10000"))
+
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 
+# rows fetched per round trip when a list endpoint is called with ?stream=
+STREAM_BATCH_SIZE = int(get_env_or_default("STREAM_BATCH_SIZE", "500"))
+
+# response compression (compression.py); brotli is used when installed
+COMPRESSION_MIN_SIZE = int(get_env_or_default("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(get_env_or_default("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(get_env_or_default("BROTLI_QUALITY", "4"))
+
+# serve the built frontend (npm run build) from the API process
+SERVE_FRONTEND = get_env_or_default("SERVE_FRONTEND", "false").lower() == "true"
+FRONTEND_DIST_DIR = get_env_or_default(
+    "FRONTEND_DIST_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "frontend", "dist"),
+)
+
+
+# home-page aggregates (aggregates.py): background refresh every INTERVAL
+# seconds and shortly after writes; never served older than MAX_AGE seconds.
+# CACHE_ROWS rows are kept per term, larger ?limit= values are computed live.
+AGGREGATE_REFRESH_INTERVAL = float(get_env_or_default("AGGREGATE_REFRESH_INTERVAL", "60"))
+AGGREGATE_MAX_AGE = float(get_env_or_default("AGGREGATE_MAX_AGE", "300"))
+AGGREGATE_CACHE_ROWS = int(get_env_or_default("AGGREGATE_CACHE_ROWS", "50"))
+
+# most ids one call to the batch endpoints (GET /api/posts?ids=...) may ask for
+BATCH_MAX_IDS = int(get_env_or_default("BATCH_MAX_IDS", "100"))
+
+# admission control (admission.py): at most MAX_INFLIGHT /api requests run
+# per process; the rest wait up to QUEUE_TIMEOUT seconds in a bounded queue
+# per route class, then get 503 + Retry-After. Cheap reads are admitted
+# first; expensive aggregates are also capped on their own.
+ADMISSION_MAX_INFLIGHT = int(get_env_or_default("ADMISSION_MAX_INFLIGHT", str(DB_POOL_SIZE)))
+ADMISSION_QUEUE_TIMEOUT = float(get_env_or_default("ADMISSION_QUEUE_TIMEOUT", "2.0"))
+ADMISSION_CHEAP_QUEUE = int(get_env_or_default("ADMISSION_CHEAP_QUEUE", "200"))
+ADMISSION_DEFAULT_QUEUE = int(get_env_or_default("ADMISSION_DEFAULT_QUEUE", "50"))
+ADMISSION_EXPENSIVE_CONCURRENCY = int(
+    get_env_or_default("ADMISSION_EXPENSIVE_CONCURRENCY", str(max(1, ADMISSION_MAX_INFLIGHT // 2)))
+)
+ADMISSION_EXPENSIVE_QUEUE = int(get_env_or_default("ADMISSION_EXPENSIVE_QUEUE", "20"))
+ADMISSION_RETRY_AFTER = int(get_env_or_default("ADMISSION_RETRY_AFTER", "1"))
+
+# course catalog and search index held in memory (catalog.py); reloaded
+# every REFRESH_INTERVAL seconds, never served older than MAX_AGE
+CATALOG_REFRESH_INTERVAL = float(get_env_or_default("CATALOG_REFRESH_INTERVAL", "600"))
+CATALOG_MAX_AGE = float(get_env_or_default("CATALOG_MAX_AGE", "86400"))
+
+# startup warmup (warmup.py): failed steps are retried this often
+WARMUP_RETRY_INTERVAL = float(get_env_or_default("WARMUP_RETRY_INTERVAL", "5"))
+STORED_PROCEDURES_SQL = get_env_or_default(
+    "STORED_PROCEDURES_SQL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "doc", "src", "stored_procedures.sql"),
+)
+
+# readiness (health.py): one DB ping per process every INTERVAL seconds;
+# /api/ready turns 503 after FAILURE_THRESHOLD failed pings in a row
+HEALTH_PROBE_INTERVAL = float(get_env_or_default("HEALTH_PROBE_INTERVAL", "5"))
+HEALTH_PROBE_TIMEOUT = float(get_env_or_default("HEALTH_PROBE_TIMEOUT", "2"))
+HEALTH_FAILURE_THRESHOLD = int(get_env_or_default("HEALTH_FAILURE_THRESHOLD", "2"))
+
+# per-client rate limits (ratelimit.py), "<requests per second>,<burst>".
+# Buckets are per process unless RATE_LIMIT_REDIS_URL points at a Redis
+# shared by the workers (needs the redis package).
+def _rate_policy(env_key, default_value):
+    rate, burst = get_env_or_default(env_key, default_value).split(",")
+    return float(rate), int(burst)
+
+
+RATE_LIMIT_ENABLED = get_env_or_default("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_REDIS_URL = get_env_or_default("RATE_LIMIT_REDIS_URL", "")
+RATE_LIMIT_DEFAULT = _rate_policy("RATE_LIMIT_DEFAULT", "20,100")
+# typeahead: course and post search
+RATE_LIMIT_SEARCH = _rate_policy("RATE_LIMIT_SEARCH", "5,20")
+# join requests, posts and comments
+RATE_LIMIT_WRITE = _rate_policy("RATE_LIMIT_WRITE", "0.2,10")
+RATE_LIMIT_AUTH = _rate_policy("RATE_LIMIT_AUTH", "0.1,5")
+# Anonymous clients are keyed by IP. Behind a proxy (the Vite dev server,
+# nginx) every peer is the proxy, so the client is read from
+# X-Forwarded-For, but only when the peer is one of these addresses or
+# networks. Otherwise anyone could pick their own bucket. A proxy missing
+# from this list puts all of its anonymous users in one shared bucket.
+RATE_LIMIT_TRUSTED_PROXIES = [
+    proxy.strip()
+    for proxy in get_env_or_default("RATE_LIMIT_TRUSTED_PROXIES", "127.0.0.1,::1").split(",")
+    if proxy.strip()
+]
+
+# worker processes for `python main.py` and gunicorn.conf.py. Each worker
+# has its own pool and caches. A write evicts the writer's AuthUser entry and
+# marks the popular posts and courses for recompute in every worker (served
+# stale until it finishes, see aggregates.py). Workers reach each other
+# through Unix datagram sockets in INVALIDATION_BUS_DIR ("none" disables).
+WEB_WORKERS = int(get_env_or_default("WEB_WORKERS", "1"))
+INVALIDATION_BUS_DIR = get_env_or_default(
+    "INVALIDATION_BUS_DIR",
+    os.path.join(tempfile.gettempdir(), f"teamup-bus-{API_PORT}"),
+)
+
 
 def get_db_config():
     return DB_CONFIG.copy()
@@ -48,6 +161,14 @@ def validate_config():
             "[INFO] Using default values for: " + ", ".join(missing) +
             ". To customize, create backend/.env."
         )
+    if not os.getenv("JWT_SECRET"):
+        if JWT_ALLOW_DEV_SECRET:
+            print("[WARN] JWT_SECRET is not set; session tokens are signed with the public development key.")
+        else:
+            print(
+                "[ERROR] JWT_SECRET is not set; sign-in is disabled. Set it in backend/.env "
+                "(or JWT_ALLOW_DEV_SECRET=true for local development)."
+            )
     if not DB_CONFIG.get("host") or not DB_CONFIG.get("database"):
         raise ValueError("Database configuration is incomplete.")
     return True
@@ -0,0 +1,20 @@
+# Multi-worker deployment (Linux/macOS), from backend/:
+#     WEB_WORKERS=4 gunicorn -c gunicorn.conf.py
+#
+# gunicorn supervises the uvicorn workers and restarts any that die.
+# `python main.py` with WEB_WORKERS > 1 runs the same layout under uvicorn's
+# own process manager, which also works where gunicorn doesn't (Windows).
+from config import API_HOST, API_PORT, WEB_WORKERS
+
+wsgi_app = "main:app"
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = f"{API_HOST}:{API_PORT}"
+workers = WEB_WORKERS
+
+# not preloaded: every worker builds its own app, connection pool and
+# caches after the fork, and binds its own invalidation socket
+preload_app = False
+
+# aggregate loaders and warmup can take a while on a cold database
+timeout = 60
+graceful_timeout = 30
@@ -0,0 +1,120 @@
+"""Liveness and cached readiness.
+
+Liveness (/api/live) only says the process is serving requests. Readiness
+(/api/ready) reports the last result of ``ReadinessProbe``, a background
+loop. Every ``interval`` seconds it pings MySQL over one dedicated
+connection and records the latency and the pool state. Probes from the
+orchestrator never touch the database, however often they come. A
+struggling database sees one ping per interval per process, not one per
+probe.
+Readiness also waits for the startup warmup (warmup.py) when one is given.
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+
+class ReadinessProbe:
+    """The database counts as up from the first successful check until
+    ``failure_threshold`` consecutive failures, and again on a success.
+    Ready means the database is up and ``warmup`` (if any) has finished.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        pool_state: Callable[[], Dict[str, Any]],
+        interval: float = 5.0,
+        timeout: float = 2.0,
+        failure_threshold: int = 2,
+        warmup=None,
+    ):
+        self.connect = connect
+        self.pool_state = pool_state
+        self.interval = interval
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.warmup = warmup
+        self.db_ok = False
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.consecutive_failures = 0
+        self._checked_at: Optional[float] = None
+        self._conn = None
+
+    def _ping(self) -> float:
+        """Round trip of ``SELECT 1`` in ms; (re)connects when needed."""
+        if self._conn is None or not self._conn.is_connected():
+            self._conn = self.connect()
+        started = time.perf_counter()
+        cursor = self._conn.cursor()
+        try:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+        finally:
+            cursor.close()
+        return (time.perf_counter() - started) * 1000
+
+    def _drop_connection(self) -> None:
+        conn, self._conn = self._conn, None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
+    async def check(self) -> None:
+        try:
+            latency = await asyncio.wait_for(run_in_threadpool(self._ping), self.timeout)
+        except Exception as e:
+            self._failed(str(e) or type(e).__name__)
+            if isinstance(e, asyncio.TimeoutError):
+                # the ping is still running on that connection: leave it to
+                # its thread and connect afresh next time
+                self._conn = None
+            else:
+                await run_in_threadpool(self._drop_connection)
+        else:
+            self.consecutive_failures = 0
+            self.last_error = None
+            self.latency_ms = round(latency, 2)
+            self.db_ok = True
+        self._checked_at = time.monotonic()
+
+    def _failed(self, error: str) -> None:
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.consecutive_failures >= self.failure_threshold or self._checked_at is None:
+            self.db_ok = False
+
+    @property
+    def ready(self) -> bool:
+        return self.db_ok and (self.warmup is None or self.warmup.done)
+
+    async def run(self) -> None:
+        """Background loop; start it once per process from the app lifespan."""
+        try:
+            while True:
+                await self.check()
+                await asyncio.sleep(self.interval)
+        finally:
+            self._drop_connection()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "database": {
+                "connected": self.consecutive_failures == 0 and self._checked_at is not None,
+                "latency_ms": self.latency_ms,
+                "consecutive_failures": self.consecutive_failures,
+                "last_error": self.last_error,
+                "checked_seconds_ago": round(time.monotonic() - self._checked_at, 1)
+                if self._checked_at is not None
+                else None,
+            },
+            "pool": self.pool_state(),
+            "warmup": self.warmup.status() if self.warmup is not None else None,
+        }
@@ -0,0 +1,276 @@
+"""Batched loaders for posts, teams, users and their relations.
+
+Every function takes a dictionary cursor and a list of ids and runs one
+``IN (...)`` query, returning rows keyed by id. Callers therefore issue a
+fixed number of queries however many entities they resolve. Ids with no
+row are simply absent from the result.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+from skills import skill_dictionary
+
+# relations a post can be expanded with via ?include=
+POST_INCLUDES = ("skills", "comments", "team", "members")
+DEFAULT_POST_INCLUDES = ("skills",)
+
+
+def _placeholders(ids: Sequence[Any]) -> str:
+    return ", ".join(["%s"] * len(ids))
+
+
+def load_posts(cursor, post_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    if not post_ids:
+        return {}
+    ids = _placeholders(post_ids)
+    query = f"""
+    SELECT
+        p.post_id,
+        p.title,
+        p.content,
+        p.created_at,
+        p.team_id,
+        t.target_size AS target_team_size,
+        u.display_name AS author_name,
+        u.user_id AS author_id,
+        c.title AS course_title,
+        c.course_id,
+        c.subject AS course_subject,
+        c.number AS course_number,
+        s.crn AS section_code,
+        COUNT(DISTINCT mr.request_id) AS request_count,
+        0 AS view_count,
+        t.status
+    FROM Post p
+    LEFT JOIN User u ON p.user_id = u.user_id
+    LEFT JOIN Team t ON p.team_id = t.team_id
+    LEFT JOIN Course c ON t.course_id = c.course_id
+    LEFT JOIN Section s ON t.section_id = s.crn AND t.course_id = c.course_id
+    LEFT JOIN MatchRequest mr ON p.post_id = mr.post_id
+    WHERE p.post_id IN ({ids})
+    GROUP BY p.post_id, p.title, p.content, p.created_at, p.team_id, t.target_size,
+             u.display_name, u.user_id, c.title, c.course_id, c.subject, c.number, s.crn,
+             t.status
+    """
+    cursor.execute(query, tuple(post_ids))
+    return {row["post_id"]: row for row in cursor.fetchall()}
+
+
+def load_post_skills(cursor, post_ids: Sequence[int]) -> Dict[int, List[str]]:
+    skill_ids = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return skill_ids
+    ids = _placeholders(post_ids)
+    query = f"""
+    SELECT ps.post_id, ps.skill_id
+    FROM PostSkill ps
+    WHERE ps.post_id IN ({ids})
+    """
+    cursor.execute(query, tuple(post_ids))
+    rows = cursor.fetchall()
+    for row in rows:
+        skill_ids[row["post_id"]].append(row["skill_id"])
+    # names come from the in-memory Skill dictionary (skills.py), with one
+    # query at most for ids it hasn't loaded
+    skill_dictionary.resolve(cursor, [row["skill_id"] for row in rows])
+    return {post_id: skill_dictionary.names(cursor, i) for post_id, i in skill_ids.items()}
+
+
+def load_post_comments(cursor, post_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Visible comments per post, oldest first (as GET .../comments)."""
+    comments = {post_id: [] for post_id in post_ids}
+    if not post_ids:
+        return comments
+    ids = _placeholders(post_ids)
+    query = f"""
+    SELECT
+        c.comment_id,
+        c.post_id,
+        c.user_id,
+        c.parent_comment_id,
+        c.content,
+        c.created_at,
+        u.display_name AS author_name,
+        u.avatar_url
+    FROM Comment c
+    LEFT JOIN User u ON c.user_id = u.user_id
+    WHERE c.post_id IN ({ids}) AND (c.status IS NULL OR c.status != 'deleted')
+    ORDER BY c.post_id, c.created_at ASC, c.comment_id ASC
+    """
+    cursor.execute(query, tuple(post_ids))
+    for row in cursor.fetchall():
+        comments[row["post_id"]].append(row)
+    return comments
+
+
+def load_teams(cursor, team_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    if not team_ids:
+        return {}
+    ids = _placeholders(team_ids)
+    query = f"""
+    SELECT
+        t.team_id,
+        t.team_name,
+        t.target_size,
+        t.status,
+        t.course_id,
+        t.section_id,
+        c.subject,
+        c.number,
+        c.title AS course_title,
+        s.crn AS section_code,
+        s.instructor,
+        s.meeting_time,
+        s.location,
+        s.delivery_mode,
+        COUNT(DISTINCT tm.user_id) AS member_count
+    FROM Team t
+    JOIN Course c ON t.course_id = c.course_id
+    LEFT JOIN Section s ON t.section_id = s.crn AND t.course_id = s.course_id
+    LEFT JOIN TeamMember tm ON t.team_id = tm.team_id
+    WHERE t.team_id IN ({ids})
+    GROUP BY t.team_id, t.team_name, t.target_size, t.status, t.course_id, t.section_id,
+             c.subject, c.number, c.title, s.crn, s.instructor, s.meeting_time, s.location, s.delivery_mode
+    """
+    cursor.execute(query, tuple(team_ids))
+    teams = {}
+    for row in cursor.fetchall():
+        row["current_size"] = row.get("member_count", 0)
+        teams[row["team_id"]] = row
+    return teams
+
+
+def load_team_members(cursor, team_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    """Members per team in joining order (as GET /api/teams/{id})."""
+    members = {team_id: [] for team_id in team_ids}
+    if not team_ids:
+        return members
+    ids = _placeholders(team_ids)
+    query = f"""
+    SELECT
+        tm.team_id,
+        tm.user_id,
+        tm.role,
+        tm.joined_at,
+        u.display_name,
+        u.netid,
+        u.email,
+        u.avatar_url,
+        u.major,
+        u.grade,
+        u.score
+    FROM TeamMember tm
+    JOIN User u ON tm.user_id = u.user_id
+    WHERE tm.team_id IN ({ids})
+    ORDER BY tm.team_id, tm.joined_at ASC
+    """
+    cursor.execute(query, tuple(team_ids))
+    for row in cursor.fetchall():
+        members[row.pop("team_id")].append(row)
+    return members
+
+
+def load_users(cursor, user_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Public profile fields (no email or phone number)."""
+    if not user_ids:
+        return {}
+    ids = _placeholders(user_ids)
+    query = f"""
+    SELECT user_id, display_name, netid, avatar_url, bio, major, grade, score
+    FROM User
+    WHERE user_id IN ({ids})
+    """
+    cursor.execute(query, tuple(user_ids))
+    return {row["user_id"]: row for row in cursor.fetchall()}
+
+
+def load_user_skills(cursor, user_ids: Sequence[int]) -> Dict[int, List[Dict[str, Any]]]:
+    skills = {user_id: [] for user_id in user_ids}
+    if not user_ids:
+        return skills
+    ids = _placeholders(user_ids)
+    query = f"""
+    SELECT us.user_id, us.skill_id, us.level
+    FROM UserSkill us
+    WHERE us.user_id IN ({ids})
+    """
+    cursor.execute(query, tuple(user_ids))
+    # sorted by category and name; per user, since the sort is stable
+    for row in skill_dictionary.expand(cursor, cursor.fetchall()):
+        skills[row.pop("user_id")].append(row)
+    return skills
+
+
+def parse_ids(ids: str, limit: int) -> List[int]:
+    """Validate a comma-separated ``ids`` value: distinct ints, at most ``limit``."""
+    parsed = []
+    for part in ids.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            value = int(part)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid id '{part}'")
+        if value not in parsed:
+            parsed.append(value)
+    if not parsed:
+        raise HTTPException(status_code=400, detail="ids must not be empty")
+    if len(parsed) > limit:
+        raise HTTPException(status_code=400, detail=f"At most {limit} ids per request")
+    return parsed
+
+
+def keyed(name: str, ids: Sequence[int], found: Dict[int, Any]) -> Dict[str, Any]:
+    """Batch response body: found entities by id, in request order, plus the
+    ids that don't exist (which don't fail the batch)."""
+    return {
+        name: {str(i): found[i] for i in ids if i in found},
+        "missing": [i for i in ids if i not in found],
+    }
+
+
+def parse_include(include: Optional[str]) -> List[str]:
+    """Validate a comma-separated ``include`` value; None means the defaults."""
+    if include is None:
+        return list(DEFAULT_POST_INCLUDES)
+    names = []
+    for name in include.split(","):
+        name = name.strip()
+        if not name or name in names:
+            continue
+        if name not in POST_INCLUDES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown include '{name}'. Allowed: {', '.join(POST_INCLUDES)}",
+            )
+        names.append(name)
+    return names
+
+
+def expand_posts(cursor, posts: Dict[int, Dict[str, Any]], include: Sequence[str]) -> None:
+    """Attach the ``include``d relations to ``posts`` in place.
+
+    One query per relation, whatever the number of posts. ``team`` is None
+    for posts without a team; ``members`` is then an empty list.
+    """
+    post_ids = list(posts)
+    if "skills" in include:
+        for post_id, names in load_post_skills(cursor, post_ids).items():
+            posts[post_id]["skills"] = names
+    if "comments" in include:
+        for post_id, rows in load_post_comments(cursor, post_ids).items():
+            posts[post_id]["comments"] = rows
+
+    if "team" in include or "members" in include:
+        team_ids = sorted({p["team_id"] for p in posts.values() if p.get("team_id") is not None})
+        teams = load_teams(cursor, team_ids) if "team" in include else {}
+        members = load_team_members(cursor, team_ids) if "members" in include else {}
+        for post in posts.values():
+            team_id = post.get("team_id")
+            if "team" in include:
+                post["team"] = teams.get(team_id)
+            if "members" in include:
+                post["members"] = members.get(team_id, [])
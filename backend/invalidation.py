@@ -0,0 +1,115 @@
+"""Cache invalidation across the worker processes of one host.
+
+Each worker's caches (home aggregates, AuthUser records) live in its own
+memory. ``publish(topic, key)`` runs this worker's handlers for the topic
+at once, then sends the message as a datagram to every other worker. Each
+worker binds a Unix socket ``<pid>.sock`` in a shared directory, and its
+event loop runs the same handlers when a message arrives, usually well
+under a millisecond later.
+
+Delivery is best effort. A worker whose socket buffer is full misses the
+message, and its TTLs and refresh intervals bound how stale it can get.
+Sockets left behind by dead workers are removed on first failed send.
+Where AF_UNIX is unavailable (Windows), or with no directory configured,
+the bus only runs local handlers, which is all a single process needs.
+"""
+
+import asyncio
+import json
+import os
+import socket
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+# datagrams must fit in one socket buffer slot; keys are ids and names
+MAX_MESSAGE_BYTES = 1024
+
+
+class InvalidationBus:
+    def __init__(self, directory: Optional[str]):
+        self.directory = directory
+        self._handlers: Dict[str, List[Callable[[Any], None]]] = defaultdict(list)
+        self._sock: Optional[socket.socket] = None
+        self._path: Optional[str] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counters = {"published": 0, "sent": 0, "received": 0, "dropped": 0, "stale_peers": 0}
+
+    def subscribe(self, topic: str, handler: Callable[[Any], None]) -> None:
+        self._handlers[topic].append(handler)
+
+    def _dispatch(self, topic: str, key: Any) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(key)
+            except Exception as e:
+                print(f"[ERROR] Invalidation handler for {topic} failed: {e}")
+
+    def start(self) -> None:
+        """Bind this worker's socket; call from the app lifespan."""
+        if not self.directory or not hasattr(socket, "AF_UNIX"):
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        self._path = os.path.join(self.directory, f"{os.getpid()}.sock")
+        if os.path.exists(self._path):
+            os.unlink(self._path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(self._path)
+        sock.setblocking(False)
+        self._sock = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+
+    def close(self) -> None:
+        if self._sock is None:
+            return
+        self._loop.remove_reader(self._sock.fileno())
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data = self._sock.recv(MAX_MESSAGE_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                message = json.loads(data)
+            except ValueError:
+                continue
+            self._counters["received"] += 1
+            self._dispatch(message.get("topic"), message.get("key"))
+
+    def publish(self, topic: str, key: Any = None) -> None:
+        """Invalidate ``topic`` (optionally one ``key``) in every worker."""
+        self._counters["published"] += 1
+        self._dispatch(topic, key)
+        if self._sock is None:
+            return
+        data = json.dumps({"topic": topic, "key": key, "pid": os.getpid()}).encode()
+        own = os.path.basename(self._path)
+        for name in os.listdir(self.directory):
+            if name == own or not name.endswith(".sock"):
+                continue
+            peer = os.path.join(self.directory, name)
+            try:
+                self._sock.sendto(data, peer)
+                self._counters["sent"] += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # the worker behind it is gone
+                self._counters["stale_peers"] += 1
+                try:
+                    os.unlink(peer)
+                except OSError:
+                    pass
+            except (BlockingIOError, OSError):
+                self._counters["dropped"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        peers = None
+        if self._sock is not None:
+            peers = sum(1 for name in os.listdir(self.directory) if name.endswith(".sock")) - 1
+        return {**self._counters, "enabled": self._sock is not None, "peers": peers}
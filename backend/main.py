@@ -1,12 +1,77 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import APIRouter, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, EmailStr
 from typing import Optional, List, Dict, Any
-import uuid
+import os
+import sys
+import asyncio
+import threading
+from contextlib import asynccontextmanager
 from datetime import datetime
 import mysql.connector
 from mysql.connector import Error
-from config import DB_CONFIG, CORS_ORIGINS, API_HOST, API_PORT, validate_config
+from mysql.connector.pooling import MySQLConnectionPool
+from config import (
+    DB_CONFIG,
+    DB_POOL_SIZE,
+    CORS_ORIGINS,
+    API_HOST,
+    API_PORT,
+    COMPRESSION_MIN_SIZE,
+    GZIP_LEVEL,
+    BROTLI_QUALITY,
+    SERVE_FRONTEND,
+    FRONTEND_DIST_DIR,
+    AGGREGATE_REFRESH_INTERVAL,
+    AGGREGATE_MAX_AGE,
+    AGGREGATE_CACHE_ROWS,
+    BATCH_MAX_IDS,
+    ADMISSION_MAX_INFLIGHT,
+    ADMISSION_QUEUE_TIMEOUT,
+    ADMISSION_CHEAP_QUEUE,
+    ADMISSION_DEFAULT_QUEUE,
+    ADMISSION_EXPENSIVE_CONCURRENCY,
+    ADMISSION_EXPENSIVE_QUEUE,
+    ADMISSION_RETRY_AFTER,
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_REDIS_URL,
+    RATE_LIMIT_DEFAULT,
+    RATE_LIMIT_SEARCH,
+    RATE_LIMIT_WRITE,
+    RATE_LIMIT_AUTH,
+    RATE_LIMIT_TRUSTED_PROXIES,
+    HEALTH_PROBE_INTERVAL,
+    HEALTH_PROBE_TIMEOUT,
+    HEALTH_FAILURE_THRESHOLD,
+    CATALOG_REFRESH_INTERVAL,
+    CATALOG_MAX_AGE,
+    WARMUP_RETRY_INTERVAL,
+    STORED_PROCEDURES_SQL,
+    WEB_WORKERS,
+    INVALIDATION_BUS_DIR,
+    validate_config,
+)
+from compression import CompressionMiddleware
+from static_assets import PrecompressedStaticFiles
+from serialization import ContentNegotiationMiddleware, FastJSONResponse
+from streaming import iter_rows, parse_stream_format, stream_rows
+from projection import FieldSet
+from previews import make_preview
+import user_stats
+import user_activity
+import archive
+import hydration
+from singleflight import SingleFlight, coalesced_response
+from aggregates import AggregateCache
+from admission import AdmissionController, AdmissionMiddleware, RouteClass
+from ratelimit import Policy, RateLimiter, RateLimitMiddleware, make_store
+from auth import AuthMiddleware, current_user_id, issue_token, require_signing_key, user_cache
+from health import ReadinessProbe
+from catalog import CourseCatalog
+from skills import skill_dictionary
+from warmup import Warmup, expected_procedures, missing_procedures
+from starlette.concurrency import run_in_threadpool
+from invalidation import InvalidationBus
 
 # checking the configuration: if the error msg is printed, check the requirement.txt, config.py
 try:
@@ -14,25 +79,127 @@ try:
 except ValueError as e:
     print(f"Warning: {e}")
 
-app = FastAPI(title="TeamUp UIUC API", version="1.0.0")
 
-# CORS middleware, connect frontend and backend, config.py
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # per worker process: the pool, caches and this socket are never shared
+    invalidation.start()
+    tasks = [
+        asyncio.create_task(home_aggregates.run()),
+        asyncio.create_task(catalog_cache.run()),
+        asyncio.create_task(readiness.run()),
+        # in the background, so /api/live answers while the caches fill
+        asyncio.create_task(warmup.run()),
+    ]
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        invalidation.close()
+
+
+router = APIRouter(default_response_class=FastJSONResponse)
+
+# cross-worker cache invalidation (invalidation.py): writes publish a topic,
+# each cache subscribes its invalidate function to one
+invalidation = InvalidationBus(None if INVALIDATION_BUS_DIR == "none" else INVALIDATION_BUS_DIR)
+invalidation.subscribe("auth_user", user_cache.invalidate)
+
+# health probes and metrics: never shed or rate-limited
+UNTHROTTLED_PATHS = ["/api/live", "/api/ready", "/api/health", "/api/metrics"]
+
+admission = AdmissionController(
+    classes=[
+        RouteClass("cheap", 0, ADMISSION_MAX_INFLIGHT, ADMISSION_CHEAP_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+        RouteClass("default", 1, ADMISSION_MAX_INFLIGHT, ADMISSION_DEFAULT_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+        RouteClass(
+            "expensive",
+            2,
+            ADMISSION_EXPENSIVE_CONCURRENCY,
+            ADMISSION_EXPENSIVE_QUEUE,
+            ADMISSION_QUEUE_TIMEOUT,
+        ),
+    ],
+    rules=[
+        # cached or single-row reads
+        (r"/api/terms$", "cheap"),
+        (r"/api/auth/", "cheap"),
+        (r"/api/teams/\d+$", "cheap"),
+        (r"/api/courses/[^/]+/sections$", "cheap"),
+        # aggregates and full-text searches
+        (r"/api/home$", "expensive"),
+        (r"/api/(posts|courses)/(popular|search)$", "expensive"),
+        (r"/api/users/\d+/history$", "expensive"),
+    ],
+    max_inflight=ADMISSION_MAX_INFLIGHT,
 )
 
+write_policy = Policy("write", *RATE_LIMIT_WRITE)
+rate_limiter = RateLimiter(
+    make_store(RATE_LIMIT_REDIS_URL),
+    rules=[
+        ("POST", r"/api/auth/(login|register)$", Policy("auth", *RATE_LIMIT_AUTH)),
+        ("GET", r"/api/(courses|posts)/search$", Policy("search", *RATE_LIMIT_SEARCH)),
+        ("POST", r"/api/requests$", write_policy),
+        ("POST", r"/api/posts$", write_policy),
+        ("POST", r"/api/posts/\d+/comments$", write_policy),
+    ],
+    default=Policy("default", *RATE_LIMIT_DEFAULT),
+)
+
+
+# connect with MySQL: pooled connections, created on first use.
+# conn.close() hands a pooled connection back (its session is reset).
+_db_pool = None
+_db_pool_lock = threading.Lock()
+
+
+def _pooled_connection():
+    global _db_pool
+    if _db_pool is None:
+        with _db_pool_lock:
+            if _db_pool is None:
+                _db_pool = MySQLConnectionPool(
+                    pool_name="teamup",
+                    pool_size=DB_POOL_SIZE,
+                    autocommit=False,
+                    **DB_CONFIG,
+                )
+                return _db_pool.get_connection()
+    try:
+        return _db_pool.get_connection()
+    except mysql.connector.errors.PoolError:
+        # pool exhausted (admission control keeps requests under the pool
+        # size, so this is background work on top): fail fast rather than
+        # open more connections to a database that is already saturated
+        raise HTTPException(
+            status_code=503,
+            detail="Database is busy, please retry shortly",
+            headers={"Retry-After": str(ADMISSION_RETRY_AFTER)},
+        )
+
+
+def _pool_state():
+    if _db_pool is None:
+        return {"size": DB_POOL_SIZE, "created": False}
+    # mysql-connector keeps idle connections in a queue; no public accessor
+    idle = _db_pool._cnx_queue.qsize()
+    return {"size": DB_POOL_SIZE, "created": True, "idle": idle, "in_use": DB_POOL_SIZE - idle}
+
+
+def _probe_connection():
+    conn = mysql.connector.connect(connection_timeout=int(HEALTH_PROBE_TIMEOUT) or 1, **DB_CONFIG)
+    conn.autocommit = True
+    return conn
+
 
-# connect with MySQL
 def get_db_connection():
     try:
-        conn = mysql.connector.connect(**DB_CONFIG)
+        conn = _pooled_connection()
         if not conn.is_connected():
             raise Error("Connection established but not connected")
-        conn.autocommit = False
         return conn
     except Error as e:
         print(f"Error connecting to MySQL: {e}")
@@ -242,13 +409,22 @@ def get_mock_profile_payload() -> Dict[str, Any]:
     }
 
 
-@app.get("/")
+@router.get("/api")
 def root():
     return {"message": "TeamUp UIUC API", "version": "1.0.0"}
 
 
-@app.get("/api/terms")
+@router.get("/api/terms")
 async def get_terms():
+    try:
+        terms = await home_aggregates.get("terms")
+        # print(f"[DEBUG] Returning {len(terms)} terms to client")
+        return FastJSONResponse(terms)
+    except Error as e:
+        print(f"[ERROR] Database error: {e}")
+
+
+def load_terms():
     conn = None
     try:
         conn = get_db_connection()
@@ -261,25 +437,7 @@ async def get_terms():
         """
 
         cursor.execute(query)
-        terms = cursor.fetchall()
-
-        for term in terms:
-            if term["start_date"]:
-                if isinstance(term["start_date"], str):
-                    pass
-                else:
-                    term["start_date"] = term["start_date"].isoformat()
-            if term["end_date"]:
-                if isinstance(term["end_date"], str):
-                    pass
-                else:
-                    term["end_date"] = term["end_date"].isoformat()
-
-        # print(f"[DEBUG] Returning {len(terms)} terms to client")
-        return terms
-
-    except Error as e:
-        print(f"[ERROR] Database error: {e}")
+        return cursor.fetchall()
     finally:
         if conn and conn.is_connected():
             cursor.close()
@@ -308,8 +466,9 @@ def _fetch_user_by_identifier(cursor, identifier: str):
 
 
 # register new user
-@app.post("/api/auth/register", response_model=AuthResponse)
+@router.post("/api/auth/register", response_model=AuthResponse)
 async def register_user(payload: RegisterRequest):
+    require_signing_key()
     if not payload.email:
         raise HTTPException(status_code=400, detail="Email is required")
     if not payload.display_name:
@@ -377,8 +536,8 @@ async def register_user(payload: RegisterRequest):
             netid=payload.netid,
             avatar_url=None,
         )
-        token = f"mock-token-{next_id}-{uuid.uuid4().hex[:6]}"
-        return AuthResponse(token=token, user=user)
+        user_cache.put(next_id, user)
+        return AuthResponse(token=issue_token(next_id), user=user)
     except Error as e:
         if conn:
             conn.rollback()
@@ -390,8 +549,9 @@ async def register_user(payload: RegisterRequest):
 
 
 # user login
-@app.post("/api/auth/login", response_model=AuthResponse)
+@router.post("/api/auth/login", response_model=AuthResponse)
 async def login_user(payload: LoginRequest):
+    require_signing_key()
     identifier = (payload.identifier or "").strip()
     if not identifier:
         raise HTTPException(status_code=400, detail="Email or NetID is required")
@@ -405,8 +565,8 @@ async def login_user(payload: LoginRequest):
             raise HTTPException(status_code=401, detail="Account not found")
 
         user = _build_auth_user(user_row)
-        token = f"mock-token-{user.user_id}-{uuid.uuid4().hex[:6]}"
-        return AuthResponse(token=token, user=user)
+        user_cache.put(user.user_id, user)
+        return AuthResponse(token=issue_token(user.user_id), user=user)
     except Error as e:
         raise HTTPException(status_code=500, detail="Failed to login")
     finally:
@@ -416,37 +576,58 @@ async def login_user(payload: LoginRequest):
 
 
 # user logout
-@app.post("/api/auth/logout")
+@router.post("/api/auth/logout")
 async def logout_user():
     return {"message": "Logged out"}
 
 
+def _load_auth_user(user_id: int) -> Optional[AuthUser]:
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(
+            """
+            SELECT user_id, display_name, email, netid, avatar_url
+            FROM User
+            WHERE user_id = %s
+            LIMIT 1
+            """,
+            (user_id,),
+        )
+        row = cursor.fetchone()
+        return _build_auth_user(row) if row else None
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
+
 # user profile: get the user's information
-@app.get("/api/auth/me", response_model=AuthUser)
+@router.get("/api/auth/me", response_model=AuthUser)
 async def get_current_user(
     user_id: Optional[int] = None, identifier: Optional[str] = None
 ):
+    # a verified bearer token identifies the caller without any parameter
+    user_id = user_id or current_user_id.get()
     if not user_id and not identifier:
         raise HTTPException(status_code=400, detail="user_id or identifier is required")
 
+    if user_id:
+        try:
+            user = user_cache.get(user_id, _load_auth_user)
+        except Error as e:
+            print(f"[ERROR] Failed to fetch current user: {e}")
+            raise HTTPException(status_code=500)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        return user
+
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        if user_id:
-            cursor.execute(
-                """
-                SELECT user_id, display_name, email, netid, avatar_url
-                FROM User
-                WHERE user_id = %s
-                LIMIT 1
-                """,
-                (user_id,),
-            )
-            row = cursor.fetchone()
-        else:
-            row = _fetch_user_by_identifier(cursor, identifier.strip())
-
+        row = _fetch_user_by_identifier(cursor, identifier.strip())
         if not row:
             raise HTTPException(status_code=404, detail="User not found")
         return _build_auth_user(row)
@@ -460,7 +641,7 @@ async def get_current_user(
 
 
 # user profile: establish all the information of the user
-@app.get("/api/profile/me")
+@router.get("/api/profile/me")
 async def get_profile(user_id: Optional[int] = None):
     payload = get_mock_profile_payload()
     user_payload = AuthUser(**MOCK_USER).dict()
@@ -557,58 +738,30 @@ async def get_profile(user_id: Optional[int] = None):
             LEFT JOIN Course c ON t.course_id = c.course_id
             WHERE mr.from_user_id = %s
             ORDER BY mr.created_at DESC
-            LIMIT 20
+            LIMIT 5
         """,
             (user_id,),
         )
         requests_data = cursor.fetchall()
 
-        open_requests = sum(1 for r in requests_data if r.get("status") == "pending")
-        successful_matches = sum(
-            1 for r in requests_data if r.get("status") == "accepted"
-        )
-
-        team_course_ids = set(
-            team.get("course_id") for team in teams_data if team.get("course_id")
-        )
-
-        cursor.execute(
-            """
-            SELECT DISTINCT c.course_id
-            FROM Post p
-            JOIN Team t ON p.team_id = t.team_id
-            JOIN Course c ON t.course_id = c.course_id
-            WHERE p.user_id = %s
-            """,
-            (user_id,),
-        )
-        post_courses = cursor.fetchall()
-        post_course_ids = set(
-            item["course_id"] for item in post_courses if item.get("course_id")
-        )
-
-        unique_courses = len(team_course_ids.union(post_course_ids))
-
-        cursor.execute(
-            "SELECT COUNT(*) as post_count FROM Post WHERE user_id = %s", (user_id,)
-        )
-        user_post_count = cursor.fetchone().get("post_count", 0)
+        # counters maintained by the write handlers, see user_stats.py
+        stats = user_stats.load(conn, cursor, user_id)
 
         payload["stats"] = [
             {
                 "label": "Active Courses",
-                "value": unique_courses,
-                "trend": f"{len(teams_data)} teams, {user_post_count} posts",
+                "value": stats["active_courses"],
+                "trend": f"{stats['team_count']} teams, {stats['post_count']} posts",
             },
             {
                 "label": "Open Requests",
-                "value": open_requests,
-                "trend": f"{len(requests_data)} total requests",
+                "value": stats["open_requests"],
+                "trend": f"{stats['total_requests']} total requests",
             },
             {
                 "label": "Successful Matches",
-                "value": successful_matches,
-                "trend": f"{len(requests_data)} total requests",
+                "value": stats["successful_matches"],
+                "trend": f"{stats['total_requests']} total requests",
             },
             {
                 "label": "Collaboration Score",
@@ -619,15 +772,14 @@ async def get_profile(user_id: Optional[int] = None):
 
         cursor.execute(
             """
-            SELECT s.name, s.category, us.level
+            SELECT us.skill_id, us.level
             FROM UserSkill us
-            JOIN Skill s ON us.skill_id = s.skill_id
             WHERE us.user_id = %s
-            ORDER BY s.category, s.name
         """,
             (user_id,),
         )
-        skills_data = cursor.fetchall()
+        # names and categories from the in-memory Skill dictionary
+        skills_data = skill_dictionary.expand(cursor, cursor.fetchall())
 
         core_skills = [
             s["name"]
@@ -684,7 +836,7 @@ async def get_profile(user_id: Optional[int] = None):
 
 
 # update function in the user profile page
-@app.put("/api/profile/me")
+@router.put("/api/profile/me")
 async def update_profile(user_id: int, payload: ProfileUpdate):
     conn = None
     try:
@@ -803,6 +955,7 @@ async def update_profile(user_id: int, payload: ProfileUpdate):
         update_query = f"UPDATE User SET {', '.join(update_fields)} WHERE user_id = %s"
         cursor.execute(update_query, tuple(update_values))
         conn.commit()
+        invalidation.publish("auth_user", user_id)
 
         cursor.execute(
             """
@@ -815,10 +968,29 @@ async def update_profile(user_id: int, payload: ProfileUpdate):
         )
         updated_user = cursor.fetchone()
 
-        if updated_user and updated_user.get("score") is not None:
-            updated_user["score"] = float(updated_user["score"])
+        return FastJSONResponse(
+            {"message": "Profile updated successfully", "user": updated_user}
+        )
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
+
 
-        return {"message": "Profile updated successfully", "user": updated_user}
+# batch lookups: ?ids=1,2,3 -> {"<kind>": {"1": {...}, ...}, "missing": [...]}
+@router.get("/api/users")
+async def get_users_by_ids(ids: str):
+    user_ids = hydration.parse_ids(ids, BATCH_MAX_IDS)
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+
+        users = hydration.load_users(cursor, user_ids)
+        for user_id, skills in hydration.load_user_skills(cursor, list(users)).items():
+            users[user_id]["skills"] = skills
+
+        return FastJSONResponse(hydration.keyed("users", user_ids, users))
     finally:
         if conn and conn.is_connected():
             cursor.close()
@@ -826,7 +998,7 @@ async def update_profile(user_id: int, payload: ProfileUpdate):
 
 
 # user's teams page
-@app.get("/api/users/{user_id}/teams")
+@router.get("/api/users/{user_id}/teams")
 async def get_user_teams(user_id: int):
     # Get all teams a user has joined using stored procedure
     conn = None
@@ -846,7 +1018,7 @@ async def get_user_teams(user_id: int):
         for team in teams:
             team["current_size"] = team.get("member_count", 0)
 
-        return teams
+        return FastJSONResponse(teams)
 
     finally:
         if conn and conn.is_connected():
@@ -854,191 +1026,172 @@ async def get_user_teams(user_id: int):
             conn.close()
 
 
-# get the user's team information -> My teams page backend(team members etc.)
-@app.get("/api/teams/{team_id}")
-async def get_team_details(team_id: int):
+@router.get("/api/teams")
+async def get_teams_by_ids(ids: str):
+    team_ids = hydration.parse_ids(ids, BATCH_MAX_IDS)
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query = """
-        SELECT 
-            t.team_id,
-            t.team_name,
-            t.target_size,
-            t.status,
-            t.course_id,
-            t.section_id,
-            c.subject,
-            c.number,
-            c.title AS course_title,
-            s.crn AS section_code,
-            s.instructor,
-            s.meeting_time,
-            s.location,
-            s.delivery_mode,
-            COUNT(DISTINCT tm.user_id) AS member_count
-        FROM Team t
-        JOIN Course c ON t.course_id = c.course_id
-        LEFT JOIN Section s ON t.section_id = s.crn AND t.course_id = s.course_id
-        LEFT JOIN TeamMember tm ON t.team_id = tm.team_id
-        WHERE t.team_id = %s
-        GROUP BY t.team_id, t.team_name, t.target_size, t.status, t.course_id, t.section_id,
-                 c.subject, c.number, c.title, s.crn, s.instructor, s.meeting_time, s.location, s.delivery_mode
-        """
-        cursor.execute(query, (team_id,))
-        team = cursor.fetchone()
+        teams = hydration.load_teams(cursor, team_ids)
+        for team_id, members in hydration.load_team_members(cursor, list(teams)).items():
+            teams[team_id]["members"] = members
 
-        if not team:
-            raise HTTPException(status_code=404, detail="Team not found")
+        return FastJSONResponse(hydration.keyed("teams", team_ids, teams))
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
 
-        team["current_size"] = team.get("member_count", 0)
 
-        members_query = """
-        SELECT 
-            tm.user_id,
-            tm.role,
-            tm.joined_at,
-            u.display_name,
-            u.netid,
-            u.email,
-            u.avatar_url,
-            u.major,
-            u.grade,
-            u.score
-        FROM TeamMember tm
-        JOIN User u ON tm.user_id = u.user_id
-        WHERE tm.team_id = %s
-        ORDER BY tm.joined_at ASC
-        """
-        cursor.execute(members_query, (team_id,))
-        members = cursor.fetchall()
+# get the user's team information -> My teams page backend(team members etc.)
+@router.get("/api/teams/{team_id}")
+async def get_team_details(team_id: int):
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
 
-        for member in members:
-            if member.get("joined_at"):
-                member["joined_at"] = member["joined_at"].isoformat()
+        team = hydration.load_teams(cursor, [team_id]).get(team_id)
+        if not team:
+            raise HTTPException(status_code=404, detail="Team not found")
 
-        team["members"] = members
+        team["members"] = hydration.load_team_members(cursor, [team_id])[team_id]
 
-        return team
+        return FastJSONResponse(team)
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
 
 
+USER_POST_FIELDS = FieldSet(
+    {
+        "post_id": "a.post_id",
+        "title": "p.title",
+        "content": "p.content",
+        # activity ts is the post's created_at (see user_activity.py)
+        "created_at": "a.ts",
+        "display_name": "u.display_name",
+        "user_id": "p.user_id",
+        "team_id": "p.team_id",
+        "interaction_type": "a.interaction_type",
+        "course_id": "t.course_id",
+        "team_name": "t.team_name",
+        "subject": "c.subject",
+        "number": "c.number",
+        "course_title": "c.title",
+        "term_id": "c.term_id",
+        "section_code": "s.crn",
+    },
+    # keyset cursor
+    always=("post_id", "created_at", "interaction_type"),
+)
+
+
 # Get all posts a user has written or commented
-@app.get("/api/users/{user_id}/posts")
-async def get_user_posts(user_id: int, limit: int = 50):
-    # Get all posts a user has written or commented on using stored procedure
+@router.get("/api/users/{user_id}/posts")
+async def get_user_posts(
+    user_id: int,
+    limit: int = 50,
+    fields: Optional[str] = None,
+    after: Optional[str] = None,
+):
+    # One range scan of UserPostActivity.idx_activity_feed, newest first.
+    # When the page is full, X-Next-Cursor holds the ?after= value for the
+    # next one.
+    names = USER_POST_FIELDS.parse(fields)
+    select = USER_POST_FIELDS.select_list(names)
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        # Call stored procedure: sp_get_user_post_interactions
-        cursor.callproc("sp_get_user_post_interactions", [user_id, limit])
-
-        # Get results from stored procedure
-        posts = []
-        for result in cursor.stored_results():
-            rows = result.fetchall()
-            # First result set is the posts
-            if not posts:
-                posts = rows
-
-        # Extract additional info from posts if needed
-        # The stored procedure returns interaction_type, but we need to match original format
-        for post in posts:
-            # Get course and section info if team_id exists
-            if post.get("team_id"):
-                cursor.execute(
-                    """
-                    SELECT t.course_id, t.team_name, c.subject, c.number, c.title AS course_title, c.term_id, s.crn AS section_code
-                    FROM Team t
-                    LEFT JOIN Course c ON t.course_id = c.course_id
-                    LEFT JOIN Section s ON t.section_id = s.crn AND t.course_id = c.course_id
-                    WHERE t.team_id = %s
-                """,
-                    (post["team_id"],),
-                )
-                team_info = cursor.fetchone()
-                if team_info:
-                    post.update(team_info)
+        query = f"""
+            SELECT {select}
+            FROM UserPostActivity a
+            JOIN Post p ON a.post_id = p.post_id
+            JOIN User u ON p.user_id = u.user_id
+            LEFT JOIN Team t ON p.team_id = t.team_id
+            LEFT JOIN Course c ON t.course_id = c.course_id
+            LEFT JOIN Section s ON t.section_id = s.crn AND t.course_id = s.course_id
+            WHERE a.user_id = %s
+        """
+        params = [user_id]
+        if after:
+            query += " AND (a.ts, a.post_id, a.interaction_type) < (%s, %s, %s)"
+            params.extend(user_activity.decode_cursor(after))
+        query += """
+            ORDER BY a.ts DESC, a.post_id DESC, a.interaction_type DESC
+            LIMIT %s
+        """
+        params.append(limit)
+        cursor.execute(query, tuple(params))
+        posts = cursor.fetchall()
 
-        return posts
+        headers = {}
+        if posts and len(posts) == limit:
+            headers["X-Next-Cursor"] = user_activity.encode_cursor(posts[-1])
+        return FastJSONResponse(
+            list(USER_POST_FIELDS.project(posts, names)), headers=headers
+        )
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
 
 
-# My course page backend
-@app.get("/api/users/{user_id}/courses")
-async def get_user_courses(user_id: int):
+# Posts and requests from archived terms (read-only, see archive.py)
+@router.get("/api/users/{user_id}/history")
+async def get_user_history(user_id: int, term_id: Optional[str] = None):
+    posts_query, requests_query, term_params = archive.history_queries(term_id)
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query_teams = """
-            SELECT DISTINCT
-                c.course_id,
-                c.term_id,
-                c.subject,
-                c.number,
-                c.title AS course_title,
-                c.credits,
-                t.team_id,
-                t.team_name,
-                tm.role,
-                tm.joined_at
-            FROM TeamMember tm
-            JOIN Team t ON tm.team_id = t.team_id
-            JOIN Course c ON t.course_id = c.course_id
-            WHERE tm.user_id = %s
-        """
+        cursor.execute(posts_query, (user_id, *term_params))
+        posts = cursor.fetchall()
+        cursor.execute(requests_query, (user_id, *term_params))
+        requests = cursor.fetchall()
 
-        cursor.execute(query_teams, (user_id,))
-        team_courses = cursor.fetchall()
+        return FastJSONResponse({"posts": posts, "requests": requests})
+    except Error as e:
+        if e.errno == 1146:
+            # archive tables not created yet (scripts/migrate.py up)
+            return FastJSONResponse({"posts": [], "requests": []})
+        print(f"[ERROR] Failed to load history: {e}")
+        raise HTTPException(status_code=500, detail="Failed to load history")
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
 
-        query_posts = """
-            SELECT DISTINCT
-                c.course_id,
-                c.term_id,
-                c.subject,
-                c.number,
-                c.title AS course_title,
-                c.credits,
-                p.post_id,
-                p.title AS post_title,
-                p.created_at AS post_created_at
-            FROM Post p
-            JOIN Team t ON p.team_id = t.team_id
-            JOIN Course c ON t.course_id = c.course_id
-            WHERE p.user_id = %s
-        """
 
-        cursor.execute(query_posts, (user_id,))
-        post_courses = cursor.fetchall()
-
-        courses_map = {}
-
-        for item in team_courses:
-            course_id = item["course_id"]
-            if course_id not in courses_map:
-                courses_map[course_id] = {
-                    "course_id": course_id,
-                    "term_id": item["term_id"],
-                    "subject": item["subject"],
-                    "number": item["number"],
-                    "title": item["course_title"],
-                    "credits": item["credits"],
-                    "teams": [],
-                    "posts": [],
-                }
-            courses_map[course_id]["teams"].append(
+def _merge_course_rows(rows):
+    """Fold ordered team/post rows into one entry per course.
+
+    Rows must arrive grouped by course (the query orders by course), so only
+    the course being built is held in memory.
+    """
+    course = None
+    for item in rows:
+        if course is None or course["course_id"] != item["course_id"]:
+            if course is not None:
+                yield course
+            course = {
+                "course_id": item["course_id"],
+                "term_id": item["term_id"],
+                "subject": item["subject"],
+                "number": item["number"],
+                "title": item["course_title"],
+                "credits": item["credits"],
+                "teams": [],
+                "posts": [],
+            }
+        if item["kind"] == 0:
+            course["teams"].append(
                 {
                     "team_id": item["team_id"],
                     "team_name": item["team_name"],
@@ -1046,59 +1199,125 @@ async def get_user_courses(user_id: int):
                     "joined_at": item["joined_at"],
                 }
             )
-
-        for item in post_courses:
-            course_id = item["course_id"]
-            if course_id not in courses_map:
-                courses_map[course_id] = {
-                    "course_id": course_id,
-                    "term_id": item["term_id"],
-                    "subject": item["subject"],
-                    "number": item["number"],
-                    "title": item["course_title"],
-                    "credits": item["credits"],
-                    "teams": [],
-                    "posts": [],
-                }
-            courses_map[course_id]["posts"].append(
+        else:
+            course["posts"].append(
                 {
                     "post_id": item["post_id"],
                     "post_title": item["post_title"],
                     "created_at": item["post_created_at"],
                 }
             )
+    if course is not None:
+        yield course
+
 
-        courses_list = list(courses_map.values())
-        courses_list.sort(key=lambda x: (x["subject"], x["number"]))
+# My course page backend
+@router.get("/api/users/{user_id}/courses")
+async def get_user_courses(user_id: int, stream: Optional[str] = None):
+    stream_format = parse_stream_format(stream)
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
 
-        return courses_list
+        # teams the user is in (kind 0) and posts they wrote (kind 1), ordered
+        # by course so _merge_course_rows can emit each course as it completes
+        query = """
+            SELECT * FROM (
+                SELECT DISTINCT
+                    0 AS kind,
+                    c.course_id,
+                    c.term_id,
+                    c.subject,
+                    c.number,
+                    c.title AS course_title,
+                    c.credits,
+                    t.team_id,
+                    t.team_name,
+                    tm.role,
+                    tm.joined_at,
+                    NULL AS post_id,
+                    NULL AS post_title,
+                    NULL AS post_created_at
+                FROM TeamMember tm
+                JOIN Team t ON tm.team_id = t.team_id
+                JOIN Course c ON t.course_id = c.course_id
+                WHERE tm.user_id = %s
+                UNION ALL
+                SELECT DISTINCT
+                    1 AS kind,
+                    c.course_id,
+                    c.term_id,
+                    c.subject,
+                    c.number,
+                    c.title AS course_title,
+                    c.credits,
+                    NULL,
+                    NULL,
+                    NULL,
+                    NULL,
+                    p.post_id,
+                    p.title,
+                    p.created_at
+                FROM Post p
+                JOIN Team t ON p.team_id = t.team_id
+                JOIN Course c ON t.course_id = c.course_id
+                WHERE p.user_id = %s
+            ) AS user_course_rows
+            ORDER BY subject, number, course_id, kind
+        """
+
+        cursor.execute(query, (user_id, user_id))
+        if stream_format:
+            rows = _merge_course_rows(iter_rows(cursor))
+            response = stream_rows(conn, cursor, rows, stream_format)
+            conn = None  # the response closes it after the last row
+            return response
+
+        courses_list = list(_merge_course_rows(cursor.fetchall()))
+
+        return FastJSONResponse(courses_list)
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
 
 
+MATCH_REQUEST_FIELDS = FieldSet(
+    {
+        "request_id": "mr.request_id",
+        "from_user_id": "mr.from_user_id",
+        "to_team_id": "mr.to_team_id",
+        "post_id": "mr.post_id",
+        "message": "mr.message",
+        "status": "mr.status",
+        "created_at": "mr.created_at",
+        "team_name": "t.team_name",
+        "subject": "c.subject",
+        "number": "c.number",
+        "course_title": "c.title",
+        "post_title": "p.title",
+    }
+)
+
+
 # send out(create new) match requests -> send in the post page to a user's notification page
-@app.get("/api/users/{user_id}/match-requests")
-async def get_user_match_requests(user_id: int, status: Optional[str] = None):
+@router.get("/api/users/{user_id}/match-requests")
+async def get_user_match_requests(
+    user_id: int,
+    status: Optional[str] = None,
+    stream: Optional[str] = None,
+    fields: Optional[str] = None,
+):
+    stream_format = parse_stream_format(stream)
+    names = MATCH_REQUEST_FIELDS.parse(fields)
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
-        query = """
+        query = f"""
             SELECT 
-                mr.request_id,
-                mr.from_user_id,
-                mr.to_team_id,
-                mr.post_id,
-                mr.message,
-                mr.status,
-                mr.created_at,
-                t.team_name,
-                c.subject,
-                c.number,
-                c.title AS course_title,
-                p.title AS post_title
+                {MATCH_REQUEST_FIELDS.select_list(names)}
             FROM MatchRequest mr
             LEFT JOIN Team t ON mr.to_team_id = t.team_id
             LEFT JOIN Course c ON t.course_id = c.course_id
@@ -1114,9 +1333,14 @@ async def get_user_match_requests(user_id: int, status: Optional[str] = None):
         query += " ORDER BY mr.created_at DESC"
 
         cursor.execute(query, tuple(params))
+        if stream_format:
+            response = stream_rows(conn, cursor, iter_rows(cursor), stream_format)
+            conn = None  # the response closes it after the last row
+            return response
+
         requests = cursor.fetchall()
 
-        return requests
+        return FastJSONResponse(requests)
     finally:
         if conn and conn.is_connected():
             cursor.close()
@@ -1124,8 +1348,11 @@ async def get_user_match_requests(user_id: int, status: Optional[str] = None):
 
 
 # receive the match requests -> notification page
-@app.get("/api/users/{user_id}/received-requests")
-async def get_user_received_requests(user_id: int, status: Optional[str] = None):
+@router.get("/api/users/{user_id}/received-requests")
+async def get_user_received_requests(
+    user_id: int, status: Optional[str] = None, stream: Optional[str] = None
+):
+    stream_format = parse_stream_format(stream)
     conn = None
     try:
         conn = get_db_connection()
@@ -1164,8 +1391,13 @@ async def get_user_received_requests(user_id: int, status: Optional[str] = None)
         query += " ORDER BY mr.created_at DESC"
 
         cursor.execute(query, tuple(params))
+        if stream_format:
+            response = stream_rows(conn, cursor, iter_rows(cursor), stream_format)
+            conn = None  # the response closes it after the last row
+            return response
+
         requests = cursor.fetchall()
-        return requests
+        return FastJSONResponse(requests)
 
     finally:
         if conn and conn.is_connected():
@@ -1174,7 +1406,7 @@ async def get_user_received_requests(user_id: int, status: Optional[str] = None)
 
 
 # accept match request in notification page: if accept, update user's teams and team table
-@app.put("/api/users/{user_id}/requests/{request_id}/accept")
+@router.put("/api/users/{user_id}/requests/{request_id}/accept")
 async def accept_join_request(user_id: int, request_id: int):
     """Accept a join request - add user to team and update request status"""
     conn = None
@@ -1262,7 +1494,17 @@ async def accept_join_request(user_id: int, request_id: int):
         """
         cursor.execute(update_request_query, (request_id,))
 
+        user_stats.adjust(cursor, from_user_id, open_requests=-1, successful_matches=1)
+        if not existing_member:
+            # the team may have just filled up, which changes every member's
+            # open-team count
+            cursor.execute(
+                "SELECT user_id FROM TeamMember WHERE team_id = %s", (to_team_id,)
+            )
+            user_stats.refresh_memberships(cursor, [row[0] for row in cursor.fetchall()])
+
         conn.commit()
+        invalidation.publish("aggregates")
 
         return {
             "message": "Join request accepted successfully",
@@ -1278,7 +1520,7 @@ async def accept_join_request(user_id: int, request_id: int):
 
 
 # reject match request in notification page: if reject, update the request msg and delete
-@app.put("/api/users/{user_id}/requests/{request_id}/reject")
+@router.put("/api/users/{user_id}/requests/{request_id}/reject")
 async def reject_join_request(
     user_id: int, request_id: int, payload: Optional[RejectRequestPayload] = None
 ):
@@ -1293,6 +1535,7 @@ async def reject_join_request(
         verify_query = """
             SELECT 
                 mr.request_id,
+                mr.from_user_id,
                 mr.status,
                 mr.message,
                 p.user_id AS post_author_id
@@ -1357,7 +1600,10 @@ async def reject_join_request(
             """
             cursor.execute(update_request_query, (request_id,))
 
+        user_stats.adjust(cursor, request_info["from_user_id"], open_requests=-1)
+
         conn.commit()
+        invalidation.publish("aggregates")
 
         return {
             "message": "Join request rejected successfully",
@@ -1371,31 +1617,103 @@ async def reject_join_request(
             conn.close()
 
 
+POPULAR_POST_FIELDS = FieldSet(
+    {
+        "post_id": "p.post_id",
+        "title": "p.title",
+        "content_preview": "p.content_preview",
+        "created_at": "p.created_at",
+        "target_team_size": "t.target_size",
+        "author_name": "u.display_name",
+        "course_title": "c.title",
+        "course_subject": "c.subject",
+        "course_number": "c.number",
+        "section_code": "s.crn",
+        "term_id": "c.term_id",
+        "request_count": "COUNT(DISTINCT mr.request_id)",
+        "comment_count": "COUNT(DISTINCT cm.comment_id)",
+        "view_count": "0",
+        "status": "t.status",
+        "skills": None,
+    },
+    # skills lookup key and ORDER BY aliases
+    always=("post_id", "request_count", "comment_count"),
+)
+
+
+# home page aggregates: identical concurrent requests share one execution,
+# and the common shapes (per listed term, up to AGGREGATE_CACHE_ROWS rows) are
+# kept fresh in the background so no request pays for the GROUP BY
+popular_flights = SingleFlight()
+home_aggregates = AggregateCache(
+    {
+        "terms": load_terms,
+        "popular_posts": lambda term_id: load_popular_posts(
+            AGGREGATE_CACHE_ROWS, term_id, list(POPULAR_POST_FIELDS.columns)
+        ),
+        "popular_courses": lambda term_id: load_popular_courses(
+            term_id, AGGREGATE_CACHE_ROWS
+        ),
+    },
+    popular_flights,
+    interval=AGGREGATE_REFRESH_INTERVAL,
+    max_age=AGGREGATE_MAX_AGE,
+)
+
+
+def _popular_changed(_key=None) -> None:
+    # posts, comments and requests change the popular lists, never the term
+    # list; served stale-while-revalidate until the debounced recompute
+    home_aggregates.mark_dirty("popular_posts")
+    home_aggregates.mark_dirty("popular_courses")
+
+
+invalidation.subscribe("aggregates", _popular_changed)
+
+
+async def popular_aggregate(name: str, term_id: Optional[str]):
+    """``name`` ("popular_posts"/"popular_courses") for ``term_id``.
+
+    Only terms in the term list are cached: any other term_id is loaded
+    uncached (still coalesced), so made-up ids never become entries that
+    are refreshed in the background.
+    """
+    if term_id is not None:
+        terms = await home_aggregates.get("terms")
+        if all(term["term_id"] != term_id for term in terms):
+            return await popular_flights.do(
+                (name, "uncached", term_id), lambda: home_aggregates.loaders[name](term_id)
+            )
+    return await home_aggregates.get(name, (term_id,))
+
+
 # home page: popular posts(10 -> influenced in frontend) will be show at the home
-@app.get("/api/posts/popular")
-async def get_popular_posts(limit: int = 10, term_id: Optional[str] = None):
+@router.get("/api/posts/popular")
+async def get_popular_posts(
+    limit: int = 10, term_id: Optional[str] = None, fields: Optional[str] = None
+):
+    names = POPULAR_POST_FIELDS.parse(fields)
+    if limit <= AGGREGATE_CACHE_ROWS:
+        posts = await popular_aggregate("popular_posts", term_id)
+        return FastJSONResponse(
+            list(POPULAR_POST_FIELDS.project(posts[:limit], names))
+        )
+    return await coalesced_response(
+        popular_flights,
+        ("popular_posts", limit, term_id, tuple(names)),
+        lambda: load_popular_posts(limit, term_id, names),
+    )
+
+
+def load_popular_posts(limit: int, term_id: Optional[str], names: List[str]):
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query = """
+        query = f"""
         SELECT 
-            p.post_id,
-            p.title,
-            p.content,
-            p.created_at,
-            t.target_size AS target_team_size,
-            u.display_name AS author_name,
-            c.title AS course_title,
-            c.subject AS course_subject,
-            c.number AS course_number,
-            s.crn AS section_code,
-            c.term_id,
-            COUNT(DISTINCT mr.request_id) AS request_count,
-            COUNT(DISTINCT cm.comment_id) AS comment_count,
-            0 AS view_count,
-            t.status
+            {POPULAR_POST_FIELDS.select_list(names)}
         FROM Post p
         LEFT JOIN User u ON p.user_id = u.user_id
         LEFT JOIN Team t ON p.team_id = t.team_id
@@ -1412,7 +1730,7 @@ async def get_popular_posts(limit: int = 10, term_id: Optional[str] = None):
             params.append(term_id)
 
         query += """
-        GROUP BY p.post_id, p.title, p.content, p.created_at, t.target_size,
+        GROUP BY p.post_id, p.title, p.content_preview, p.created_at, t.target_size,
                  u.display_name, c.title, c.subject, c.number, s.crn, c.term_id, t.status
         ORDER BY request_count DESC, comment_count DESC, p.created_at DESC
         LIMIT %s
@@ -1422,34 +1740,81 @@ async def get_popular_posts(limit: int = 10, term_id: Optional[str] = None):
         cursor.execute(query, tuple(params))
         posts = cursor.fetchall()
 
-        for post in posts:
-            skills_query = """
-            SELECT s.name
-            FROM PostSkill ps
-            JOIN Skill s ON ps.skill_id = s.skill_id
-            WHERE ps.post_id = %s
-            """
-            cursor.execute(skills_query, (post["post_id"],))
-            skills = cursor.fetchall()
-            post["skills"] = [skill["name"] for skill in skills]
+        if "skills" in names:
+            skills = hydration.load_post_skills(cursor, [post["post_id"] for post in posts])
+            for post in posts:
+                post["skills"] = skills[post["post_id"]]
+
+        return list(POPULAR_POST_FIELDS.project(posts, names))
+
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
 
-        for post in posts:
-            if post["created_at"]:
-                post["created_at"] = post["created_at"].isoformat()
 
-        return posts
+SEARCH_POST_FIELDS = FieldSet(
+    {
+        "post_id": "p.post_id",
+        "title": "p.title",
+        "content_preview": "p.content_preview",
+        "created_at": "p.created_at",
+        "target_team_size": "t.target_size",
+        "author_name": "u.display_name",
+        "course_title": "c.title",
+        "course_id": "c.course_id",
+        "course_subject": "c.subject",
+        "course_number": "c.number",
+        "section_code": "s.crn",
+        "term_id": "c.term_id",
+        "request_count": "COUNT(DISTINCT mr.request_id)",
+        "view_count": "0",
+        "status": "t.status",
+        "skills": None,
+    },
+    always=("post_id",),
+)
+
 
+def _resolve_skills_apart(skill_ids):
+    """Fetch skills added since the dictionary was loaded, on a connection of
+    their own: the request's connection is busy streaming."""
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        skill_dictionary.resolve(cursor, skill_ids)
+    except (Error, HTTPException) as e:
+        # the post goes out without them rather than aborting the stream
+        print(f"[WARNING] Failed to look up skills {skill_ids}: {getattr(e, 'detail', e)}")
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
 
 
+def _split_skill_ids(posts):
+    for post in posts:
+        ids = post.pop("skill_ids", None)
+        skill_ids = [int(i) for i in ids.split(",")] if ids else []
+        missing = skill_dictionary.missing(skill_ids)
+        if missing:
+            _resolve_skills_apart(missing)
+        post["skills"] = skill_dictionary.names(None, skill_ids)
+        yield post
+
+
 # search the posts: based on term_id and course_id
-@app.get("/api/posts/search")
+@router.get("/api/posts/search")
 async def search_posts(
-    term_id: Optional[str] = None, course_id: Optional[str] = None, limit: int = 100
+    term_id: Optional[str] = None,
+    course_id: Optional[str] = None,
+    limit: int = 100,
+    stream: Optional[str] = None,
+    fields: Optional[str] = None,
 ):
+    stream_format = parse_stream_format(stream)
+    names = SEARCH_POST_FIELDS.parse(fields)
     conn = None
     try:
         if not term_id or not course_id:
@@ -1487,23 +1852,19 @@ async def search_posts(
                 similar_courses = cursor.fetchall()
             return []
 
-        query = """
+        select_list = SEARCH_POST_FIELDS.select_list(names)
+        if stream_format and "skills" in names:
+            # An unbuffered cursor keeps the connection busy until the last
+            # row is read, so skills can't be looked up per post; fetch their
+            # ids with the row instead.
+            select_list += """,
+            (SELECT GROUP_CONCAT(ps.skill_id)
+             FROM PostSkill ps
+             WHERE ps.post_id = p.post_id) AS skill_ids"""
+
+        query = f"""
         SELECT 
-            p.post_id,
-            p.title,
-            p.content,
-            p.created_at,
-            t.target_size AS target_team_size,
-            u.display_name AS author_name,
-            c.title AS course_title,
-            c.course_id,
-            c.subject AS course_subject,
-            c.number AS course_number,
-            s.crn AS section_code,
-            c.term_id,
-            COUNT(DISTINCT mr.request_id) AS request_count,
-            0 AS view_count,
-            t.status
+            {select_list}
         FROM Post p
         INNER JOIN Team t ON p.team_id = t.team_id
         INNER JOIN Course c ON t.course_id = c.course_id
@@ -1513,7 +1874,7 @@ async def search_posts(
         WHERE (t.status IS NULL OR t.status = 'open')
           AND c.term_id = %s
           AND c.course_id = %s
-        GROUP BY p.post_id, p.title, p.content, p.created_at, t.target_size,
+        GROUP BY p.post_id, p.title, p.content_preview, p.created_at, t.target_size,
                  u.display_name, u.user_id, c.title, c.course_id, c.subject, c.number, 
                  s.crn, c.term_id, t.status
         ORDER BY p.created_at DESC
@@ -1523,33 +1884,27 @@ async def search_posts(
         params = [term_id, course_id, limit]
 
         cursor.execute(query, tuple(params))
+        if stream_format:
+            rows = iter_rows(cursor)
+            if "skills" in names:
+                rows = _split_skill_ids(rows)
+            rows = SEARCH_POST_FIELDS.project(rows, names)
+            response = stream_rows(conn, cursor, rows, stream_format)
+            conn = None  # the response closes it after the last row
+            return response
+
         posts = cursor.fetchall()
 
-        for post in posts:
+        if "skills" in names:
             try:
-                skills_query = """
-                SELECT s.name
-                FROM PostSkill ps
-                JOIN Skill s ON ps.skill_id = s.skill_id
-                WHERE ps.post_id = %s
-                """
-                cursor.execute(skills_query, (post["post_id"],))
-                skills = cursor.fetchall()
-                post["skills"] = [skill["name"] for skill in skills] if skills else []
+                skills = hydration.load_post_skills(cursor, [post["post_id"] for post in posts])
             except Error as e:
-                print(
-                    f"[WARNING] Error fetching skills for post {post['post_id']}: {e}"
-                )
-                post["skills"] = []
+                print(f"[WARNING] Error fetching skills for posts: {e}")
+                skills = {}
+            for post in posts:
+                post["skills"] = skills.get(post["post_id"], [])
 
-        for post in posts:
-            if post["created_at"]:
-                if isinstance(post["created_at"], str):
-                    pass
-                else:
-                    post["created_at"] = post["created_at"].isoformat()
-
-        return posts
+        return FastJSONResponse(list(SEARCH_POST_FIELDS.project(posts, names)))
 
     except HTTPException:
         raise
@@ -1573,64 +1928,42 @@ async def search_posts(
             conn.close()
 
 
-# search the posts: based on post_id -> then we can get access to a specific post
-@app.get("/api/posts/{post_id}")
-async def get_post_by_id(post_id: int):
+@router.get("/api/posts")
+async def get_posts_by_ids(ids: str, include: Optional[str] = None):
+    post_ids = hydration.parse_ids(ids, BATCH_MAX_IDS)
+    relations = hydration.parse_include(include)
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        query = """
-        SELECT 
-            p.post_id,
-            p.title,
-            p.content,
-            p.created_at,
-            t.target_size AS target_team_size,
-            u.display_name AS author_name,
-            u.user_id AS author_id,
-            c.title AS course_title,
-            c.course_id,
-            c.subject AS course_subject,
-            c.number AS course_number,
-            s.crn AS section_code,
-            COUNT(DISTINCT mr.request_id) AS request_count,
-            0 AS view_count,
-            t.status
-        FROM Post p
-        LEFT JOIN User u ON p.user_id = u.user_id
-        LEFT JOIN Team t ON p.team_id = t.team_id
-        LEFT JOIN Course c ON t.course_id = c.course_id
-        LEFT JOIN Section s ON t.section_id = s.crn AND t.course_id = c.course_id
-        LEFT JOIN MatchRequest mr ON p.post_id = mr.post_id
-        WHERE p.post_id = %s
-        GROUP BY p.post_id, p.title, p.content, p.created_at, t.target_size,
-                 u.display_name, u.user_id, c.title, c.course_id, c.subject, c.number, s.crn, 
-                 t.status
-        """
+        posts = hydration.load_posts(cursor, post_ids)
+        hydration.expand_posts(cursor, posts, relations)
 
-        cursor.execute(query, (post_id,))
-        post = cursor.fetchone()
+        return FastJSONResponse(hydration.keyed("posts", post_ids, posts))
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
 
-        if not post:
-            raise HTTPException(status_code=404, detail="Post not found")
 
-        # Get skills for the post
-        skills_query = """
-        SELECT s.name
-        FROM PostSkill ps
-        JOIN Skill s ON ps.skill_id = s.skill_id
-        WHERE ps.post_id = %s
-        """
-        cursor.execute(skills_query, (post_id,))
-        skills = cursor.fetchall()
-        post["skills"] = [skill["name"] for skill in skills]
+# search the posts: based on post_id -> then we can get access to a specific post
+@router.get("/api/posts/{post_id}")
+async def get_post_by_id(post_id: int, include: Optional[str] = None):
+    # ?include=comments,team,members,skills expands the post in one round
+    # trip, one batched query per relation (default: skills only)
+    relations = hydration.parse_include(include)
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
 
-        if post["created_at"]:
-            post["created_at"] = post["created_at"].isoformat()
+        posts = hydration.load_posts(cursor, [post_id])
+        if not posts:
+            raise HTTPException(status_code=404, detail="Post not found")
 
-        return post
+        hydration.expand_posts(cursor, posts, relations)
+        return FastJSONResponse(posts[post_id])
 
     finally:
         if conn and conn.is_connected():
@@ -1639,7 +1972,7 @@ async def get_post_by_id(post_id: int):
 
 
 # update the post information by the owner of the post
-@app.put("/api/posts/{post_id}")
+@router.put("/api/posts/{post_id}")
 async def update_post(post_id: int, payload: PostUpdate, user_id: Optional[int] = None):
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
@@ -1716,6 +2049,8 @@ async def update_post(post_id: int, payload: PostUpdate, user_id: Optional[int]
         if payload.content is not None:
             update_fields.append("content = %s")
             update_values.append(payload.content.strip())
+            update_fields.append("content_preview = %s")
+            update_values.append(make_preview(payload.content))
 
         if not update_fields:
             raise HTTPException(status_code=400, detail="No fields to update")
@@ -1735,6 +2070,7 @@ async def update_post(post_id: int, payload: PostUpdate, user_id: Optional[int]
         """
         cursor.execute(update_query, tuple(update_values))
         conn.commit()
+        invalidation.publish("aggregates")
 
         return {
             "message": "Post updated successfully",
@@ -1748,7 +2084,7 @@ async def update_post(post_id: int, payload: PostUpdate, user_id: Optional[int]
 
 
 # delete a post
-@app.delete("/api/posts/{post_id}")
+@router.delete("/api/posts/{post_id}")
 async def delete_post(post_id: int, user_id: Optional[int] = None):
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
@@ -1811,6 +2147,21 @@ async def delete_post(post_id: int, user_id: Optional[int] = None):
             active_requests["active_request_count"] if active_requests else 0
         )
 
+        # Whose counters change: senders of requests about to be withdrawn,
+        # and the team's members (open-team and course counts)
+        cursor.execute(
+            """
+            SELECT from_user_id, COUNT(*) AS withdrawn
+            FROM MatchRequest
+            WHERE (post_id = %s OR to_team_id = %s) AND status = 'pending'
+            GROUP BY from_user_id
+            """,
+            (post_id, team_id),
+        )
+        withdrawn_by_user = cursor.fetchall()
+        cursor.execute("SELECT user_id FROM TeamMember WHERE team_id = %s", (team_id,))
+        affected_members = [row["user_id"] for row in cursor.fetchall()]
+
         # Switch to regular cursor for deletes
         cursor.close()
         cursor = conn.cursor()
@@ -1839,7 +2190,8 @@ async def delete_post(post_id: int, user_id: Optional[int] = None):
         # 3. Delete PostSkill relationships
         cursor.execute("DELETE FROM PostSkill WHERE post_id = %s", (post_id,))
 
-        # 4. Delete the Post
+        # 4. Delete the Post and its activity feed rows
+        user_activity.forget_post(cursor, post_id)
         cursor.execute("DELETE FROM Post WHERE post_id = %s", (post_id,))
 
         # 5. If team has only 1 member (the owner), delete the team and team members
@@ -1868,7 +2220,15 @@ async def delete_post(post_id: int, user_id: Optional[int] = None):
             )
             team_deleted = False
 
+        for row in withdrawn_by_user:
+            user_stats.adjust(
+                cursor, row["from_user_id"], open_requests=-row["withdrawn"]
+            )
+        user_stats.adjust(cursor, user_id, post_count=-1)
+        user_stats.refresh_memberships(cursor, affected_members + [user_id])
+
         conn.commit()
+        invalidation.publish("aggregates")
 
         return {
             "message": "Post deleted successfully",
@@ -1884,7 +2244,7 @@ async def delete_post(post_id: int, user_id: Optional[int] = None):
 
 
 # establish post comments
-@app.get("/api/posts/{post_id}/comments", response_model=List[CommentResponse])
+@router.get("/api/posts/{post_id}/comments", response_model=List[CommentResponse])
 async def get_post_comments(post_id: int):
     conn = None
     try:
@@ -1913,11 +2273,7 @@ async def get_post_comments(post_id: int):
         cursor.execute(comment_query, (post_id,))
         comments = cursor.fetchall()
 
-        for comment in comments:
-            if comment.get("created_at"):
-                comment["created_at"] = comment["created_at"].isoformat()
-
-        return comments
+        return FastJSONResponse(comments)
     finally:
         if conn and conn.is_connected():
             cursor.close()
@@ -1925,7 +2281,7 @@ async def get_post_comments(post_id: int):
 
 
 # add comments
-@app.post("/api/posts/{post_id}/comments", response_model=CommentResponse)
+@router.post("/api/posts/{post_id}/comments", response_model=CommentResponse)
 async def create_post_comment(post_id: int, payload: CommentCreate):
     if not payload.content or not payload.content.strip():
         raise HTTPException(status_code=400, detail="Content cannot be empty")
@@ -1990,7 +2346,9 @@ async def create_post_comment(post_id: int, payload: CommentCreate):
                 payload.content.strip(),
             ),
         )
+        user_activity.record_comment(cursor, payload.user_id, post_id)
         conn.commit()
+        invalidation.publish("aggregates")
 
         from datetime import datetime
 
@@ -2012,7 +2370,7 @@ async def create_post_comment(post_id: int, payload: CommentCreate):
 
 
 # add then update comment
-@app.put("/api/posts/{post_id}/comments/{comment_id}")
+@router.put("/api/posts/{post_id}/comments/{comment_id}")
 async def update_comment(
     post_id: int, comment_id: int, payload: CommentUpdate, user_id: Optional[int] = None
 ):
@@ -2093,7 +2451,7 @@ async def update_comment(
 
 
 # delete a comment
-@app.delete("/api/posts/{post_id}/comments/{comment_id}")
+@router.delete("/api/posts/{post_id}/comments/{comment_id}")
 async def delete_comment(post_id: int, comment_id: int, user_id: Optional[int] = None):
     if not user_id:
         raise HTTPException(status_code=400, detail="user_id is required")
@@ -2177,7 +2535,10 @@ async def delete_comment(post_id: int, comment_id: int, user_id: Optional[int] =
             cursor.execute(delete_query, (comment_id,))
             delete_type = "hard"
 
+        user_activity.forget_comment(cursor, user_id, post_id)
+
         conn.commit()
+        invalidation.publish("aggregates")
 
         return {
             "message": "Comment deleted successfully",
@@ -2191,7 +2552,7 @@ async def delete_comment(post_id: int, comment_id: int, user_id: Optional[int] =
 
 
 # join request create
-@app.post("/api/requests")
+@router.post("/api/requests")
 async def create_join_request(request: JoinRequest):
     conn = None
     try:
@@ -2276,7 +2637,9 @@ async def create_join_request(request: JoinRequest):
             insert_query,
             (next_request_id, from_user_id, team_id, request.post_id, request.message),
         )
+        user_stats.adjust(cursor, from_user_id, open_requests=1, total_requests=1)
         conn.commit()
+        invalidation.publish("aggregates")
 
         request_id = next_request_id
 
@@ -2292,101 +2655,72 @@ async def create_join_request(request: JoinRequest):
             conn.close()
 
 
-# fn: search course
-@app.get("/api/courses/search")
-async def search_courses(
-    term_id: Optional[str] = None, q: Optional[str] = None, limit: int = 50
-):
+def load_catalog():
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
+        return CourseCatalog.load(cursor)
+    finally:
+        if conn and conn.is_connected():
+            cursor.close()
+            conn.close()
 
-        query = """
-        SELECT DISTINCT
-            c.course_id,
-            c.term_id,
-            c.subject,
-            c.number,
-            c.title,
-            c.credits,
-            CONCAT(c.subject, ' ', c.number) AS course_code
-        FROM Course c
-        WHERE 1=1
-        """
-
-        params = []
-
-        if term_id:
-            query += " AND c.term_id = %s"
-            params.append(term_id)
-
-        if q and q.strip():
-            search_term = f"%{q.strip()}%"
-            exact_search = q.strip().upper()
-            starts_with_term = f"{q.strip()}%"
-            query += """
-            AND (
-                CONCAT(c.subject, ' ', c.number) LIKE %s
-                OR c.title LIKE %s
-                OR c.subject LIKE %s
-                OR c.number LIKE %s
-            )
-            """
-            params.extend([search_term, search_term, search_term, search_term])
-
-            query += """
-            ORDER BY
-                CASE 
-                    WHEN UPPER(CONCAT(c.subject, ' ', c.number)) = %s THEN 1
-                    WHEN UPPER(CONCAT(c.subject, ' ', c.number)) LIKE %s THEN 2
-                    WHEN UPPER(c.title) = %s THEN 3
-                    WHEN UPPER(c.title) LIKE %s THEN 4
-                    WHEN UPPER(c.subject) = %s THEN 5
-                    WHEN UPPER(c.number) = %s THEN 6
-                    ELSE 7
-                END,
-                c.subject, c.number
-            """
-            starts_with_term_upper = f"{q.strip().upper()}%"
-            params.extend(
-                [
-                    exact_search,
-                    starts_with_term_upper,
-                    exact_search,
-                    f"%{q.strip().upper()}%",
-                    exact_search,
-                    exact_search,
-                ]
-            )
-        else:
-            query += " ORDER BY c.subject, c.number"
-
-        query += " LIMIT %s"
-        params.append(limit)
-
-        cursor.execute(query, tuple(params))
-        courses = cursor.fetchall()
-
-        return courses
 
+def load_skills():
+    conn = None
+    try:
+        conn = get_db_connection()
+        cursor = conn.cursor(dictionary=True)
+        return skill_dictionary.load(cursor)
     finally:
         if conn and conn.is_connected():
             cursor.close()
             conn.close()
 
 
+# courses and sections only change with a catalog import, so both endpoints
+# below are served from memory (catalog.py). The Skill dictionary (skills.py)
+# is reference data of the same kind and reloads with it.
+catalog_cache = AggregateCache(
+    {"catalog": load_catalog, "skills": load_skills},
+    popular_flights,
+    interval=CATALOG_REFRESH_INTERVAL,
+    max_age=CATALOG_MAX_AGE,
+    idle_expiry=float("inf"),
+)
+
+
+# fn: search course
+@router.get("/api/courses/search")
+async def search_courses(
+    term_id: Optional[str] = None, q: Optional[str] = None, limit: int = 50
+):
+    catalog = await catalog_cache.get("catalog")
+    return FastJSONResponse(catalog.search(term_id, q, limit))
+
+
 # popular course: home page(5 -> frontend)
-@app.get("/api/courses/popular")
+@router.get("/api/courses/popular")
 async def get_popular_courses(term_id: Optional[str] = None, limit: int = 5):
+    if not term_id:
+        return []
+    if limit <= AGGREGATE_CACHE_ROWS:
+        courses = await popular_aggregate("popular_courses", term_id)
+        return FastJSONResponse(courses[:limit])
+    return await coalesced_response(
+        popular_flights,
+        ("popular_courses", term_id, limit),
+        lambda: load_popular_courses(term_id, limit),
+    )
+
+
+def load_popular_courses(term_id: str, limit: int):
     conn = None
     try:
         conn = get_db_connection()
         cursor = conn.cursor(dictionary=True)
 
-        if not term_id:
-            return []
-
         query = """
         SELECT 
             c.course_id,
@@ -2426,39 +2760,64 @@ async def get_popular_courses(term_id: Optional[str] = None, limit: int = 5):
             conn.close()
 
 
-# when create post -> choose specific section needed
-@app.get("/api/courses/{course_id}/sections")
-async def get_course_sections(course_id: str):
-    conn = None
-    try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
+# home page in one round trip: terms, popular posts and popular courses for
+# a term (the newest one by default). The sections load concurrently from
+# home_aggregates, i.e. the same cached/coalesced results the individual
+# routes serve, so lists are capped at AGGREGATE_CACHE_ROWS. A section that
+# fails is named in "errors" and the rest of the document is still returned.
+@router.get("/api/home")
+async def get_home(
+    term_id: Optional[str] = None, post_limit: int = 10, course_limit: int = 5
+):
+    home = {
+        "term_id": term_id,
+        "terms": None,
+        "popular_posts": None,
+        "popular_courses": None,
+    }
+    errors = {}
 
-        query = """
-        SELECT 
-            s.crn,
-            s.instructor,
-            s.location,
-            s.delivery_mode,
-            s.meeting_time,
-            s.course_id
-        FROM Section s
-        WHERE s.course_id = %s
-        ORDER BY s.crn ASC
-        """
+    async def load(name: str, params: tuple = (), limit: Optional[int] = None):
+        try:
+            if params:
+                rows = await popular_aggregate(name, *params)
+            else:
+                rows = await home_aggregates.get(name)
+            home[name] = rows if limit is None else rows[:limit]
+        except Exception as e:
+            print(f"[ERROR] /api/home failed to load {name}: {getattr(e, 'detail', e)}")
+            errors[name] = f"Failed to load {name.replace('_', ' ')}"
+
+    sections = []
+    if term_id is None:
+        # the default term comes from the term list, so that goes first
+        await load("terms")
+        if home["terms"]:
+            home["term_id"] = term_id = home["terms"][0]["term_id"]
+    else:
+        sections.append(load("terms"))
+    if term_id is not None:
+        sections.append(load("popular_posts", (term_id,), post_limit))
+        sections.append(load("popular_courses", (term_id,), course_limit))
+    await asyncio.gather(*sections)
+
+    sections = ("terms", "popular_posts", "popular_courses")
+    if errors and all(home[name] is None for name in sections):
+        raise HTTPException(status_code=500, detail="Failed to load home page")
+
+    home["errors"] = errors
+    return FastJSONResponse(home)
 
-        cursor.execute(query, (course_id,))
-        sections = cursor.fetchall()
-        return sections
 
-    finally:
-        if conn and conn.is_connected():
-            cursor.close()
-            conn.close()
+# when create post -> choose specific section needed
+@router.get("/api/courses/{course_id}/sections")
+async def get_course_sections(course_id: str):
+    catalog = await catalog_cache.get("catalog")
+    return FastJSONResponse(catalog.sections(course_id))
 
 
 # create new post
-@app.post("/api/posts")
+@router.post("/api/posts")
 async def create_post(payload: PostCreate):
     if not payload.title or not payload.title.strip():
         raise HTTPException(status_code=400, detail="Title cannot be empty")
@@ -2581,8 +2940,9 @@ async def create_post(payload: PostCreate):
 
         post_insert_query = """
         INSERT INTO Post (
-            post_id, user_id, team_id, title, content, created_at, updated_at
-        ) VALUES (%s, %s, %s, %s, %s, NOW(), NOW())
+            post_id, user_id, team_id, title, content, content_preview,
+            created_at, updated_at
+        ) VALUES (%s, %s, %s, %s, %s, %s, NOW(), NOW())
         """
         cursor.execute(
             post_insert_query,
@@ -2592,6 +2952,7 @@ async def create_post(payload: PostCreate):
                 next_team_id,
                 payload.title.strip(),
                 payload.content.strip(),
+                make_preview(payload.content),
             ),
         )
 
@@ -2605,7 +2966,12 @@ async def create_post(payload: PostCreate):
             (next_team_id, payload.user_id),
         )
 
+        user_activity.record_post(cursor, next_post_id)
+        user_stats.adjust(cursor, payload.user_id, post_count=1)
+        user_stats.refresh_memberships(cursor, [payload.user_id])
+
         conn.commit()
+        invalidation.publish("aggregates")
 
         return {
             "post_id": next_post_id,
@@ -2620,17 +2986,210 @@ async def create_post(payload: PostCreate):
 
 
 # just for safe connection debugging here...
-@app.get("/api/health")
-def health_check():
+def _open_pool():
+    # creating the pool opens all DB_POOL_SIZE connections
+    conn = get_db_connection()
     try:
-        conn = get_db_connection()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+    finally:
         conn.close()
+    return _pool_state()
+
+
+def _check_procedures():
+    try:
+        names = expected_procedures(STORED_PROCEDURES_SQL)
+    except FileNotFoundError:
+        # a deployment of backend/ alone has no doc/; like a missing
+        # procedure, that's no reason to never become ready
+        print(f"[WARN] {STORED_PROCEDURES_SQL} not found; stored procedures not checked")
+        return {"expected": None, "missing": [], "skipped": "definitions file not found"}
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        missing = missing_procedures(cursor, names)
+        cursor.close()
+    finally:
+        conn.close()
+    if missing:
+        # only the endpoints calling them fail, so warn rather than never
+        # becoming ready
+        print(f"[WARN] Stored procedures missing, see doc/src/stored_procedures.sql: {', '.join(missing)}")
+    return {"expected": len(names), "missing": missing}
+
+
+async def _warm_terms():
+    return {"terms": len(await home_aggregates.get("terms"))}
+
+
+async def _warm_catalog():
+    return (await catalog_cache.get("catalog")).stats()
+
+
+async def _warm_skills():
+    return (await catalog_cache.get("skills")).stats()
+
+
+warmup = Warmup(
+    [
+        ("pool", lambda: run_in_threadpool(_open_pool)),
+        ("terms", _warm_terms),
+        ("catalog", _warm_catalog),
+        ("skills", _warm_skills),
+        ("stored_procedures", lambda: run_in_threadpool(_check_procedures)),
+    ],
+    retry_interval=WARMUP_RETRY_INTERVAL,
+)
+
+# pings MySQL in the background for /api/ready; its own connection, so a
+# busy pool doesn't read as a dead database. Not ready until warmed up.
+readiness = ReadinessProbe(
+    connect=_probe_connection,
+    pool_state=_pool_state,
+    interval=HEALTH_PROBE_INTERVAL,
+    timeout=HEALTH_PROBE_TIMEOUT,
+    failure_threshold=HEALTH_FAILURE_THRESHOLD,
+    warmup=warmup,
+)
+
+
+# liveness: the process is up; never touches the database
+@router.get("/api/live")
+async def liveness():
+    return {"status": "alive"}
+
+
+# readiness: the background probe's last result, 503 while not ready
+@router.get("/api/ready")
+async def readiness_check():
+    status = readiness.status()
+    return FastJSONResponse(status, status_code=200 if status["ready"] else 503)
+
+
+# kept for start.sh and older monitors; same cached state as /api/ready
+@router.get("/api/health")
+async def health_check():
+    if readiness.ready:
         return {"status": "healthy", "database": "connected"}
-    except:
-        return {"status": "unhealthy", "database": "disconnected"}
+    return {"status": "unhealthy", "database": "disconnected"}
+
+
+@router.get("/api/metrics")
+def get_metrics():
+    return {
+        "singleflight": popular_flights.stats(),
+        "aggregates": home_aggregates.stats(),
+        "auth_user_cache": user_cache.stats(),
+        "admission": admission.stats(),
+        "rate_limits": rate_limiter.stats(),
+        "readiness": readiness.status(),
+        "catalog": catalog_cache.stats(),
+        "skills": skill_dictionary.stats(),
+        "invalidation": invalidation.stats(),
+        # metrics are per worker process
+        "pid": os.getpid(),
+    }
+
+
+def _create_app() -> FastAPI:
+    """Build the ASGI app; once per process, as ``app`` below. Each worker
+    (uvicorn --workers, gunicorn.conf.py) imports this module and so has its
+    own app; what it serves from memory is kept in step across workers
+    through ``invalidation``.
+    """
+    app = FastAPI(
+        title="TeamUp UIUC API",
+        version="1.0.0",
+        default_response_class=FastJSONResponse,
+        lifespan=lifespan,
+    )
+    app.include_router(router)
+
+    # sheds load with 503 + Retry-After when the DB can't keep up; added first
+    # so CORS headers still go on its responses
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission,
+        retry_after=ADMISSION_RETRY_AFTER,
+        exempt=UNTHROTTLED_PATHS,
+    )
+
+    # 429 + Retry-After for clients over their budget, before they take an
+    # admission slot; inside CORS, and inside AuthMiddleware to key by user
+    if RATE_LIMIT_ENABLED:
+        app.add_middleware(
+            RateLimitMiddleware,
+            limiter=rate_limiter,
+            exempt=UNTHROTTLED_PATHS,
+            trusted_proxies=RATE_LIMIT_TRUSTED_PROXIES,
+        )
+
+    # CORS middleware, connect frontend and backend, config.py
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[
+            "X-Next-Cursor",
+            "Retry-After",
+            "X-RateLimit-Limit",
+            "X-RateLimit-Remaining",
+            "X-RateLimit-Reset",
+        ],
+    )
+
+    # Accept: application/msgpack -> MessagePack bodies from FastJSONResponse
+    app.add_middleware(ContentNegotiationMiddleware)
+
+    # verifies bearer tokens (auth.py); never rejects, see current_user_id
+    app.add_middleware(AuthMiddleware)
+
+    # gzip/brotli for JSON and other text responses, config.py
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=GZIP_LEVEL,
+        brotli_quality=BROTLI_QUALITY,
+    )
+
+    # the built frontend takes over "/" when served from here; mounted last
+    # so every API route matches first
+    if SERVE_FRONTEND and os.path.isdir(FRONTEND_DIST_DIR):
+        app.mount(
+            "/",
+            PrecompressedStaticFiles(directory=FRONTEND_DIST_DIR, html=True),
+            name="frontend",
+        )
+    else:
+        app.add_api_route("/", root, methods=["GET"])
+    return app
+
+
+# the one entry point: `uvicorn main:app`, gunicorn.conf.py, python main.py
+app = _create_app()
 
 
 if __name__ == "__main__":
     import uvicorn
 
-    uvicorn.run(app, host=API_HOST, port=API_PORT)
+    if WEB_WORKERS > 1:
+        # Hand over to uvicorn's CLI in this process. Spawned workers
+        # re-import the __main__ module, and if that were this file, each
+        # would build a second app next to the one it serves.
+        os.execv(
+            sys.executable,
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+                "--host", API_HOST,
+                "--port", str(API_PORT),
+                "--workers", str(WEB_WORKERS),
+            ],
+        )
+    else:
+        uvicorn.run(app, host=API_HOST, port=API_PORT)
@@ -0,0 +1,23 @@
+import re
+
+# PostCard shows at most this many characters of a post in list views.
+PREVIEW_LENGTH = 150
+PREVIEW_SUFFIX = "..."
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def make_preview(content: str) -> str:
+    """Whitespace-normalized summary of a post body, stored in Post.content_preview.
+
+    Bodies longer than PREVIEW_LENGTH are cut at the last word boundary
+    before the limit (or at the limit for one long word) and end in "...".
+    """
+    text = _WHITESPACE.sub(" ", content or "").strip()
+    if len(text) <= PREVIEW_LENGTH:
+        return text
+    cut = text[:PREVIEW_LENGTH]
+    space = cut.rfind(" ")
+    if space > PREVIEW_LENGTH // 2:
+        cut = cut[:space]
+    return cut.rstrip(" .,;:") + PREVIEW_SUFFIX
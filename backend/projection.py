@@ -0,0 +1,65 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+
+class FieldSet:
+    """Whitelist of the fields a list endpoint can return via ``?fields=``.
+
+    ``columns`` maps each public field name, in response order, to the SQL
+    expression that produces it, or to None when the handler fills the field
+    in itself (skills, stored procedure columns). ``always`` lists fields the
+    handler needs even when the client didn't ask for them (keys for
+    follow-up queries, ORDER BY aliases); they are selected but trimmed from
+    the payload.
+    """
+
+    def __init__(self, columns: Dict[str, Optional[str]], always: Sequence[str] = ()):
+        self.columns = columns
+        self.always = tuple(always)
+
+    def parse(self, fields: Optional[str]) -> List[str]:
+        """Validate a comma-separated ``fields`` value; None means every field."""
+        if fields is None:
+            return list(self.columns)
+
+        names = []
+        for name in fields.split(","):
+            name = name.strip()
+            if not name or name in names:
+                continue
+            if name not in self.columns:
+                raise HTTPException(
+                    status_code=400,
+                    detail=f"Unknown field '{name}'. Allowed: {', '.join(self.columns)}",
+                )
+            names.append(name)
+        if not names:
+            raise HTTPException(status_code=400, detail="fields must not be empty")
+        return names
+
+    def selected(self, names: Sequence[str]) -> List[str]:
+        return [n for n in self.columns if n in names or n in self.always]
+
+    def select_list(self, names: Sequence[str]) -> str:
+        """SQL select list for ``names`` plus the always-selected fields."""
+        parts = []
+        for name in self.selected(names):
+            expr = self.columns[name]
+            if expr is None:
+                continue
+            if expr == name or expr.endswith(f".{name}"):
+                parts.append(expr)
+            else:
+                parts.append(f"{expr} AS {name}")
+        return ",\n            ".join(parts)
+
+    def project(
+        self, rows: Iterable[Dict[str, Any]], names: Sequence[str]
+    ) -> Iterator[Dict[str, Any]]:
+        """Drop fields the client didn't ask for from each row."""
+        if len(names) == len(self.columns):
+            yield from rows
+            return
+        for row in rows:
+            yield {name: row[name] for name in names if name in row}
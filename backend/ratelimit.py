@@ -0,0 +1,283 @@
+"""Per-client rate limiting with token buckets.
+
+A client is the user id of a verified bearer token (auth.py), or else its
+IP address: the peer's, or behind a trusted proxy, the last address in
+X-Forwarded-For that isn't a trusted proxy itself. Each route policy gives every client a bucket of ``burst``
+tokens, refilled at ``rate`` tokens per second. A request takes one token,
+and an empty bucket means 429 with Retry-After. Every limited response
+carries X-RateLimit-Limit/-Remaining/-Reset.
+
+Buckets live in process memory by default. With RATE_LIMIT_REDIS_URL set
+(and the redis package installed), they live in Redis instead, so all
+workers share one budget per client. If Redis is unreachable, requests
+are let through rather than failed.
+"""
+
+import ipaddress
+import math
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from auth import current_user_id
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # optional: in-memory buckets only
+    redis_asyncio = None
+
+
+@dataclass(frozen=True)
+class Policy:
+    name: str
+    # tokens per second, and bucket size
+    rate: float
+    burst: int
+
+
+@dataclass
+class Decision:
+    allowed: bool
+    limit: int
+    remaining: int
+    # seconds until the bucket is full again / until one token is back
+    reset: float
+    retry_after: float
+
+
+def _decide(policy: Policy, tokens: float, allowed: bool) -> Decision:
+    return Decision(
+        allowed=allowed,
+        limit=policy.burst,
+        remaining=int(tokens),
+        reset=(policy.burst - tokens) / policy.rate,
+        retry_after=0.0 if allowed else (1 - tokens) / policy.rate,
+    )
+
+
+class MemoryStore:
+    """Buckets in a dict; one event loop, so no locking."""
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        # key -> (tokens, last update, seconds an empty bucket takes to
+        # refill), least recently used first
+        self._buckets: "OrderedDict[str, Tuple[float, float, float]]" = OrderedDict()
+        self._evicted = 0
+
+    async def take(self, key: str, policy: Policy) -> Decision:
+        now = time.monotonic()
+        tokens, updated, _ = self._buckets.get(key, (policy.burst, now, 0.0))
+        tokens = min(policy.burst, tokens + (now - updated) * policy.rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        self._buckets[key] = (tokens, now, policy.burst / policy.rate)
+        self._buckets.move_to_end(key)
+        self._prune(now)
+        return _decide(policy, tokens, allowed)
+
+    def _prune(self, now: float) -> None:
+        # From the least recently used end: a bucket idle long enough to be
+        # full again is the same as no bucket; past max_keys the oldest goes
+        # regardless. Each bucket is dropped once, so this is O(1) amortized.
+        while self._buckets:
+            key, (_, updated, refill) = next(iter(self._buckets.items()))
+            if now - updated <= refill:
+                if len(self._buckets) <= self.max_keys:
+                    return
+                self._evicted += 1
+            del self._buckets[key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"store": "memory", "buckets": len(self._buckets), "evicted": self._evicted}
+
+
+# refill, take one token and store the bucket atomically
+_TAKE_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisStore:
+    """Buckets in Redis (shared by every worker), updated by one Lua script."""
+
+    def __init__(self, url: str, prefix: str = "teamup:ratelimit:"):
+        self.prefix = prefix
+        self._client = redis_asyncio.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+        self.errors = 0
+
+    async def take(self, key: str, policy: Policy) -> Optional[Decision]:
+        """None when Redis is unavailable (the caller lets the request through)."""
+        try:
+            # wall clock, since workers share the bucket
+            allowed, tokens = await self._take(
+                keys=[self.prefix + key], args=[policy.rate, policy.burst, time.time()]
+            )
+        except Exception as e:
+            self.errors += 1
+            print(f"[ERROR] Rate limit store unavailable: {e}")
+            return None
+        return _decide(policy, float(tokens), bool(int(allowed)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"store": "redis", "errors": self.errors}
+
+
+def make_store(redis_url: str):
+    if not redis_url:
+        return MemoryStore()
+    if redis_asyncio is None:
+        print("[WARN] RATE_LIMIT_REDIS_URL is set but redis is not installed; using in-memory buckets.")
+        return MemoryStore()
+    return RedisStore(redis_url)
+
+
+class RateLimiter:
+    def __init__(self, store, rules: Sequence[Tuple[Optional[str], str, Policy]], default: Optional[Policy]):
+        self.store = store
+        # (HTTP method or None for any, path regex, policy), first match wins
+        self.rules = [(method, re.compile(pattern), policy) for method, pattern, policy in rules]
+        self.default = default
+        self._allowed: Dict[str, int] = {}
+        self._limited: Dict[str, int] = {}
+
+    def policy_for(self, method: str, path: str) -> Optional[Policy]:
+        for rule_method, pattern, policy in self.rules:
+            if (rule_method is None or rule_method == method) and pattern.match(path):
+                return policy
+        return self.default
+
+    async def check(self, client: str, policy: Policy) -> Optional[Decision]:
+        decision = await self.store.take(f"{policy.name}:{client}", policy)
+        if decision is not None:
+            counters = self._allowed if decision.allowed else self._limited
+            counters[policy.name] = counters.get(policy.name, 0) + 1
+        return decision
+
+    def stats(self) -> Dict[str, Any]:
+        policies = {}
+        for name in sorted(set(self._allowed) | set(self._limited)):
+            policies[name] = {
+                "allowed": self._allowed.get(name, 0),
+                "limited": self._limited.get(name, 0),
+            }
+        return {**self.store.stats(), "policies": policies}
+
+
+def _headers(decision: Decision) -> Dict[str, str]:
+    return {
+        "X-RateLimit-Limit": str(decision.limit),
+        "X-RateLimit-Remaining": str(decision.remaining),
+        "X-RateLimit-Reset": str(math.ceil(decision.reset)),
+    }
+
+
+class RateLimitMiddleware:
+    """429 for clients over their route's budget; rate-limit headers on the rest.
+
+    Must run inside AuthMiddleware, which identifies token holders.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter,
+        exempt: Sequence[str] = (),
+        trusted_proxies: Sequence[str] = (),
+    ):
+        self.app = app
+        self.limiter = limiter
+        self.exempt = set(exempt)
+        self.trusted_proxies = [ipaddress.ip_network(p, strict=False) for p in trusted_proxies]
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _client_ip(self, scope: Scope) -> str:
+        peer = scope["client"][0] if scope.get("client") else "unknown"
+        if not self._trusted(peer):
+            return peer
+        forwarded = []
+        for name, value in scope.get("headers", ()):
+            if name == b"x-forwarded-for":
+                forwarded.extend(part.strip() for part in value.decode("latin-1").split(","))
+        # proxies append, so the right end is the most trustworthy: skip
+        # our own proxies from there, the next hop is the client
+        for address in reversed(forwarded):
+            if address and not self._trusted(address):
+                return address
+        return forwarded[0] if forwarded and forwarded[0] else peer
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        method = scope.get("method", "")
+        if (
+            scope["type"] != "http"
+            or not path.startswith("/api")
+            or path in self.exempt
+            or method == "OPTIONS"
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        policy = self.limiter.policy_for(method, path)
+        if policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        user_id = current_user_id.get()
+        if user_id is not None:
+            client = f"user:{user_id}"
+        else:
+            client = f"ip:{self._client_ip(scope)}"
+        decision = await self.limiter.check(client, policy)
+        if decision is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = _headers(decision)
+        if not decision.allowed:
+            headers["Retry-After"] = str(max(1, math.ceil(decision.retry_after)))
+            response = JSONResponse(
+                {"detail": "Too many requests, please slow down"},
+                status_code=429,
+                headers=headers,
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(raw=list(message["headers"]))
+                for name, value in headers.items():
+                    response_headers[name] = value
+                message["headers"] = response_headers.raw
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
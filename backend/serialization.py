@@ -0,0 +1,125 @@
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import ormsgpack
+except ImportError:  # optional: msgpack requests fall back to JSON
+    ormsgpack = None
+
+# datetime/date are encoded natively by orjson (same ISO-8601 text as
+# .isoformat()); Decimal columns (User.score, Course.credits) become floats,
+# which is what jsonable_encoder produced for them before. ormsgpack shares
+# the options and the default hook, so both formats carry the same schema.
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+ORMSGPACK_OPTIONS = ormsgpack.OPT_NON_STR_KEYS if ormsgpack is not None else 0
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# set per request by ContentNegotiationMiddleware
+response_format: ContextVar[str] = ContextVar("response_format", default="json")
+
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8")
+    if isinstance(obj, set):
+        return list(obj)
+    if hasattr(obj, "model_dump"):
+        return obj.model_dump()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+def packb(content: Any) -> bytes:
+    return ormsgpack.packb(content, default=_default, option=ORMSGPACK_OPTIONS)
+
+
+def render(content: Any, fmt: str) -> bytes:
+    """Encode ``content`` as "json" or "msgpack" (see negotiate_format)."""
+    if fmt == "msgpack":
+        return packb(content)
+    return dumps(content)
+
+
+def media_type_for(fmt: str) -> str:
+    return MSGPACK_MEDIA_TYPES[0] if fmt == "msgpack" else JSON_MEDIA_TYPE
+
+
+def negotiate_format(accept: str) -> str:
+    """"msgpack" if the client prefers it over JSON (and it's available)."""
+    if ormsgpack is None or not accept:
+        return "json"
+    qualities = {}
+    for part in accept.split(","):
+        media_type, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[media_type.strip().lower()] = quality
+
+    msgpack_q = max(qualities.get(t, 0.0) for t in MSGPACK_MEDIA_TYPES)
+    json_q = qualities.get(
+        JSON_MEDIA_TYPE, qualities.get("application/*", qualities.get("*/*", 0.0))
+    )
+    return "msgpack" if msgpack_q > 0 and msgpack_q >= json_q else "json"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (or MessagePack when negotiated).
+
+    Handlers that return DB rows should return this directly: FastAPI skips
+    jsonable_encoder for Response instances, so rows straight from
+    cursor.fetchall() (datetime, Decimal and all) are encoded in one pass.
+    """
+
+    def render(self, content: Any) -> bytes:
+        fmt = response_format.get()
+        self.media_type = media_type_for(fmt)
+        return render(content, fmt)
+
+
+class ContentNegotiationMiddleware:
+    """Picks JSON or MessagePack from the Accept header for FastJSONResponse.
+
+    Every API response gets ``Vary: Accept`` so caches keep the two apart.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not scope["path"].startswith("/api"):
+            await self.app(scope, receive, send)
+            return
+
+        token = response_format.set(
+            negotiate_format(Headers(scope=scope).get("accept", ""))
+        )
+
+        async def send_with_vary(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=list(message["headers"]))
+                headers.add_vary_header("Accept")
+                message["headers"] = headers.raw
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_vary)
+        finally:
+            response_format.reset(token)
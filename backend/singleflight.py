@@ -0,0 +1,81 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+
+from serialization import media_type_for, render, response_format
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one execution.
+
+    The first caller for a key (the leader) starts ``load`` in a worker
+    thread; callers arriving while it runs await the same task and get the
+    same result, or the same exception. Nothing is cached: the key is
+    released as soon as the call finishes.
+
+    Waiters are shielded from one another. A cancelled caller (client gone,
+    timeout) stops waiting but the load keeps running for the others.
+    Cancellation never reaches the thread either, so it can't leave a DB
+    connection half-used.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        # per route (the first element of the key)
+        self._calls = defaultdict(int)
+        self._executions = defaultdict(int)
+        self._errors = defaultdict(int)
+        self._cancelled = defaultdict(int)
+
+    async def do(self, key: Tuple, load: Callable[[], Any]) -> Any:
+        route = key[0]
+        self._calls[route] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self._executions[route] += 1
+            task = asyncio.ensure_future(run_in_threadpool(load))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, route, done))
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            self._cancelled[route] += 1
+            raise
+
+    def _finished(self, key: Tuple, route: str, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # retrieve the exception even if every waiter was cancelled, so it
+        # isn't reported as "never retrieved"
+        if not task.cancelled() and task.exception() is not None:
+            self._errors[route] += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        routes = {}
+        for route, calls in self._calls.items():
+            executions = self._executions[route]
+            routes[route] = {
+                "calls": calls,
+                "executions": executions,
+                "coalesced": calls - executions,
+                # share of calls served by another caller's execution
+                "coalescing_ratio": round((calls - executions) / calls, 4) if calls else 0.0,
+                "errors": self._errors[route],
+                "cancelled_waiters": self._cancelled[route],
+                "inflight": sum(1 for k in self._inflight if k[0] == route),
+            }
+        return routes
+
+
+async def coalesced_response(flights: SingleFlight, key: Tuple, load: Callable[[], Any]) -> Response:
+    """Respond with ``load()``'s rows, encoded once per negotiated format.
+
+    The format is part of the key, so JSON and MessagePack clients share
+    only with their own kind, and the leader's thread does the encoding.
+    """
+    fmt = response_format.get()
+    body = await flights.do((*key, fmt), lambda: render(load(), fmt))
+    return Response(content=body, media_type=media_type_for(fmt))
@@ -0,0 +1,81 @@
+"""In-memory Skill dictionary: skill_id -> name and category.
+
+Skill is a small seeded table, but post, dashboard and profile responses
+all list skills. ``skill_dictionary`` holds it so those queries read ids
+from PostSkill/UserSkill alone and resolve them here instead of joining
+Skill. The startup warmup (warmup.py) loads it and main.py reloads it with
+the course catalog. A lookup that meets an id it doesn't know yet (a skill
+added since the last load) fetches that row on the spot.
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+SKILLS_SQL = "SELECT skill_id, name, category FROM Skill"
+
+
+def _order(skill: Dict[str, Any]):
+    # as ORDER BY s.category, s.name: NULL first, case-insensitive
+    category = skill.get("category")
+    return (category is not None, (category or "").casefold(), skill["name"].casefold())
+
+
+class SkillDictionary:
+    def __init__(self):
+        self._skills: Dict[int, Dict[str, Any]] = {}
+        self._counters = {"loads": 0, "fetched_on_miss": 0, "unresolved": 0}
+
+    def load(self, cursor) -> "SkillDictionary":
+        """Replace the contents with the Skill table (dictionary cursor)."""
+        cursor.execute(SKILLS_SQL)
+        self._skills = {row["skill_id"]: row for row in cursor.fetchall()}
+        self._counters["loads"] += 1
+        return self
+
+    def resolve(self, cursor, skill_ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+        """Skills by id, fetching the ids not loaded yet in one query."""
+        skills = self._skills
+        missing = self.missing(skill_ids)
+        if not missing:
+            return skills
+        if cursor is None:
+            self._counters["unresolved"] += len(missing)
+            return skills
+        placeholders = ", ".join(["%s"] * len(missing))
+        cursor.execute(f"{SKILLS_SQL} WHERE skill_id IN ({placeholders})", tuple(missing))
+        rows = cursor.fetchall()
+        self._counters["fetched_on_miss"] += len(rows)
+        for row in rows:
+            skills[row["skill_id"]] = row
+        return skills
+
+    def missing(self, skill_ids: Sequence[int]) -> List[int]:
+        """The ids among ``skill_ids`` not loaded yet."""
+        return sorted({i for i in skill_ids if i not in self._skills})
+
+    def names(self, cursor, skill_ids: Sequence[int]) -> List[str]:
+        """Names of ``skill_ids`` in order; ids without a Skill row are left
+        out, as the JOIN did. With ``cursor`` None, unknown ids are never
+        fetched."""
+        skills = self.resolve(cursor, skill_ids)
+        return [skills[i]["name"] for i in skill_ids if i in skills]
+
+    def expand(self, cursor, rows: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """``rows`` with their ``skill_id`` replaced by the skill's name and
+        category, sorted by category then name."""
+        skills = self.resolve(cursor, [row["skill_id"] for row in rows])
+        expanded = []
+        for row in rows:
+            skill = skills.get(row["skill_id"])
+            if skill is None:
+                continue
+            rest = {key: value for key, value in row.items() if key != "skill_id"}
+            expanded.append({"name": skill["name"], "category": skill["category"], **rest})
+        expanded.sort(key=_order)
+        return expanded
+
+    def stats(self) -> Dict[str, Optional[int]]:
+        return {**self._counters, "skills": len(self._skills)}
+
+
+# one per process, shared by the handlers and the batched loaders
+skill_dictionary = SkillDictionary()
@@ -0,0 +1,77 @@
+import mimetypes
+import os
+import stat
+
+from starlette.datastructures import Headers
+from starlette.exceptions import HTTPException
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from compression import choose_encodings
+
+PRECOMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# Vite puts content-hashed bundles here, so they never change under a URL.
+IMMUTABLE_DIR = "assets"
+IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE = "no-cache"
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """Serves the built frontend (frontend/dist).
+
+    * ``foo.js.br`` / ``foo.js.gz`` written by scripts/precompress_assets.py
+      are sent instead of ``foo.js`` when the client accepts that encoding,
+      so no CPU is spent compressing static files per request;
+    * hashed bundles under ``assets/`` are cacheable forever, everything
+      else (index.html) must be revalidated;
+    * unknown non-API paths fall back to index.html for client-side routes.
+    """
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        try:
+            return await super().get_response(path, scope)
+        except HTTPException as exc:
+            if exc.status_code != 404 or path == "api" or path.startswith("api/"):
+                raise
+            return await super().get_response("index.html", scope)
+
+    def file_response(self, full_path, stat_result, scope, status_code=200) -> Response:
+        full_path = os.fspath(full_path)
+        content_type, _ = mimetypes.guess_type(full_path)
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+
+        response = None
+        encoding = None
+        for encoding in choose_encodings(accept_encoding, tuple(PRECOMPRESSED_SUFFIXES)):
+            sibling = full_path + PRECOMPRESSED_SUFFIXES[encoding]
+            try:
+                sibling_stat = os.stat(sibling)
+            except OSError:
+                continue
+            if stat.S_ISREG(sibling_stat.st_mode):
+                response = super().file_response(sibling, sibling_stat, scope, status_code)
+                break
+
+        if response is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+        else:
+            response.headers["Content-Encoding"] = encoding
+            if content_type:
+                if content_type.startswith("text/"):
+                    content_type += "; charset=utf-8"
+                response.headers["Content-Type"] = content_type
+
+        if any(
+            os.path.exists(full_path + suffix)
+            for suffix in PRECOMPRESSED_SUFFIXES.values()
+        ):
+            response.headers.add_vary_header("Accept-Encoding")
+
+        relative = os.path.relpath(full_path, self.directory)
+        immutable = relative.split(os.sep, 1)[0] == IMMUTABLE_DIR
+        response.headers["Cache-Control"] = (
+            IMMUTABLE_CACHE if immutable else REVALIDATE_CACHE
+        )
+        return response
@@ -0,0 +1,125 @@
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from mysql.connector import Error
+
+from config import STREAM_BATCH_SIZE
+from serialization import dumps
+
+STREAM_MEDIA_TYPES = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def parse_stream_format(stream: Optional[str]) -> Optional[str]:
+    """Validate the ``stream`` query parameter; None means a buffered response."""
+    if stream is None:
+        return None
+    stream = stream.lower()
+    if stream not in STREAM_MEDIA_TYPES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"stream must be one of: {', '.join(STREAM_MEDIA_TYPES)}",
+        )
+    return stream
+
+
+def iter_rows(cursor, batch_size: int = STREAM_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Yield rows from an unbuffered cursor, ``batch_size`` at a time."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield from rows
+
+
+# a chunk is sent once it holds STREAM_BATCH_SIZE rows or this many bytes,
+# so StreamingResponse and the compression middleware work per chunk, not
+# per row
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def _json_array(rows: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    first = True
+    yield b"["
+    for row in rows:
+        yield dumps(row) if first else b"," + dumps(row)
+        first = False
+    yield b"]"
+
+
+def _encode(conn, cursor, rows: Iterable[Dict[str, Any]], stream_format: str):
+    finished = False
+    buffer = []
+    size = 0
+    try:
+        if stream_format == "ndjson":
+            parts = (dumps(row) + b"\n" for row in rows)
+        else:
+            parts = _json_array(rows)
+        for part in parts:
+            buffer.append(part)
+            size += len(part)
+            if len(buffer) >= STREAM_BATCH_SIZE or size >= STREAM_CHUNK_BYTES:
+                yield b"".join(buffer)
+                buffer = []
+                size = 0
+        finished = True
+        if buffer:
+            yield b"".join(buffer)
+    except Error as e:
+        # Headers are already out, so the status can't change; leave the
+        # body unterminated (json) or end it with an error line (ndjson).
+        print(f"[ERROR] Streaming response aborted: {e}")
+        if stream_format == "ndjson":
+            buffer.append(dumps({"error": "Database error while streaming"}) + b"\n")
+        if buffer:
+            yield b"".join(buffer)
+    finally:
+        if finished:
+            cursor.close()
+            try:
+                conn.close()
+            except Error as e:
+                print(f"[WARNING] Failed to close streaming connection: {e}")
+        else:
+            _discard(conn)
+
+
+def _discard(conn) -> None:
+    """Hand back a connection that still has unread rows, disconnected.
+
+    Neither the cursor nor the pool's session reset can get past the
+    pending rows, and draining them could mean reading the rest of the
+    result. Closing the server connection drops them; the pool reconnects
+    it on its next checkout.
+    """
+    # PooledMySQLConnection wraps the actual connection
+    cnx = getattr(conn, "_cnx", None) or conn
+    try:
+        cnx.disconnect()
+    except Error as e:
+        print(f"[WARNING] Failed to disconnect streaming connection: {e}")
+    try:
+        conn.close()
+    except Error:
+        # the pool's session reset fails on a closed connection; close()
+        # returns it to the pool regardless
+        pass
+
+
+def stream_rows(
+    conn, cursor, rows: Iterable[Dict[str, Any]], stream_format: str
+) -> StreamingResponse:
+    """Stream ``rows`` as a JSON array or NDJSON.
+
+    The response takes ownership of ``conn`` and ``cursor`` and closes them
+    once the last row is sent (or the client goes away), so the handler must
+    not close them itself.
+    """
+    return StreamingResponse(
+        _encode(conn, cursor, rows, stream_format),
+        media_type=STREAM_MEDIA_TYPES[stream_format],
+    )
@@ -0,0 +1,134 @@
+"""Per-user post activity feed kept in UserPostActivity.
+
+One row per (user, post, interaction): 'created' for the author and
+'commented' for anyone with a visible comment on the post. The post and
+comment write handlers fan these rows out in their own transaction, so
+"my posts" is a single range scan of ``idx_activity_feed`` instead of
+sp_get_user_post_interactions' UNION of two DISTINCT selects.
+
+``ts`` is the post's created_at for both kinds, which keeps the order the
+procedure used (newest post first). scripts/rebuild_user_activity.py
+rebuilds the table from Post and Comment.
+"""
+
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+
+from fastapi import HTTPException
+
+INTERACTION_TYPES = ("created", "commented")
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS UserPostActivity (
+    user_id          INT NOT NULL,
+    post_id          INT NOT NULL,
+    interaction_type ENUM('created', 'commented') NOT NULL,
+    ts               DATETIME NOT NULL,
+    PRIMARY KEY (user_id, post_id, interaction_type),
+    KEY idx_activity_feed (user_id, ts, post_id, interaction_type),
+    KEY idx_activity_post (post_id),
+    FOREIGN KEY (user_id) REFERENCES User(user_id),
+    FOREIGN KEY (post_id) REFERENCES Post(post_id)
+)
+"""
+
+_CREATED_SELECT = """
+    SELECT p.user_id, p.post_id, 'created', p.created_at
+    FROM Post p
+"""
+
+_COMMENTED_SELECT = """
+    SELECT DISTINCT c.user_id, p.post_id, 'commented', p.created_at
+    FROM Comment c
+    JOIN Post p ON c.post_id = p.post_id
+    WHERE (c.status IS NULL OR c.status != 'deleted')
+"""
+
+
+def record_post(cursor, post_id: int) -> None:
+    """Add the author's 'created' row for a newly inserted post."""
+    cursor.execute(
+        "INSERT IGNORE INTO UserPostActivity (user_id, post_id, interaction_type, ts)"
+        + _CREATED_SELECT
+        + " WHERE p.post_id = %s",
+        (post_id,),
+    )
+
+
+def record_comment(cursor, user_id: int, post_id: int) -> None:
+    """Add a 'commented' row; repeat comments on the same post are no-ops."""
+    cursor.execute(
+        """
+        INSERT IGNORE INTO UserPostActivity (user_id, post_id, interaction_type, ts)
+        SELECT %s, post_id, 'commented', created_at FROM Post WHERE post_id = %s
+        """,
+        (user_id, post_id),
+    )
+
+
+def forget_comment(cursor, user_id: int, post_id: int) -> None:
+    """Drop the 'commented' row once the user has no visible comment left."""
+    cursor.execute(
+        """
+        DELETE FROM UserPostActivity
+        WHERE user_id = %s AND post_id = %s AND interaction_type = 'commented'
+          AND NOT EXISTS (
+              SELECT 1 FROM Comment
+              WHERE user_id = %s AND post_id = %s
+                AND (status IS NULL OR status != 'deleted')
+          )
+        """,
+        (user_id, post_id, user_id, post_id),
+    )
+
+
+def forget_post(cursor, post_id: int) -> None:
+    cursor.execute("DELETE FROM UserPostActivity WHERE post_id = %s", (post_id,))
+
+
+def rebuild(cursor, user_id: Optional[int] = None) -> None:
+    """Recompute the feed for one user, or for everyone when user_id is None."""
+    if user_id is None:
+        cursor.execute("DELETE FROM UserPostActivity")
+        created_filter, commented_filter, params = "", "", ()
+    else:
+        cursor.execute("DELETE FROM UserPostActivity WHERE user_id = %s", (user_id,))
+        created_filter = " WHERE p.user_id = %s"
+        commented_filter = " AND c.user_id = %s"
+        params = (user_id, user_id)
+    cursor.execute(
+        "INSERT INTO UserPostActivity (user_id, post_id, interaction_type, ts)"
+        + _CREATED_SELECT
+        + created_filter
+        + " UNION ALL "
+        + _COMMENTED_SELECT
+        + commented_filter,
+        params,
+    )
+
+
+def encode_cursor(row) -> str:
+    """Opaque keyset cursor pointing just past ``row`` (a feed row)."""
+    raw = f"{row['created_at'].isoformat()}|{row['post_id']}|{row['interaction_type']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int, int]:
+    """(ts, post_id, interaction_type) bound for the keyset comparison.
+
+    The interaction type is returned as its ENUM index: ORDER BY sorts ENUMs
+    by index, so comparing against the string would disagree with it.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, post_id, interaction_type = raw.split("|")
+        if interaction_type not in INTERACTION_TYPES:
+            raise ValueError(interaction_type)
+        return (
+            datetime.fromisoformat(ts),
+            int(post_id),
+            INTERACTION_TYPES.index(interaction_type) + 1,
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
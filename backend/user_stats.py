@@ -0,0 +1,170 @@
+"""Per-user profile counters kept in UserStats.
+
+The write handlers keep rows current inside their own transaction:
+request and post counters move by deltas (``adjust``), while the set-based
+team/course counts are recomputed for the affected users
+(``refresh_memberships``). A missing row is rebuilt on first read, and
+scripts/rebuild_user_stats.py rebuilds or verifies the whole table.
+"""
+
+from typing import Any, Dict, Iterable, Optional
+
+STATS_COLUMNS = (
+    "post_count",
+    "team_count",
+    "active_courses",
+    "open_requests",
+    "successful_matches",
+    "total_requests",
+)
+
+CREATE_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS UserStats (
+    user_id            INT PRIMARY KEY,
+    post_count         INT NOT NULL DEFAULT 0,
+    team_count         INT NOT NULL DEFAULT 0,
+    active_courses     INT NOT NULL DEFAULT 0,
+    open_requests      INT NOT NULL DEFAULT 0,
+    successful_matches INT NOT NULL DEFAULT 0,
+    total_requests     INT NOT NULL DEFAULT 0,
+    updated_at         TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES User(user_id)
+)
+"""
+
+
+def _only(column: str, single_user: bool) -> str:
+    return f" AND {column} = %(user_id)s" if single_user else ""
+
+
+def _membership_tables(single_user: bool) -> str:
+    # open teams the user belongs to, and distinct courses across those
+    # teams and the user's own posts (what "Active Courses" shows)
+    return f"""
+        LEFT JOIN (
+            SELECT tm.user_id, COUNT(*) AS team_count
+            FROM TeamMember tm
+            JOIN Team t ON tm.team_id = t.team_id
+            WHERE (t.status IS NULL OR t.status = 'open'){_only("tm.user_id", single_user)}
+            GROUP BY tm.user_id
+        ) tc ON tc.user_id = {{key}}
+        LEFT JOIN (
+            SELECT user_id, COUNT(DISTINCT course_id) AS active_courses
+            FROM (
+                SELECT tm.user_id, t.course_id
+                FROM TeamMember tm
+                JOIN Team t ON tm.team_id = t.team_id
+                WHERE (t.status IS NULL OR t.status = 'open'){_only("tm.user_id", single_user)}
+                UNION
+                SELECT p.user_id, t.course_id
+                FROM Post p
+                JOIN Team t ON p.team_id = t.team_id
+                WHERE 1 = 1{_only("p.user_id", single_user)}
+            ) AS user_courses
+            GROUP BY user_id
+        ) ac ON ac.user_id = {{key}}
+    """
+
+
+def _select_sql(single_user: bool) -> str:
+    """Recompute every counter from the base tables."""
+    return f"""
+        SELECT
+            u.user_id,
+            COALESCE(pc.post_count, 0) AS post_count,
+            COALESCE(tc.team_count, 0) AS team_count,
+            COALESCE(ac.active_courses, 0) AS active_courses,
+            COALESCE(rq.open_requests, 0) AS open_requests,
+            COALESCE(rq.successful_matches, 0) AS successful_matches,
+            COALESCE(rq.total_requests, 0) AS total_requests
+        FROM User u
+        LEFT JOIN (
+            SELECT user_id, COUNT(*) AS post_count
+            FROM Post
+            WHERE 1 = 1{_only("user_id", single_user)}
+            GROUP BY user_id
+        ) pc ON pc.user_id = u.user_id
+        {_membership_tables(single_user).format(key="u.user_id")}
+        LEFT JOIN (
+            SELECT
+                from_user_id,
+                SUM(status = 'pending') AS open_requests,
+                SUM(status = 'accepted') AS successful_matches,
+                COUNT(*) AS total_requests
+            FROM MatchRequest
+            WHERE 1 = 1{_only("from_user_id", single_user)}
+            GROUP BY from_user_id
+        ) rq ON rq.from_user_id = u.user_id
+        {"WHERE u.user_id = %(user_id)s" if single_user else ""}
+    """
+
+
+def _rebuild_sql(single_user: bool) -> str:
+    columns = ", ".join(STATS_COLUMNS)
+    updates = ", ".join(f"{c} = VALUES({c})" for c in STATS_COLUMNS)
+    return f"""
+        INSERT INTO UserStats (user_id, {columns}, updated_at)
+        SELECT computed.*, NOW() FROM ({_select_sql(single_user)}) AS computed
+        ON DUPLICATE KEY UPDATE {updates}, updated_at = NOW()
+    """
+
+
+REFRESH_MEMBERSHIPS_SQL = f"""
+    UPDATE UserStats us
+    {_membership_tables(True).format(key="us.user_id")}
+    SET us.team_count = COALESCE(tc.team_count, 0),
+        us.active_courses = COALESCE(ac.active_courses, 0),
+        us.updated_at = NOW()
+    WHERE us.user_id = %(user_id)s
+"""
+
+
+def compute(cursor, user_id: Optional[int] = None) -> None:
+    """Run the from-scratch computation; rows are left on ``cursor``."""
+    if user_id is None:
+        cursor.execute(_select_sql(False))
+    else:
+        cursor.execute(_select_sql(True), {"user_id": user_id})
+
+
+def rebuild(cursor, user_id: Optional[int] = None) -> int:
+    """Recompute UserStats for one user, or for everyone when user_id is None."""
+    if user_id is None:
+        cursor.execute(_rebuild_sql(False))
+    else:
+        cursor.execute(_rebuild_sql(True), {"user_id": user_id})
+    return cursor.rowcount
+
+
+def adjust(cursor, user_id: Optional[int], **deltas: int) -> None:
+    """Apply counter deltas; a user without a row is rebuilt on next read."""
+    deltas = {k: v for k, v in deltas.items() if v}
+    if user_id is None or not deltas:
+        return
+    for column in deltas:
+        if column not in STATS_COLUMNS:
+            raise ValueError(f"Unknown UserStats column: {column}")
+    assignments = ", ".join(f"{c} = GREATEST({c} + %s, 0)" for c in deltas)
+    cursor.execute(
+        f"UPDATE UserStats SET {assignments}, updated_at = NOW() WHERE user_id = %s",
+        (*deltas.values(), user_id),
+    )
+
+
+def refresh_memberships(cursor, user_ids: Iterable[int]) -> None:
+    """Recompute team_count/active_courses after team or post changes."""
+    for user_id in sorted(set(u for u in user_ids if u is not None)):
+        cursor.execute(REFRESH_MEMBERSHIPS_SQL, {"user_id": user_id})
+
+
+def load(conn, cursor, user_id: int) -> Dict[str, Any]:
+    """Read a user's counters (dictionary cursor), building the row if missing."""
+    query = f"SELECT {', '.join(STATS_COLUMNS)} FROM UserStats WHERE user_id = %s"
+    cursor.execute(query, (user_id,))
+    row = cursor.fetchone()
+    if row is None:
+        rebuild(cursor, user_id)
+        conn.commit()
+        cursor.execute(query, (user_id,))
+        row = cursor.fetchone()
+    return row or {column: 0 for column in STATS_COLUMNS}
@@ -0,0 +1,81 @@
+"""Startup warmup: fill the caches before the process reports ready.
+
+``Warmup.run()`` is started from the app lifespan and runs its steps in
+the background, so /api/live answers at once. Each step's time is logged
+and kept for /api/ready, which stays 503 until every step has succeeded.
+Failed steps (typically: MySQL not up yet) are retried every
+``retry_interval`` seconds.
+"""
+
+import asyncio
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+PROCEDURE_NAME = re.compile(r"CREATE\s+PROCEDURE\s+`?(\w+)`?", re.IGNORECASE)
+
+
+class Warmup:
+    def __init__(
+        self,
+        steps: Sequence[Tuple[str, Callable[[], Awaitable[Any]]]],
+        retry_interval: float = 5.0,
+    ):
+        self.steps = list(steps)
+        self.retry_interval = retry_interval
+        self.done = False
+        self.total_ms = None
+        self._results: Dict[str, Dict[str, Any]] = {}
+
+    async def _run_step(self, name: str, step: Callable[[], Awaitable[Any]]) -> bool:
+        started = time.perf_counter()
+        try:
+            detail = await step()
+        except Exception as e:
+            elapsed = round((time.perf_counter() - started) * 1000, 1)
+            print(f"[WARN] Warmup step {name} failed after {elapsed} ms: {getattr(e, 'detail', e)}")
+            self._results[name] = {"ok": False, "ms": elapsed, "error": str(getattr(e, "detail", e))}
+            return False
+        elapsed = round((time.perf_counter() - started) * 1000, 1)
+        print(f"[INFO] Warmup step {name}: {elapsed} ms")
+        self._results[name] = {"ok": True, "ms": elapsed}
+        if detail is not None:
+            self._results[name]["detail"] = detail
+        return True
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+        pending = self.steps
+        while True:
+            failed = []
+            for name, step in pending:
+                if not await self._run_step(name, step):
+                    failed.append((name, step))
+            if not failed:
+                break
+            pending = failed
+            await asyncio.sleep(self.retry_interval)
+        self.total_ms = round((time.perf_counter() - started) * 1000, 1)
+        self.done = True
+        print(f"[INFO] Warmup complete in {self.total_ms} ms")
+
+    def status(self) -> Dict[str, Any]:
+        return {"done": self.done, "total_ms": self.total_ms, "steps": self._results}
+
+
+def expected_procedures(sql_path: str) -> List[str]:
+    """Procedure names defined in a .sql file (doc/src/stored_procedures.sql)."""
+    with open(sql_path, encoding="utf-8") as f:
+        return PROCEDURE_NAME.findall(f.read())
+
+
+def missing_procedures(cursor, names: Sequence[str]) -> List[str]:
+    cursor.execute(
+        """
+        SELECT ROUTINE_NAME
+        FROM information_schema.ROUTINES
+        WHERE ROUTINE_SCHEMA = DATABASE() AND ROUTINE_TYPE = 'PROCEDURE'
+        """
+    )
+    present = {row[0] for row in cursor.fetchall()}
+    return [name for name in names if name not in present]
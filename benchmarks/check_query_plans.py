@@ -0,0 +1,524 @@
+#!/usr/bin/env python3
+"""Query-plan regression checks for every SQL statement in the backend.
+
+Statements are extracted from ``SOURCE_PATHS`` with ``ast`` rather than copied, so an
+edited query is checked as written:
+
+* each ``cursor.execute(...)`` site is named ``<function>.<variable>`` (or
+  ``<function>.sql<n>`` for inline literals);
+* queries built with ``query += ...`` are checked with every optional
+  fragment appended (``else`` branches are skipped), i.e. all filters on;
+* f-string queries get the representative fill-in from ``FSTRING_FILLERS``;
+* INSERT/SET statements and ``callproc`` sites have no plan and are skipped.
+
+Statements built at run time by the helper modules (user stats, activity
+feed, term archive, course catalog, skill dictionary) can't be read from the
+source; ``helper_calls()`` runs those helpers against a cursor that records
+what they execute, and each recorded statement is named
+``<module>.<function>`` (``#<n>`` for the n-th one) and checked with the
+parameters the helper passed.
+
+Placeholders are bound to sample values chosen by the column they are
+compared against, then ``EXPLAIN`` runs against a local database seeded by
+seed_local_db.py. Each plan is checked against the rules below and compared
+with its snapshot in benchmarks/query_plans/<name>.json; changes are printed
+as a unified diff.
+
+Usage (from the repository root):
+    python benchmarks/check_query_plans.py --password <pw> --reseed
+    python benchmarks/check_query_plans.py --password <pw> --update   # accept new plans
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import difflib
+import json
+import re
+import sys
+from pathlib import Path
+
+from seed_local_db import ROOT_DIR, TERM, add_db_arguments, db_config_from_args, seed
+
+sys.path.insert(0, str(ROOT_DIR / "backend"))
+
+SOURCE_PATHS = [
+    ROOT_DIR / "backend" / "main.py",
+    # batched loaders behind ?include= and the batch endpoints
+    ROOT_DIR / "backend" / "hydration.py",
+]
+SNAPSHOT_DIR = Path(__file__).resolve().parent / "query_plans"
+
+# A plan may never read these tables with a full table or full index scan
+WATCHED_TABLES = {"Post", "MatchRequest", "Comment"}
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+# Per-query overrides:
+#   allow_full_scan: {alias: reason} exemptions from the WATCHED_TABLES rule
+#   keys:            {alias: index} the index the optimizer is expected to pick
+EXPECTATIONS = {
+    "load_posts.query": {"keys": {"p": "PRIMARY"}},
+    "load_post_skills.query": {"keys": {"ps": "PRIMARY"}},
+    "load_post_comments.query": {"keys": {"c": "idx_comment_post_status_created"}},
+    "load_teams.query": {"keys": {"t": "PRIMARY"}},
+    "search_posts.query": {"keys": {"p": "team_id"}},
+    "load_popular_courses.query": {"keys": {"p": "team_id"}},
+    # secondary indexes from scripts/migrations/
+    "get_post_comments.comment_query": {"keys": {"c": "idx_comment_post_status_created"}},
+    "get_user_match_requests.query": {
+        "keys": {"mr": "idx_matchrequest_from_user_created"}
+    },
+    "get_user_posts.query": {"keys": {"a": "idx_activity_feed"}},
+    "get_user_received_requests.query": {"keys": {"p": "user_id"}},
+    "delete_post.verify_query": {"keys": {"Post": "PRIMARY"}},
+    # recorded from the helper modules, see helper_calls()
+    "user_stats.load": {"keys": {"UserStats": "PRIMARY"}},
+    "user_stats.adjust": {"keys": {"UserStats": "PRIMARY"}},
+}
+
+FSTRING_FILLERS = {
+    "update_profile.update_query": "display_name = %s",
+    "update_post.update_query": "title = %s, updated_at = NOW()",
+    # select lists narrowed by ?fields= (backend/projection.py)
+    "load_popular_posts.query": "p.post_id, COUNT(DISTINCT mr.request_id) AS request_count, "
+    "COUNT(DISTINCT cm.comment_id) AS comment_count, p.title, p.created_at",
+    "search_posts.query": "p.post_id, p.title, p.created_at",
+    "get_user_posts.query": "a.post_id, p.title, a.ts AS created_at, a.interaction_type",
+    "get_user_match_requests.query": "mr.request_id, mr.status, mr.created_at",
+    # IN lists from backend/hydration.py, checked with a single id
+    "load_posts.query": "%s",
+    "load_post_skills.query": "%s",
+    "load_post_comments.query": "%s",
+    "load_teams.query": "%s",
+    "load_team_members.query": "%s",
+    "load_users.query": "%s",
+    "load_user_skills.query": "%s",
+}
+
+SAMPLE_VALUES = {
+    "user_id": 222,
+    "from_user_id": 222,
+    "post_id": 1,
+    "team_id": 2,
+    "to_team_id": 2,
+    "request_id": 1,
+    "comment_id": 759,
+    "parent_comment_id": 759,
+    "term_id": TERM["term_id"],
+    "course_id": "sp25IS100",
+    "crn": "71441",
+    "section_id": "71441",
+    "email": "kmiller1@illinois.edu",
+    "netid": "kmiller1",
+    "team_name": "IS100-Zealous",
+    "subject": "IS",
+    "number": "100",
+    "status": "pending",
+}
+
+PLAN_FIELDS = ["id", "select_type", "table", "type", "possible_keys", "key", "ref", "Extra"]
+
+PLACEHOLDER_CONTEXT = re.compile(
+    r"([A-Za-z_]\w*)\)?\s*(=|!=|<>|>=|<=|LIKE|IN\s*\()\s*$", re.IGNORECASE
+)
+TABLE_ALIAS = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE)\s+([A-Za-z_]\w*)(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|SET\b|JOIN\b|LEFT\b|INNER\b|GROUP\b|ORDER\b|LIMIT\b)([A-Za-z_]\w*))?",
+    re.IGNORECASE,
+)
+
+
+class QueryExtractor(ast.NodeVisitor):
+    """Collect execute() sites of one function in source order."""
+
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+        self.strings = {}
+        self.fragments = {}
+        self.sites = []
+        self.procedures = []
+        self._names_used = {}
+        self._literal_count = 0
+        self._in_else = 0
+
+    def _string_value(self, node, name):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            return node.value
+        if isinstance(node, ast.JoinedStr):
+            filler = FSTRING_FILLERS.get(f"{self.function_name}.{name}")
+            if filler is None:
+                return None
+            parts = []
+            for value in node.values:
+                if isinstance(value, ast.Constant):
+                    parts.append(value.value)
+                else:
+                    parts.append(filler)
+            return "".join(parts)
+        return None
+
+    def visit_If(self, node):
+        self.visit(node.test)
+        for child in node.body:
+            self.visit(child)
+        self._in_else += 1
+        for child in node.orelse:
+            self.visit(child)
+        self._in_else -= 1
+
+    def visit_Assign(self, node):
+        target = node.targets[0]
+        if isinstance(target, ast.Name):
+            value = self._string_value(node.value, target.id)
+            if value is not None:
+                self.strings[target.id] = value
+                self.fragments[target.id] = []
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if (
+            isinstance(node.target, ast.Name)
+            and isinstance(node.op, ast.Add)
+            and isinstance(node.value, ast.Constant)
+            and isinstance(node.value.value, str)
+            and not self._in_else
+        ):
+            self.fragments.setdefault(node.target.id, []).append(node.value.value)
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        func = node.func
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.value.id == "cursor"
+            and node.args
+        ):
+            arg = node.args[0]
+            if func.attr == "callproc" and isinstance(arg, ast.Constant):
+                self.procedures.append(arg.value)
+            elif func.attr == "execute":
+                self._add_site(arg)
+        self.generic_visit(node)
+
+    def _add_site(self, arg):
+        if isinstance(arg, ast.Name):
+            base = arg.id
+            sql = self.strings.get(base)
+            if sql is not None:
+                sql += "".join(self.fragments.get(base, []))
+        elif isinstance(arg, ast.Constant) and isinstance(arg.value, str):
+            self._literal_count += 1
+            base = f"sql{self._literal_count}"
+            sql = arg.value
+        else:
+            return
+        seen = self._names_used.get(base, 0) + 1
+        self._names_used[base] = seen
+        name = f"{self.function_name}.{base}" + (f"#{seen}" if seen > 1 else "")
+        self.sites.append((name, sql))
+
+
+def extract_queries(path: Path):
+    """Return ([(name, sql)], [procedure names]) for every function in path."""
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    sites = []
+    procedures = []
+    for node in tree.body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            extractor = QueryExtractor(node.name)
+            for statement in node.body:
+                extractor.visit(statement)
+            sites.extend(extractor.sites)
+            procedures.extend(f"{node.name} -> {p}" for p in extractor.procedures)
+    return sites, procedures
+
+
+class RecordingCursor:
+    """Stands in for a tuple cursor: records statements instead of running them."""
+
+    rowcount = 0
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, params))
+
+    def fetchone(self):
+        return (0,)
+
+    def fetchall(self):
+        return []
+
+
+def helper_calls():
+    """{label: fn(cursor)} running each SQL helper once with sample arguments."""
+    import archive
+    import user_activity
+    import user_stats
+    from catalog import CourseCatalog
+    from skills import SkillDictionary
+
+    user_id = SAMPLE_VALUES["user_id"]
+    post_id = SAMPLE_VALUES["post_id"]
+    term_id = SAMPLE_VALUES["term_id"]
+    live = {table: table for table in archive.ARCHIVED_TABLES}
+    posts_sql, requests_sql, term_params = archive.history_queries(term_id)
+    return {
+        "user_stats.compute": lambda cursor: user_stats.compute(cursor, user_id),
+        "user_stats.rebuild": lambda cursor: user_stats.rebuild(cursor, user_id),
+        "user_stats.adjust": lambda cursor: user_stats.adjust(cursor, user_id, post_count=1),
+        "user_stats.refresh_memberships": lambda cursor: user_stats.refresh_memberships(
+            cursor, [user_id]
+        ),
+        "user_stats.load": lambda cursor: user_stats.load(None, cursor, user_id),
+        "user_activity.forget_comment": lambda cursor: user_activity.forget_comment(
+            cursor, user_id, post_id
+        ),
+        "user_activity.forget_post": lambda cursor: user_activity.forget_post(cursor, post_id),
+        "user_activity.rebuild": lambda cursor: user_activity.rebuild(cursor, user_id),
+        "archive.closed_terms": archive.closed_terms,
+        "archive.is_closed": lambda cursor: archive.is_closed(cursor, term_id),
+        "archive._post_chunk": lambda cursor: archive._post_chunk(cursor, "Post", term_id, 0, 500),
+        "archive._request_chunk": lambda cursor: archive._request_chunk(
+            cursor, "MatchRequest", term_id, 0, 500
+        ),
+        "archive._affected_users": lambda cursor: archive._affected_users(
+            cursor, live, "%s", [post_id]
+        ),
+        "archive._move_chunk": lambda cursor: archive._move_chunk(cursor, [post_id], False),
+        "archive._move_request_chunk": lambda cursor: archive._move_request_chunk(
+            cursor, [SAMPLE_VALUES["request_id"]], False
+        ),
+        "archive.archived_terms": archive.archived_terms,
+        # as get_user_history runs them
+        "archive.history_posts": lambda cursor: cursor.execute(
+            posts_sql, (user_id, *term_params)
+        ),
+        "archive.history_requests": lambda cursor: cursor.execute(
+            requests_sql, (user_id, *term_params)
+        ),
+        "catalog.load": CourseCatalog.load,
+        "skills.load": lambda cursor: SkillDictionary().load(cursor),
+        "skills.resolve": lambda cursor: SkillDictionary().resolve(cursor, [1]),
+    }
+
+
+def record_helpers():
+    """Return [(name, sql, params)] for the statements of every helper call."""
+    sites = []
+    for label, call in helper_calls().items():
+        cursor = RecordingCursor()
+        call(cursor)
+        for index, (sql, params) in enumerate(cursor.statements, start=1):
+            name = label + (f"#{index}" if index > 1 else "")
+            sites.append((name, sql, params))
+    return sites
+
+
+def extract_sources():
+    """Return ([(name, sql, params)], [procedure calls]); params None means
+    sample values are bound by column."""
+    sites = []
+    procedures = []
+    for path in SOURCE_PATHS:
+        path_sites, path_procedures = extract_queries(path)
+        sites.extend((name, sql, None) for name, sql in path_sites)
+        procedures.extend(path_procedures)
+    sites.extend(record_helpers())
+    return sites, procedures
+
+
+def normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+def sample_params(sql: str):
+    params = []
+    for match in re.finditer(r"%s", sql):
+        before = sql[: match.start()]
+        if re.search(r"LIMIT\s*$", before, re.IGNORECASE):
+            params.append(10)
+            continue
+        context = PLACEHOLDER_CONTEXT.search(before)
+        column = context.group(1) if context else ""
+        operator = context.group(2).upper() if context else ""
+        if operator == "LIKE":
+            params.append("%CS%")
+        elif column in SAMPLE_VALUES:
+            params.append(SAMPLE_VALUES[column])
+        elif column.endswith("_id"):
+            params.append(1)
+        else:
+            params.append("x")
+    return tuple(params)
+
+
+def table_aliases(sql: str) -> dict:
+    aliases = {}
+    for table, alias in TABLE_ALIAS.findall(sql):
+        aliases[alias or table] = table
+        aliases[table] = table
+    return aliases
+
+
+def explain(cursor, sql: str, params=None) -> list:
+    if params is None:
+        params = sample_params(sql)
+    cursor.execute("EXPLAIN " + sql, params)
+    rows = cursor.fetchall()
+    return [{field: row.get(field) for field in PLAN_FIELDS} for row in rows]
+
+
+def check_plan(name: str, sql: str, plan: list) -> list:
+    problems = []
+    aliases = table_aliases(sql)
+    expectation = EXPECTATIONS.get(name, {})
+    allowed = expectation.get("allow_full_scan", {})
+    for row in plan:
+        alias = row["table"]
+        table = aliases.get(alias)
+        if table in WATCHED_TABLES and row["type"] in FULL_SCAN_TYPES and alias not in allowed:
+            problems.append(f"full scan ({row['type']}) on {table} AS {alias}")
+    by_alias = {row["table"]: row for row in plan}
+    for alias, key in expectation.get("keys", {}).items():
+        row = by_alias.get(alias)
+        if row is None:
+            problems.append(f"expected {alias} in plan, it is missing")
+        elif row["key"] != key:
+            problems.append(f"expected {alias} to use index {key}, plan uses {row['key']}")
+    return problems
+
+
+def snapshot_diff(name: str, plan: list, update: bool):
+    path = SNAPSHOT_DIR / f"{name}.json"
+    rendered = json.dumps(plan, indent=2, sort_keys=True) + "\n"
+    if update:
+        SNAPSHOT_DIR.mkdir(parents=True, exist_ok=True)
+        path.write_text(rendered, encoding="utf-8")
+        return None
+    if not path.exists():
+        return f"no snapshot (run with --update to record {path.name})"
+    previous = path.read_text(encoding="utf-8")
+    if previous == rendered:
+        return None
+    return "".join(
+        difflib.unified_diff(
+            previous.splitlines(keepends=True),
+            rendered.splitlines(keepends=True),
+            fromfile=f"{path.name} (snapshot)",
+            tofile=f"{path.name} (current)",
+        )
+    )
+
+
+def run(args) -> int:
+    import mysql.connector
+
+    sites, procedures = extract_sources()
+    conn = mysql.connector.connect(**db_config_from_args(args))
+    cursor = conn.cursor(dictionary=True)
+
+    failures = 0
+    checked = 0
+    skipped = []
+    known = set()
+    try:
+        for name, sql, params in sites:
+            if args.only and not any(pattern in name for pattern in args.only):
+                continue
+            if sql is None:
+                skipped.append((name, "query text is not statically known"))
+                continue
+            verb = normalize(sql).split(" ", 1)[0].upper()
+            if verb not in ("SELECT", "UPDATE", "DELETE"):
+                skipped.append((name, f"{verb} has no plan"))
+                continue
+            known.add(name)
+            try:
+                plan = explain(cursor, sql, params)
+            except mysql.connector.Error as err:
+                failures += 1
+                print(f"✗ {name}: EXPLAIN failed: {err}")
+                continue
+            checked += 1
+            problems = check_plan(name, sql, plan)
+            diff = snapshot_diff(name, plan, args.update)
+            if problems or diff:
+                failures += 1
+                print(f"✗ {name}")
+                for problem in problems:
+                    print(f"    - {problem}")
+                if diff:
+                    print("    " + diff.replace("\n", "\n    ").rstrip())
+            elif args.verbose:
+                print(f"✓ {name}")
+        # rolled back so EXPLAIN of UPDATE/DELETE can never leave a trace
+        conn.rollback()
+    finally:
+        cursor.close()
+        conn.close()
+
+    stale = sorted(
+        path.stem
+        for path in SNAPSHOT_DIR.glob("*.json")
+        if path.stem not in known and not args.only
+    )
+    for name in stale:
+        print(f"? snapshot {name}.json no longer matches a statement in the backend")
+        if args.update:
+            (SNAPSHOT_DIR / f"{name}.json").unlink()
+
+    print(
+        f"\nChecked {checked} statements, {failures} failing, "
+        f"{len(skipped)} skipped, {len(procedures)} stored procedure calls not explained"
+    )
+    if args.verbose:
+        for name, reason in skipped:
+            print(f"  skipped {name}: {reason}")
+        for call in procedures:
+            print(f"  procedure {call}")
+    return 1 if failures and not args.update else 0
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_db_arguments(parser)
+    parser.add_argument(
+        "--reseed",
+        action="store_true",
+        help="Recreate and seed the database first (seed_local_db.py --reset)",
+    )
+    parser.add_argument(
+        "--update", action="store_true", help="Rewrite snapshots with the current plans"
+    )
+    parser.add_argument(
+        "--only", nargs="*", help="Only check statements whose name contains one of these"
+    )
+    parser.add_argument("--list", action="store_true", help="List extracted statements and exit")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args()
+    args.reset = True
+    args.bulk = False
+    args.seed = 411
+    args.data_dir = str(ROOT_DIR / "data")
+    return args
+
+
+def main() -> int:
+    args = parse_args()
+    if args.list:
+        sites, procedures = extract_sources()
+        for name, sql, _params in sites:
+            print(f"{name}: {normalize(sql)[:100] if sql else '<dynamic>'}")
+        for call in procedures:
+            print(f"procedure {call}")
+        return 0
+    if args.reseed:
+        seed(args)
+    return run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
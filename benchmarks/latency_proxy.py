@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""TCP proxy that adds latency and jitter between the backend and MySQL.
+
+Each chunk is held for ``rtt/2 +/- jitter`` in each direction, and chunks of a
+connection are released in order, so the backend sees the same round-trip
+behaviour as it would against Cloud SQL. The proxy also counts round trips:
+every time the client (the backend) starts talking again after the server
+answered, that is one more network round trip paid by the request.
+
+Standalone usage (then point DB_HOST/DB_PORT at the proxy):
+    python benchmarks/latency_proxy.py --listen-port 3307 --upstream-port 3306 --rtt-ms 20
+
+benchmarks/rtt_sweep.py drives it programmatically.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import threading
+import time
+
+
+class ProxyStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.round_trips = 0
+        self.bytes_up = 0
+        self.bytes_down = 0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "connections": self.connections,
+                "round_trips": self.round_trips,
+                "bytes_up": self.bytes_up,
+                "bytes_down": self.bytes_down,
+            }
+
+    def add(self, **deltas) -> None:
+        with self._lock:
+            for key, value in deltas.items():
+                setattr(self, key, getattr(self, key) + value)
+
+
+class LatencyProxy:
+    def __init__(
+        self,
+        listen_host: str,
+        listen_port: int,
+        upstream_host: str,
+        upstream_port: int,
+        rtt_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        seed: int = 411,
+    ):
+        self.listen_host = listen_host
+        self.listen_port = listen_port
+        self.upstream_host = upstream_host
+        self.upstream_port = upstream_port
+        self.rtt_ms = rtt_ms
+        self.jitter_ms = jitter_ms
+        self.stats = ProxyStats()
+        self._rng = random.Random(seed)
+        self._loop = None
+        self._server = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def set_latency(self, rtt_ms: float, jitter_ms: float = 0.0) -> None:
+        self.rtt_ms = rtt_ms
+        self.jitter_ms = jitter_ms
+
+    def _one_way_delay(self) -> float:
+        delay = self.rtt_ms / 2.0
+        if self.jitter_ms:
+            delay += self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, delay) / 1000.0
+
+    async def _pump(self, reader, writer, upstream: bool, turn: dict) -> None:
+        queue = asyncio.Queue()
+
+        async def release():
+            while True:
+                release_at, data = await queue.get()
+                if data is None:
+                    break
+                wait = release_at - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                writer.write(data)
+                await writer.drain()
+            writer.close()
+
+        releaser = asyncio.ensure_future(release())
+        last_release = 0.0
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                if upstream:
+                    if turn["last"] != "client":
+                        self.stats.add(round_trips=1)
+                    turn["last"] = "client"
+                    self.stats.add(bytes_up=len(data))
+                else:
+                    turn["last"] = "server"
+                    self.stats.add(bytes_down=len(data))
+                # never reorder: a chunk can't overtake the one before it
+                last_release = max(time.monotonic() + self._one_way_delay(), last_release)
+                queue.put_nowait((last_release, data))
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            queue.put_nowait((0.0, None))
+            await releaser
+
+    async def _handle(self, client_reader, client_writer) -> None:
+        self.stats.add(connections=1)
+        try:
+            server_reader, server_writer = await asyncio.open_connection(
+                self.upstream_host, self.upstream_port
+            )
+        except OSError:
+            client_writer.close()
+            return
+        turn = {"last": None}
+        await asyncio.gather(
+            self._pump(client_reader, server_writer, True, turn),
+            self._pump(server_reader, client_writer, False, turn),
+            return_exceptions=True,
+        )
+
+    def _run(self) -> None:
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._handle, self.listen_host, self.listen_port)
+        )
+        self._ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    def start(self) -> "LatencyProxy":
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self) -> None:
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread is not None:
+            self._thread.join(5)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--listen-host", default="127.0.0.1")
+    parser.add_argument("--listen-port", type=int, default=3307)
+    parser.add_argument("--upstream-host", default="127.0.0.1")
+    parser.add_argument("--upstream-port", type=int, default=3306)
+    parser.add_argument("--rtt-ms", type=float, default=20.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    proxy = LatencyProxy(
+        args.listen_host,
+        args.listen_port,
+        args.upstream_host,
+        args.upstream_port,
+        args.rtt_ms,
+        args.jitter_ms,
+    ).start()
+    print(
+        f"Proxying {args.listen_host}:{args.listen_port} -> "
+        f"{args.upstream_host}:{args.upstream_port} "
+        f"(rtt {args.rtt_ms} ms, jitter ±{args.jitter_ms} ms). Ctrl+C to stop."
+    )
+    try:
+        while True:
+            time.sleep(10)
+            print(proxy.stats.snapshot())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        proxy.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""Concurrent HTTP load test for the TeamUp API.
+
+Starts the real FastAPI app (backend/main.py) under uvicorn against a local
+database seeded by benchmarks/seed_local_db.py, drives it with a weighted mix
+of home page, search, post view, profile and join/accept traffic, and writes
+throughput plus p50/p95/p99 latency per route as JSON.
+
+Usage (from the repository root):
+    python benchmarks/seed_local_db.py --reset --password <pw>
+    python benchmarks/load_test.py --password <pw> --duration 30 \
+        --output bench_results/$(git rev-parse --short HEAD).json
+    python benchmarks/load_test.py --password <pw> --compare bench_results/<old>.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import http.client
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from seed_local_db import DATA_DIR, ROOT_DIR, TERM, add_db_arguments, db_config_from_args
+
+BACKEND_DIR = ROOT_DIR / "backend"
+
+# (weight, scenario name); weights roughly follow page views on the site
+SCENARIO_WEIGHTS = [
+    (30, "home"),
+    (20, "search"),
+    (25, "post_view"),
+    (15, "profile"),
+    (10, "join_accept"),
+]
+
+
+class Dataset:
+    """IDs sampled from data/*.csv so requests hit rows that exist."""
+
+    def __init__(self, data_dir: Path):
+        self.post_ids = []
+        self.post_authors = {}
+        self.user_ids = []
+        self.course_ids = []
+        self.subjects = []
+
+        with (data_dir / "post.csv").open(newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                self.post_ids.append(int(row["post_id"]))
+                self.post_authors[int(row["post_id"])] = int(row["user_id"])
+        with (data_dir / "user.csv").open(newline="", encoding="utf-8") as f:
+            self.user_ids = [int(row["user_id"]) for row in csv.DictReader(f)]
+        with (data_dir / "team.csv").open(newline="", encoding="utf-8") as f:
+            self.course_ids = sorted({row["course_id"] for row in csv.DictReader(f)})
+        self.subjects = sorted({c[4:].rstrip("0123456789") for c in self.course_ids})
+
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)
+        self.errors = defaultdict(int)
+        # 429 (rate limit) and 503 (admission control, pool): fast refusals
+        # that would otherwise pass for fast responses
+        self.rejected = defaultdict(int)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+
+    def record(self, route: str, status: int, elapsed_ms: float) -> None:
+        with self._lock:
+            self.samples[route].append(elapsed_ms)
+            self.statuses[route][status] += 1
+            if status == 0 or status >= 500 or status == 429:
+                self.errors[route] += 1
+            if status in (429, 503):
+                self.rejected[route] += 1
+
+
+class Client:
+    """One keep-alive HTTP connection per worker thread."""
+
+    def __init__(self, base_url: str, recorder: Recorder, timeout: float):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.timeout = timeout
+        self.recorder = recorder
+        self.conn = None
+
+    def request(self, route: str, method: str, path: str, body=None):
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {"Content-Type": "application/json"} if payload else {}
+        start = time.perf_counter()
+        status = 0
+        data = None
+        try:
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(
+                    self.host, self.port, timeout=self.timeout
+                )
+            self.conn.request(method, path, body=payload, headers=headers)
+            response = self.conn.getresponse()
+            raw = response.read()
+            status = response.status
+            if raw and response.getheader("Content-Type", "").startswith(
+                "application/json"
+            ):
+                data = json.loads(raw)
+        except (OSError, http.client.HTTPException, ValueError):
+            if self.conn is not None:
+                self.conn.close()
+            self.conn = None
+        elapsed_ms = (time.perf_counter() - start) * 1000.0
+        self.recorder.record(route, status, elapsed_ms)
+        return status, data
+
+
+def run_scenario(name: str, client: Client, dataset: Dataset, rng: random.Random):
+    term_id = TERM["term_id"]
+    if name == "home":
+        client.request("GET /api/terms", "GET", "/api/terms")
+        client.request(
+            "GET /api/posts/popular",
+            "GET",
+            f"/api/posts/popular?term_id={term_id}&limit=10",
+        )
+        client.request(
+            "GET /api/courses/popular",
+            "GET",
+            f"/api/courses/popular?term_id={term_id}&limit=5",
+        )
+    elif name == "search":
+        client.request(
+            "GET /api/courses/search",
+            "GET",
+            f"/api/courses/search?term_id={term_id}&q={rng.choice(dataset.subjects)}",
+        )
+        client.request(
+            "GET /api/posts/search",
+            "GET",
+            f"/api/posts/search?term_id={term_id}&course_id={rng.choice(dataset.course_ids)}",
+        )
+    elif name == "post_view":
+        post_id = rng.choice(dataset.post_ids)
+        client.request("GET /api/posts/{post_id}", "GET", f"/api/posts/{post_id}")
+        client.request(
+            "GET /api/posts/{post_id}/comments",
+            "GET",
+            f"/api/posts/{post_id}/comments",
+        )
+    elif name == "profile":
+        user_id = rng.choice(dataset.user_ids)
+        client.request(
+            "GET /api/profile/me", "GET", f"/api/profile/me?user_id={user_id}"
+        )
+        client.request(
+            "GET /api/users/{user_id}/teams", "GET", f"/api/users/{user_id}/teams"
+        )
+        client.request(
+            "GET /api/users/{user_id}/posts", "GET", f"/api/users/{user_id}/posts"
+        )
+    elif name == "join_accept":
+        post_id = rng.choice(dataset.post_ids)
+        author_id = dataset.post_authors[post_id]
+        from_user_id = rng.choice(dataset.user_ids)
+        status, data = client.request(
+            "POST /api/requests",
+            "POST",
+            "/api/requests",
+            {
+                "post_id": post_id,
+                "message": "Load test join request",
+                "from_user_id": from_user_id,
+            },
+        )
+        if status == 200 and data and rng.random() < 0.5:
+            client.request(
+                "PUT /api/users/{user_id}/requests/{request_id}/accept",
+                "PUT",
+                f"/api/users/{author_id}/requests/{data['request_id']}/accept",
+            )
+
+
+def worker(base_url, recorder, dataset, deadline, seed, timeout):
+    rng = random.Random(seed)
+    client = Client(base_url, recorder, timeout)
+    weights = [w for w, _ in SCENARIO_WEIGHTS]
+    names = [n for _, n in SCENARIO_WEIGHTS]
+    while time.perf_counter() < deadline:
+        run_scenario(rng.choices(names, weights)[0], client, dataset, rng)
+
+
+def percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    # nearest-rank percentile
+    rank = math.ceil(pct / 100.0 * len(sorted_values)) - 1
+    return sorted_values[max(0, min(len(sorted_values) - 1, rank))]
+
+
+def summarize(recorder: Recorder, elapsed_s: float) -> dict:
+    routes = {}
+    all_samples = []
+    for route, samples in sorted(recorder.samples.items()):
+        ordered = sorted(samples)
+        all_samples.extend(ordered)
+        routes[route] = {
+            "requests": len(ordered),
+            "errors": recorder.errors.get(route, 0),
+            "rejected": recorder.rejected.get(route, 0),
+            "status_codes": {str(k): v for k, v in recorder.statuses[route].items()},
+            "throughput_rps": round(len(ordered) / elapsed_s, 2),
+            "mean_ms": round(sum(ordered) / len(ordered), 3),
+            "p50_ms": round(percentile(ordered, 50), 3),
+            "p95_ms": round(percentile(ordered, 95), 3),
+            "p99_ms": round(percentile(ordered, 99), 3),
+            "max_ms": round(ordered[-1], 3),
+        }
+    all_samples.sort()
+    return {
+        "total": {
+            "requests": len(all_samples),
+            "errors": sum(recorder.errors.values()),
+            "rejected": sum(recorder.rejected.values()),
+            "throughput_rps": round(len(all_samples) / elapsed_s, 2),
+            "p50_ms": round(percentile(all_samples, 50), 3),
+            "p95_ms": round(percentile(all_samples, 95), 3),
+            "p99_ms": round(percentile(all_samples, 99), 3),
+        },
+        "routes": routes,
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "HEAD"], cwd=ROOT_DIR, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def wait_until_healthy(base_url: str, timeout_s: float) -> None:
+    parts = urlsplit(base_url)
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=2)
+            conn.request("GET", "/api/health")
+            body = json.loads(conn.getresponse().read() or b"{}")
+            conn.close()
+            if body.get("status") == "healthy":
+                return
+        except (OSError, http.client.HTTPException, ValueError):
+            pass
+        time.sleep(0.5)
+    raise SystemExit(f"Backend at {base_url} did not become healthy in {timeout_s}s")
+
+
+def start_backend(args: argparse.Namespace) -> subprocess.Popen:
+    db = db_config_from_args(args)
+    if not db["password"]:
+        # config.get_env_or_default treats an empty value as unset and would
+        # fall back to the Cloud SQL credentials.
+        raise SystemExit("The benchmark database user needs a non-empty --password.")
+    env = dict(
+        os.environ,
+        DB_HOST=db["host"],
+        DB_PORT=str(db["port"]),
+        DB_USER=db["user"],
+        DB_PASSWORD=db["password"],
+        DB_NAME=db["database"],
+        # every worker thread comes from 127.0.0.1, i.e. one client: the
+        # limiter would answer most requests with 429 and time that instead
+        RATE_LIMIT_ENABLED="false",
+    )
+    command = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "main:app",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(args.port_api),
+        "--log-level",
+        "warning",
+    ]
+    return subprocess.Popen(command, cwd=BACKEND_DIR, env=env)
+
+
+def run(args: argparse.Namespace, base_url: str) -> dict:
+    dataset = Dataset(Path(args.data_dir))
+    recorder = Recorder()
+
+    # Warm connections and caches so the first requests do not skew p99
+    warm = Client(base_url, Recorder(), args.timeout)
+    warm_rng = random.Random(args.seed)
+    for name in ("home", "search", "post_view", "profile"):
+        run_scenario(name, warm, dataset, warm_rng)
+
+    start = time.perf_counter()
+    deadline = start + args.duration
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(base_url, recorder, dataset, deadline, args.seed + i, args.timeout),
+            daemon=True,
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    result = summarize(recorder, elapsed)
+    result["meta"] = {
+        "git_revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "base_url": base_url,
+        "concurrency": args.concurrency,
+        "duration_s": round(elapsed, 3),
+        "seed": args.seed,
+        "scenario_weights": {name: weight for weight, name in SCENARIO_WEIGHTS},
+    }
+    return result
+
+
+def compare(current: dict, baseline: dict, threshold_pct: float) -> int:
+    """Print per-route p50/p95/p99 deltas; return the number of regressions."""
+    regressions = 0
+    print(f"\n{'route':<58}{'metric':>8}{'base':>10}{'now':>10}{'delta':>9}")
+    for route, now in current["routes"].items():
+        base = baseline.get("routes", {}).get(route)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            if not base[metric]:
+                continue
+            delta = (now[metric] - base[metric]) / base[metric] * 100.0
+            flag = ""
+            if delta > threshold_pct:
+                regressions += 1
+                flag = "  <-- regression"
+            print(
+                f"{route:<58}{metric[:3]:>8}{base[metric]:>10.2f}{now[metric]:>10.2f}{delta:>8.1f}%{flag}"
+            )
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_db_arguments(parser)
+    parser.add_argument(
+        "--base-url",
+        help="Benchmark an already running backend instead of starting one",
+    )
+    parser.add_argument("--port-api", type=int, default=8765)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=411)
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON report to diff against")
+    parser.add_argument(
+        "--regression-threshold",
+        type=float,
+        default=15.0,
+        help="Percent increase in a latency percentile counted as a regression",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    server = None
+    base_url = args.base_url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port_api}"
+        server = start_backend(args)
+    try:
+        wait_until_healthy(base_url, 30.0)
+        result = run(args, base_url)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    report = json.dumps(result, indent=2, sort_keys=True)
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(report + "\n", encoding="utf-8")
+        print(f"✓ Wrote {output}")
+    else:
+        print(report)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if compare(result, baseline, args.regression_threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Measure how each route's latency scales with database round-trip time.
+
+Starts the backend against benchmarks/latency_proxy.py (which fronts the local
+MySQL seeded by seed_local_db.py), then replays a fixed probe per route at
+concurrency 1 for each RTT in ``--rtts``. For every route it reports mean and
+p95 latency per RTT, the DB round trips counted by the proxy per request, and
+the fitted slope of latency against RTT (ms of latency per ms of RTT), which
+is the number of sequential round trips the handler pays.
+
+Usage (from the repository root):
+    python benchmarks/rtt_sweep.py --password <pw> --rtts 0,5,20,50 \
+        --output bench_results/rtt_$(git rev-parse --short HEAD).json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from latency_proxy import LatencyProxy
+from load_test import (
+    Client,
+    Dataset,
+    Recorder,
+    git_revision,
+    percentile,
+    start_backend,
+    wait_until_healthy,
+)
+from seed_local_db import DATA_DIR, TERM, add_db_arguments
+
+
+def probe_create_delete_post(client: Client, dataset: Dataset, rng: random.Random):
+    """create_post followed by delete_post on the new post."""
+    user_id = rng.choice(dataset.user_ids)
+    course_id = rng.choice(dataset.course_ids)
+    status, data = client.request(
+        "POST /api/posts",
+        "POST",
+        "/api/posts",
+        {
+            "user_id": user_id,
+            "term_id": TERM["term_id"],
+            "course_id": course_id,
+            "section_id": None,
+            "team_name": f"rtt-sweep-{time.time_ns()}",
+            "target_size": 4,
+            "title": "RTT sweep probe",
+            "content": "Temporary post created by benchmarks/rtt_sweep.py",
+        },
+    )
+    if status == 200 and data:
+        client.request(
+            "DELETE /api/posts/{post_id}",
+            "DELETE",
+            f"/api/posts/{data['post_id']}?user_id={user_id}",
+        )
+
+
+def probe_get(route: str, path_for):
+    def probe(client: Client, dataset: Dataset, rng: random.Random):
+        client.request(route, "GET", path_for(dataset, rng))
+
+    return probe
+
+
+PROBES = {
+    "GET /api/terms": probe_get("GET /api/terms", lambda d, r: "/api/terms"),
+    "GET /api/posts/popular": probe_get(
+        "GET /api/posts/popular",
+        lambda d, r: f"/api/posts/popular?term_id={TERM['term_id']}",
+    ),
+    "GET /api/courses/popular": probe_get(
+        "GET /api/courses/popular",
+        lambda d, r: f"/api/courses/popular?term_id={TERM['term_id']}",
+    ),
+    "GET /api/posts/search": probe_get(
+        "GET /api/posts/search",
+        lambda d, r: f"/api/posts/search?term_id={TERM['term_id']}&course_id={r.choice(d.course_ids)}",
+    ),
+    "GET /api/posts/{post_id}": probe_get(
+        "GET /api/posts/{post_id}", lambda d, r: f"/api/posts/{r.choice(d.post_ids)}"
+    ),
+    "GET /api/posts/{post_id}/comments": probe_get(
+        "GET /api/posts/{post_id}/comments",
+        lambda d, r: f"/api/posts/{r.choice(d.post_ids)}/comments",
+    ),
+    "GET /api/profile/me": probe_get(
+        "GET /api/profile/me",
+        lambda d, r: f"/api/profile/me?user_id={r.choice(d.user_ids)}",
+    ),
+    "GET /api/users/{user_id}/posts": probe_get(
+        "GET /api/users/{user_id}/posts",
+        lambda d, r: f"/api/users/{r.choice(d.user_ids)}/posts",
+    ),
+    "POST /api/posts + DELETE /api/posts/{post_id}": probe_create_delete_post,
+}
+
+
+def fit_slope(points):
+    """Least-squares slope of (rtt_ms, latency_ms) points."""
+    if len(points) < 2:
+        return None
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    var_x = sum((x - mean_x) ** 2 for x, _ in points)
+    if not var_x:
+        return None
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / var_x
+
+
+def sweep(args, base_url: str, proxy: LatencyProxy) -> dict:
+    dataset = Dataset(Path(args.data_dir))
+    results = {route: {"by_rtt": {}} for route in PROBES}
+
+    for rtt in args.rtts:
+        proxy.set_latency(rtt, args.jitter_ms)
+        for route, probe in PROBES.items():
+            rng = random.Random(args.seed)
+            recorder = Recorder()
+            client = Client(base_url, recorder, args.timeout)
+            before = proxy.stats.snapshot()
+            for _ in range(args.requests):
+                probe(client, dataset, rng)
+            after = proxy.stats.snapshot()
+
+            samples = {}
+            for name, values in recorder.samples.items():
+                ordered = sorted(values)
+                samples[name] = {
+                    "requests": len(ordered),
+                    "errors": recorder.errors.get(name, 0),
+                    "rejected": recorder.rejected.get(name, 0),
+                    "mean_ms": round(sum(ordered) / len(ordered), 3),
+                    "p95_ms": round(percentile(ordered, 95), 3),
+                }
+            results[route]["by_rtt"][str(rtt)] = {
+                "latency": samples,
+                "round_trips_per_probe": round(
+                    (after["round_trips"] - before["round_trips"]) / args.requests, 2
+                ),
+                "db_connections_per_probe": round(
+                    (after["connections"] - before["connections"]) / args.requests, 2
+                ),
+            }
+        print(f"✓ rtt={rtt} ms done")
+
+    for route, data in results.items():
+        points = []
+        for rtt, entry in data["by_rtt"].items():
+            total = sum(s["mean_ms"] for s in entry["latency"].values())
+            points.append((float(rtt), total))
+        slope = fit_slope(points)
+        data["latency_ms_per_rtt_ms"] = round(slope, 2) if slope is not None else None
+
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_db_arguments(parser)
+    parser.add_argument(
+        "--rtts",
+        type=lambda v: [float(x) for x in v.split(",")],
+        default=[0.0, 5.0, 20.0, 50.0],
+        help="Comma-separated round-trip times in ms",
+    )
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--proxy-port", type=int, default=3399)
+    parser.add_argument("--port-api", type=int, default=8766)
+    parser.add_argument("--requests", type=int, default=20, help="Probes per route per RTT")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=411)
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--output", help="Write the JSON report here (default: stdout)")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+
+    proxy = LatencyProxy(
+        "127.0.0.1", args.proxy_port, args.host, args.port, 0.0, args.jitter_ms
+    ).start()
+
+    # the backend only ever sees the proxy
+    backend_args = argparse.Namespace(**vars(args))
+    backend_args.host = "127.0.0.1"
+    backend_args.port = args.proxy_port
+    server = start_backend(backend_args)
+    base_url = f"http://127.0.0.1:{args.port_api}"
+    try:
+        wait_until_healthy(base_url, 30.0)
+        routes = sweep(args, base_url, proxy)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+        proxy.stop()
+
+    report = json.dumps(
+        {
+            "meta": {
+                "git_revision": git_revision(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "rtts_ms": args.rtts,
+                "jitter_ms": args.jitter_ms,
+                "requests_per_route": args.requests,
+            },
+            "routes": routes,
+        },
+        indent=2,
+        sort_keys=True,
+    )
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(report + "\n", encoding="utf-8")
+        print(f"✓ Wrote {output}")
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Generate a scaled, referentially consistent copy of data/*.csv.
+
+Every template row in user/team/team_member/post.csv is replicated
+``--multiple`` times with IDs shifted by a per-table stride, so copy 0 keeps
+the original rows and copy k only references users/teams/posts of copy k.
+Comments are regenerated for every copy (their authors span all copies).
+Skew that the hand-written data lacks is layered on top:
+
+* popular courses: teams in copies >= 1 pick their (course, section) from a
+  power-law ranking of the template catalog, so a few courses own most teams;
+* hot posts / long threads: comment counts per post follow a Pareto
+  distribution (most posts get none, a few get hundreds) and replies chain
+  onto earlier comments of the same post.
+
+Rows are written as they are produced; only the templates and the comment IDs
+of the post currently being generated are kept in memory.
+
+Usage (from the repository root):
+    python benchmarks/scale_dataset.py --multiple 100 --output-dir data/scaled_100x
+    python benchmarks/seed_local_db.py --reset --bulk --data-dir data/scaled_100x --password <pw>
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def read_template(path: Path):
+    with path.open(newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        return reader.fieldnames, list(reader)
+
+
+def stride_for(rows, key: str) -> int:
+    """Smallest power of ten above the largest template ID."""
+    largest = max(int(row[key]) for row in rows)
+    stride = 10
+    while stride <= largest:
+        stride *= 10
+    return stride
+
+
+def power_law_index(rng: random.Random, size: int, skew: float) -> int:
+    """Index in [0, size) where low indexes are picked far more often."""
+    return min(size - 1, int(size * rng.random() ** skew))
+
+
+class Scaler:
+    def __init__(self, template_dir: Path, multiple: int, seed: int, args):
+        self.multiple = multiple
+        self.rng = random.Random(seed)
+        self.course_skew = args.course_skew
+        self.comment_alpha = args.comment_alpha
+        self.comments_per_post = args.comments_per_post
+        self.reply_ratio = args.reply_ratio
+        self.max_thread = args.max_thread
+
+        self.user_fields, self.users = read_template(template_dir / "user.csv")
+        self.team_fields, self.teams = read_template(template_dir / "team.csv")
+        self.member_fields, self.members = read_template(
+            template_dir / "team_member.csv"
+        )
+        self.post_fields, self.posts = read_template(template_dir / "post.csv")
+        self.comment_fields, self.comments = read_template(
+            template_dir / "comment.csv"
+        )
+
+        self.user_stride = stride_for(self.users, "user_id")
+        self.team_stride = stride_for(self.teams, "team_id")
+        self.post_stride = stride_for(self.posts, "post_id")
+
+        # Catalog ranked by template popularity; ties broken by course_id so
+        # the ranking (and therefore the skew) is deterministic.
+        popularity = Counter((t["course_id"], t["section_id"]) for t in self.teams)
+        self.catalog = sorted(popularity, key=lambda cs: (-popularity[cs], cs))
+
+        self.total_users = len(self.users) * multiple
+        self.user_ids = [int(u["user_id"]) for u in self.users]
+
+    def shift(self, value: str, copy: int, stride: int) -> str:
+        return str(int(value) + copy * stride) if value else value
+
+    def random_user_id(self) -> int:
+        index = self.rng.randrange(self.total_users)
+        copy, offset = divmod(index, len(self.user_ids))
+        return self.user_ids[offset] + copy * self.user_stride
+
+    def iter_users(self):
+        for copy in range(self.multiple):
+            for row in self.users:
+                row = dict(row)
+                row["user_id"] = self.shift(row["user_id"], copy, self.user_stride)
+                if copy:
+                    netid = f"{row['netid']}x{copy}"
+                    row["netid"] = netid
+                    row["email"] = f"{netid}@illinois.edu"
+                yield row
+
+    def iter_teams(self):
+        for copy in range(self.multiple):
+            for row in self.teams:
+                row = dict(row)
+                row["team_id"] = self.shift(row["team_id"], copy, self.team_stride)
+                if copy:
+                    course_id, section_id = self.catalog[
+                        power_law_index(self.rng, len(self.catalog), self.course_skew)
+                    ]
+                    row["course_id"] = course_id
+                    row["section_id"] = section_id
+                    row["team_name"] = f"{row['team_name']}-{copy}"
+                for i in range(1, 6):
+                    key = f"userid{i}"
+                    if key in row:
+                        row[key] = self.shift(row[key], copy, self.user_stride)
+                yield row
+
+    def iter_team_members(self):
+        for copy in range(self.multiple):
+            for row in self.members:
+                row = dict(row)
+                row["team_id"] = self.shift(row["team_id"], copy, self.team_stride)
+                row["user_id"] = self.shift(row["user_id"], copy, self.user_stride)
+                yield row
+
+    def iter_posts(self):
+        for copy in range(self.multiple):
+            for row in self.posts:
+                row = dict(row)
+                row["post_id"] = self.shift(row["post_id"], copy, self.post_stride)
+                row["user_id"] = self.shift(row["user_id"], copy, self.user_stride)
+                row["team_id"] = self.shift(row["team_id"], copy, self.team_stride)
+                yield row
+
+    def thread_length(self) -> int:
+        # Lomax (Pareto II) with mean ``comments_per_post``: most posts get
+        # zero or one comment, a handful get very long threads.
+        alpha = self.comment_alpha
+        scale = self.comments_per_post * (alpha - 1)
+        length = int((self.rng.paretovariate(alpha) - 1) * scale)
+        return min(length, self.max_thread)
+
+    def iter_comments(self):
+        comment_id = 0
+        template_count = len(self.comments)
+        for post in self.iter_posts():
+            created = datetime.strptime(post["created_at"], TIME_FORMAT)
+            thread = []
+            for _ in range(self.thread_length()):
+                comment_id += 1
+                template = self.comments[comment_id % template_count]
+                created += timedelta(minutes=self.rng.randint(1, 240))
+                parent = ""
+                if thread and self.rng.random() < self.reply_ratio:
+                    parent = str(self.rng.choice(thread))
+                thread.append(comment_id)
+                stamp = created.strftime(TIME_FORMAT)
+                yield {
+                    "comment_id": str(comment_id),
+                    "post_id": post["post_id"],
+                    "user_id": str(self.random_user_id()),
+                    "parent_comment_id": parent,
+                    "content": template["content"],
+                    "status": template["status"],
+                    "created_at": stamp,
+                    "updated_at": stamp,
+                }
+
+
+def write_csv(path: Path, fieldnames, rows) -> int:
+    count = 0
+    with path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+    return count
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--multiple", type=int, required=True, help="e.g. 10, 100, 1000")
+    parser.add_argument("--output-dir", type=Path, required=True)
+    parser.add_argument("--template-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--seed", type=int, default=411)
+    parser.add_argument(
+        "--course-skew",
+        type=float,
+        default=3.0,
+        help="Power-law exponent for course popularity (1 = uniform)",
+    )
+    parser.add_argument(
+        "--comments-per-post",
+        type=float,
+        default=1.06,
+        help="Mean comments per post (template: 1,059 / 1,000)",
+    )
+    parser.add_argument(
+        "--comment-alpha",
+        type=float,
+        default=1.3,
+        help="Pareto shape for thread length; lower means heavier tail",
+    )
+    parser.add_argument("--reply-ratio", type=float, default=0.6)
+    parser.add_argument("--max-thread", type=int, default=2000)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.multiple < 1:
+        raise SystemExit("--multiple must be at least 1")
+    if args.comment_alpha <= 1:
+        raise SystemExit("--comment-alpha must be greater than 1")
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    scaler = Scaler(args.template_dir, args.multiple, args.seed, args)
+
+    outputs = [
+        ("user.csv", scaler.user_fields, scaler.iter_users()),
+        ("team.csv", scaler.team_fields, scaler.iter_teams()),
+        ("team_member.csv", scaler.member_fields, scaler.iter_team_members()),
+        ("post.csv", scaler.post_fields, scaler.iter_posts()),
+        ("comment.csv", scaler.comment_fields, scaler.iter_comments()),
+    ]
+    for name, fieldnames, rows in outputs:
+        count = write_csv(args.output_dir / name, fieldnames, rows)
+        print(f"✓ {name}: {count} rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
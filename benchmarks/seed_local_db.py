@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""Seed a local MySQL database for benchmarks from doc/src/*.sql and data/*.csv.
+
+The schema, stored procedures and triggers are applied straight from doc/src,
+then the CSVs are loaded through the existing import scripts in scripts/.
+Term/Course/Section rows are derived from data/team.csv (the course catalog
+CSV is not checked in), and a deterministic set of MatchRequest rows is
+generated from data/comment.csv so the popular-post aggregates have work to do.
+
+Usage (from the repository root):
+    python benchmarks/seed_local_db.py --reset --password <pw>
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import random
+import re
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+DATA_DIR = ROOT_DIR / "data"
+SQL_DIR = ROOT_DIR / "doc" / "src"
+
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+TERM = {
+    "term_id": "2025-sp",
+    "name": "Spring 2025",
+    "start_date": "2025-01-20",
+    "end_date": "2025-05-15",
+}
+
+COURSE_ID_PATTERN = re.compile(r"^[a-z]+\d+([A-Z]+)(\d+\w*)$")
+
+
+def add_db_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--host", default=os.getenv("BENCH_DB_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("BENCH_DB_PORT", "3306"))
+    )
+    parser.add_argument("--user", default=os.getenv("BENCH_DB_USER", "root"))
+    parser.add_argument("--password", default=os.getenv("BENCH_DB_PASSWORD", ""))
+    parser.add_argument(
+        "--database", default=os.getenv("BENCH_DB_NAME", "teamup_bench")
+    )
+    parser.add_argument(
+        "--allow-remote",
+        action="store_true",
+        help="Allow a non-local host. Benchmarks rewrite data, never point them at Cloud SQL.",
+    )
+
+
+def db_config_from_args(args: argparse.Namespace, with_database: bool = True) -> dict:
+    if args.host not in LOCAL_HOSTS and not args.allow_remote:
+        raise SystemExit(
+            f"Refusing to use non-local database host {args.host!r} (pass --allow-remote)."
+        )
+    config = {
+        "host": args.host,
+        "port": args.port,
+        "user": args.user,
+        "password": args.password,
+        "charset": "utf8mb4",
+        "collation": "utf8mb4_unicode_ci",
+    }
+    if with_database:
+        config["database"] = args.database
+    return config
+
+
+def iter_sql_statements(sql_text: str):
+    """Split a .sql file into statements, honouring DELIMITER blocks."""
+    delimiter = ";"
+    buffer = []
+    for line in sql_text.splitlines():
+        stripped = line.strip()
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+        if not buffer and (not stripped or stripped.startswith("--")):
+            continue
+        buffer.append(line)
+        if stripped.endswith(delimiter):
+            statement = "\n".join(buffer).rstrip()
+            statement = statement[: -len(delimiter)].strip()
+            buffer = []
+            if statement:
+                yield statement
+    tail = "\n".join(buffer).strip()
+    if tail:
+        yield tail
+
+
+def apply_sql_file(cursor, path: Path) -> int:
+    count = 0
+    for statement in iter_sql_statements(path.read_text(encoding="utf-8")):
+        cursor.execute(statement)
+        count += 1
+    return count
+
+
+def reset_database(args: argparse.Namespace) -> None:
+    import mysql.connector
+
+    conn = mysql.connector.connect(**db_config_from_args(args, with_database=False))
+    cursor = conn.cursor()
+    cursor.execute(f"DROP DATABASE IF EXISTS `{args.database}`")
+    cursor.execute(
+        f"CREATE DATABASE `{args.database}` "
+        "CHARACTER SET utf8mb4 COLLATE utf8mb4_unicode_ci"
+    )
+    cursor.close()
+    conn.close()
+    print(f"✓ Recreated database {args.database}")
+
+
+def apply_schema(cursor) -> None:
+    for name in ("create_table.sql", "stored_procedures.sql", "triggers.sql"):
+        count = apply_sql_file(cursor, SQL_DIR / name)
+        print(f"✓ Applied {count} statements from doc/src/{name}")
+
+
+def load_catalog(cursor, conn, team_csv: Path) -> None:
+    """Derive Term, Course and Section rows from the team CSV."""
+    courses = {}
+    sections = set()
+    with team_csv.open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            course_id = row["course_id"]
+            match = COURSE_ID_PATTERN.match(course_id)
+            if not match:
+                continue
+            subject, number = match.group(1), match.group(2)
+            courses[course_id] = {
+                "course_id": course_id,
+                "term_id": TERM["term_id"],
+                "subject": subject,
+                "number": number,
+                "title": f"{subject} {number}",
+                "credits": 3.0,
+            }
+            sections.add((course_id, row["section_id"]))
+
+    cursor.execute(
+        "INSERT INTO Term (term_id, name, start_date, end_date) "
+        "VALUES (%(term_id)s, %(name)s, %(start_date)s, %(end_date)s)",
+        TERM,
+    )
+    cursor.executemany(
+        "INSERT INTO Course (course_id, term_id, subject, number, title, credits) "
+        "VALUES (%(course_id)s, %(term_id)s, %(subject)s, %(number)s, %(title)s, %(credits)s)",
+        list(courses.values()),
+    )
+    cursor.executemany(
+        "INSERT INTO Section (course_id, crn, instructor, meeting_time, location, delivery_mode) "
+        "VALUES (%s, %s, NULL, NULL, NULL, 'Lecture')",
+        sorted(sections),
+    )
+    conn.commit()
+    print(f"✓ Inserted 1 term, {len(courses)} courses, {len(sections)} sections")
+
+
+# table -> CSV columns (None = skipped) for LOAD DATA; empty fields become NULL
+BULK_TABLES = [
+    (
+        "User",
+        "user.csv",
+        ["user_id", "netid", "email", "phone_number", "display_name",
+         "avatar_url", "bio", "score", "major", "grade"],
+    ),
+    (
+        "Team",
+        "team.csv",
+        ["team_id", "course_id", "section_id", "team_name", "target_size",
+         "notes", "status", None, None, None, None, None],
+    ),
+    ("TeamMember", "team_member.csv", ["team_id", "user_id", "role", "joined_at"]),
+    (
+        "Post",
+        "post.csv",
+        ["post_id", "user_id", "team_id", "title", "content", "created_at",
+         "updated_at"],
+    ),
+    (
+        "Comment",
+        "comment.csv",
+        ["comment_id", "post_id", "user_id", "parent_comment_id", "content",
+         "status", "created_at", "updated_at"],
+    ),
+]
+
+
+def csv_line_terminator(path: Path) -> str:
+    with path.open("rb") as f:
+        return "\\r\\n" if f.readline().endswith(b"\r\n") else "\\n"
+
+
+def bulk_load(cursor, conn, data_dir: Path) -> None:
+    """LOAD DATA LOCAL INFILE path for scaled data sets (see scale_dataset.py).
+
+    The import scripts insert row by row, which is fine for the checked-in
+    data but takes hours at 100x and above.
+    """
+    for table, filename, columns in BULK_TABLES:
+        path = (data_dir / filename).resolve()
+        targets = []
+        assignments = []
+        for index, column in enumerate(columns):
+            var = f"@c{index}"
+            targets.append(var)
+            if column:
+                assignments.append(f"{column} = NULLIF({var}, '')")
+        cursor.execute(
+            f"""
+            LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+            CHARACTER SET utf8mb4
+            FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"' ESCAPED BY ''
+            LINES TERMINATED BY '{csv_line_terminator(path)}'
+            IGNORE 1 LINES
+            ({", ".join(targets)})
+            SET {", ".join(assignments)}
+            """,
+            (str(path),),
+        )
+        conn.commit()
+        print(f"✓ Loaded {cursor.rowcount} rows into {table} from {filename}")
+
+
+def load_match_requests(cursor, conn, data_dir: Path, seed: int) -> None:
+    """Turn commenters who are not on the post's team into join requests."""
+    rng = random.Random(seed)
+
+    team_by_post = {}
+    with (data_dir / "post.csv").open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            team_by_post[int(row["post_id"])] = int(row["team_id"])
+
+    members = set()
+    with (data_dir / "team_member.csv").open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            members.add((int(row["team_id"]), int(row["user_id"])))
+
+    insert_query = (
+        "INSERT INTO MatchRequest (request_id, from_user_id, to_team_id, post_id, "
+        "message, status, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+    )
+    batch = []
+    inserted = 0
+    seen = set()
+    with (data_dir / "comment.csv").open(newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            post_id = int(row["post_id"])
+            user_id = int(row["user_id"])
+            team_id = team_by_post.get(post_id)
+            if team_id is None or (team_id, user_id) in members:
+                continue
+            if (post_id, user_id) in seen:
+                continue
+            seen.add((post_id, user_id))
+            inserted += 1
+            batch.append(
+                (
+                    inserted,
+                    user_id,
+                    team_id,
+                    post_id,
+                    "Interested in joining your team!",
+                    rng.choices(["pending", "rejected", "withdrawn"], [6, 3, 1])[0],
+                    row["created_at"],
+                )
+            )
+            if len(batch) >= 5000:
+                cursor.executemany(insert_query, batch)
+                batch = []
+
+    if batch:
+        cursor.executemany(insert_query, batch)
+    conn.commit()
+    print(f"✓ Inserted {inserted} match requests")
+
+
+def seed(args: argparse.Namespace) -> None:
+    import mysql.connector
+
+    import backfill_post_previews
+    import import_post_comment_data
+    import import_team_data
+    import import_user_data
+    import migrate
+    import rebuild_user_activity
+    import rebuild_user_stats
+
+    data_dir = Path(args.data_dir)
+
+    if args.reset:
+        reset_database(args)
+
+    conn = mysql.connector.connect(
+        **db_config_from_args(args), allow_local_infile=args.bulk
+    )
+    cursor = conn.cursor()
+    try:
+        if args.reset:
+            apply_schema(cursor)
+        backfill_post_previews.ensure_preview_column(conn)
+        rebuild_user_stats.ensure_stats_table(conn)
+        rebuild_user_activity.ensure_activity_table(conn)
+
+        # The CSVs are not topologically ordered (e.g. comment replies may
+        # precede their parents), so load them with FK checks deferred.
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+
+        load_catalog(cursor, conn, data_dir / "team.csv")
+
+        if args.bulk:
+            bulk_load(cursor, conn, data_dir)
+        else:
+            users = import_user_data.process_user_data(str(data_dir / "user.csv"))
+            import_user_data.insert_users(cursor, conn, users)
+
+            import_team_data.import_teams(cursor, conn, str(data_dir / "team.csv"))
+            import_team_data.import_team_members(
+                cursor, conn, str(data_dir / "team_member.csv")
+            )
+
+            import_post_comment_data.import_posts(
+                cursor, conn, str(data_dir / "post.csv")
+            )
+            import_post_comment_data.import_comments(
+                cursor, conn, str(data_dir / "comment.csv")
+            )
+
+        load_match_requests(cursor, conn, data_dir, args.seed)
+
+        # LOAD DATA leaves content_preview at its '' default
+        backfilled = backfill_post_previews.backfill_previews(conn)
+        print(f"✓ Backfilled {backfilled} post previews")
+
+        rebuild_user_stats.user_stats.rebuild(cursor)
+        conn.commit()
+        print("✓ Rebuilt UserStats")
+        rebuild_user_activity.user_activity.rebuild(cursor)
+        conn.commit()
+        print("✓ Rebuilt UserPostActivity")
+
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+        cursor.execute("ANALYZE TABLE Post, Comment, MatchRequest, Team, TeamMember")
+        cursor.fetchall()
+
+        # secondary indexes are built after the load, as on a live database
+        applied = migrate.migrate_up(conn)
+        print(f"✓ Applied {applied} migrations")
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_db_arguments(parser)
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Drop and recreate the database and schema before loading",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=str(DATA_DIR),
+        help="Directory holding user/team/team_member/post/comment CSVs (default: data/)",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Load CSVs with LOAD DATA LOCAL INFILE (needs local_infile=ON); "
+        "use for data sets produced by scale_dataset.py",
+    )
+    parser.add_argument("--seed", type=int, default=411)
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    print("=" * 60)
+    print(f"Seeding {args.database} on {args.host}:{args.port}")
+    print("=" * 60)
+    seed(args)
+    print("\n✓ Local benchmark database is ready")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,4 +1,5 @@
 -- this file is for creating table STAGE3
+-- secondary indexes and later schema changes: scripts/migrate.py (scripts/migrations/)
 
 CREATE TABLE Term (
     term_id      VARCHAR(32) PRIMARY KEY,
@@ -83,6 +84,7 @@ CREATE TABLE Post (
     team_id     INT NOT NULL,
     title       VARCHAR(128) NOT NULL,
     content     VARCHAR(4000) NOT NULL,
+    content_preview VARCHAR(160) NOT NULL DEFAULT '',
     created_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (user_id) REFERENCES User(user_id),
@@ -123,3 +125,27 @@ CREATE TABLE PostSkill (
     FOREIGN KEY (post_id) REFERENCES Post(post_id),
     FOREIGN KEY (skill_id) REFERENCES Skill(skill_id)
 );
+
+CREATE TABLE UserStats (
+    user_id            INT PRIMARY KEY,
+    post_count         INT NOT NULL DEFAULT 0,
+    team_count         INT NOT NULL DEFAULT 0,
+    active_courses     INT NOT NULL DEFAULT 0,
+    open_requests      INT NOT NULL DEFAULT 0,
+    successful_matches INT NOT NULL DEFAULT 0,
+    total_requests     INT NOT NULL DEFAULT 0,
+    updated_at         TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (user_id) REFERENCES User(user_id)
+);
+
+CREATE TABLE UserPostActivity (
+    user_id          INT NOT NULL,
+    post_id          INT NOT NULL,
+    interaction_type ENUM('created', 'commented') NOT NULL,
+    ts               DATETIME NOT NULL,
+    PRIMARY KEY (user_id, post_id, interaction_type),
+    KEY idx_activity_feed (user_id, ts, post_id, interaction_type),
+    KEY idx_activity_post (post_id),
+    FOREIGN KEY (user_id) REFERENCES User(user_id),
+    FOREIGN KEY (post_id) REFERENCES Post(post_id)
+);
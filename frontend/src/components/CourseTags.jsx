@@ -1,7 +1,7 @@
 import React, { useState, useEffect } from 'react'
 import './CourseTags.css'
 
-function CourseTags({ termId, onCourseSelect }) {
+function CourseTags({ termId, onCourseSelect, preloaded }) {
   const [courses, setCourses] = useState([])
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState(null)
@@ -12,6 +12,11 @@ function CourseTags({ termId, onCourseSelect }) {
         setCourses([])
         return
       }
+      // already fetched with the page (/api/home)
+      if (preloaded && preloaded.termId === termId) {
+        setCourses(preloaded.courses)
+        return
+      }
 
       try {
         setLoading(true)
@@ -29,7 +34,7 @@ function CourseTags({ termId, onCourseSelect }) {
     }
 
     loadCourses()
-  }, [termId])
+  }, [termId, preloaded])
 
   const handleCourseClick = (course) => {
     if (onCourseSelect && course) {
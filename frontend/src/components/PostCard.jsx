@@ -27,9 +27,7 @@ function PostCard({ post, onClick }) {
       
       <div className="post-card-content">
         <p className="post-card-preview">
-          {post.content && post.content.length > 150
-            ? post.content.substring(0, 150) + '...'
-            : post.content}
+          {post.content_preview}
         </p>
       </div>
 
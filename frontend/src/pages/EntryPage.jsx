@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react'
+import React, { useState, useEffect, useRef } from 'react'
 import { useNavigate } from 'react-router-dom'
 import { HiUserGroup, HiPlus } from 'react-icons/hi2'
 import Sidebar from '../components/Sidebar'
@@ -6,7 +6,7 @@ import TermSelector from '../components/TermSelector'
 import SearchBar from '../components/SearchBar'
 import CourseTags from '../components/CourseTags'
 import PostCard from '../components/PostCard'
-import { fetchTerms, fetchPopularPosts, searchPosts, getStoredUser } from '../services/api'
+import { fetchHome, fetchPopularPosts, searchPosts, getStoredUser } from '../services/api'
 import teamupLogo from '../assets/teamup-logo.png'
 import './EntryPage.css'
 
@@ -19,6 +19,9 @@ function EntryPage() {
   const [loading, setLoading] = useState(true)
   const [termsLoading, setTermsLoading] = useState(true)
   const [error, setError] = useState(null)
+  const [homeCourses, setHomeCourses] = useState(null)
+  // term whose popular posts came with /api/home, so the effect below skips them
+  const preloadedTermId = useRef(null)
   const navigate = useNavigate()
   const storedUser = getStoredUser()
 
@@ -26,13 +29,23 @@ function EntryPage() {
     const initializeTerms = async () => {
       try {
         setTermsLoading(true)
-        const data = await fetchTerms()
+        // terms, popular posts and popular courses of the newest term at once
+        const home = await fetchHome()
+        const data = home.terms
         console.log('[EntryPage] Fetched terms:', data) // Debug log
         if (data && data.length > 0) {
           setTerms(data)
+          if (home.popular_posts) {
+            preloadedTermId.current = home.term_id
+            setPosts(home.popular_posts)
+            setLoading(false)
+          }
+          if (home.popular_courses) {
+            setHomeCourses({ termId: home.term_id, courses: home.popular_courses })
+          }
           // 默认选择第一个学期（最新的）
-          setSelectedTermId(data[0].term_id)
-          console.log('[EntryPage] Selected term:', data[0].term_id) // Debug log
+          setSelectedTermId(home.term_id || data[0].term_id)
+          console.log('[EntryPage] Selected term:', home.term_id) // Debug log
         } else {
           console.warn('[EntryPage] No terms found in response')
           setTerms([])
@@ -51,6 +64,10 @@ function EntryPage() {
   useEffect(() => {
     // 只有在已选择学期且没有搜索时才加载popular posts
     if (selectedTermId !== null && !isSearchMode) {
+      if (preloadedTermId.current === selectedTermId) {
+        preloadedTermId.current = null
+        return
+      }
   const loadPopularPosts = async () => {
     try {
       setLoading(true)
@@ -183,6 +200,7 @@ function EntryPage() {
           <CourseTags
             termId={selectedTermId}
             onCourseSelect={handleCourseSearch}
+            preloaded={homeCourses}
           />
         </div>
 
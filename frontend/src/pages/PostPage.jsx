@@ -47,20 +47,23 @@ function PostPage() {
 
   useEffect(() => {
     loadPost()
-    loadComments()
   }, [postId])
 
+  // one request for the post and its comments
   const loadPost = async () => {
     try {
       setLoading(true)
-      const data = await fetchPostById(postId)
-      setPost(data)
+      const data = await fetchPostById(postId, ['skills', 'comments'])
+      const { comments: postComments, ...postData } = data
+      setPost(postData)
+      setComments(postComments || [])
       setError(null)
     } catch (err) {
       setError('Failed to load post. Please try again later.')
       console.error('Error loading post:', err)
     } finally {
       setLoading(false)
+      setCommentsLoading(false)
     }
   }
 
@@ -46,13 +46,23 @@ export async function fetchTerms() {
   return apiRequest('/terms')
 }
 
+// terms + popular posts + popular courses in one request; sections that
+// failed are null and listed in `errors`
+export async function fetchHome(termId = null) {
+  const url = termId ? `/home?term_id=${encodeURIComponent(termId)}` : '/home'
+  return apiRequest(url)
+}
+
 export async function fetchPopularPosts(termId = null) {
   const url = termId ? `/posts/popular?term_id=${encodeURIComponent(termId)}` : '/posts/popular'
   return apiRequest(url)
 }
 
-export async function fetchPostById(postId) {
-  return apiRequest(`/posts/${postId}`)
+// include: relations to expand in the same response
+// ('skills', 'comments', 'team', 'members'); the backend default is skills
+export async function fetchPostById(postId, include) {
+  const query = include?.length ? `?include=${include.join(',')}` : ''
+  return apiRequest(`/posts/${postId}${query}`)
 }
 
 export async function updatePost(postId, payload, userId) {
@@ -236,6 +246,22 @@ export async function getTeamDetails(teamId) {
   return apiRequest(`/teams/${teamId}`)
 }
 
+// Batch lookups: one request for many ids (at most BATCH_MAX_IDS, 100 by
+// default). They resolve to { teams|posts|users: { [id]: entity }, missing: [ids] }.
+export async function getTeamsByIds(teamIds) {
+  return apiRequest(`/teams?ids=${teamIds.join(',')}`)
+}
+
+export async function fetchPostsByIds(postIds, include) {
+  const params = new URLSearchParams({ ids: postIds.join(',') })
+  if (include?.length) params.append('include', include.join(','))
+  return apiRequest(`/posts?${params.toString()}`)
+}
+
+export async function fetchUsersByIds(userIds) {
+  return apiRequest(`/users?ids=${userIds.join(',')}`)
+}
+
 export async function fetchUserMatchRequests(userId, status = null) {
   const params = new URLSearchParams()
   if (status) params.append('status', status)
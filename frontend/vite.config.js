@@ -8,7 +8,9 @@ export default defineConfig({
     proxy: {
       '/api': {
         target: 'http://localhost:8000',
-        changeOrigin: true
+        changeOrigin: true,
+        // X-Forwarded-For, so the backend rate-limits per client, not per proxy
+        xfwd: true
       }
     }
   }
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import archive  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Move a closed term's posts, comments and requests to the archive "
+        "tables, or restore them."
+    )
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument(
+        "command",
+        choices=["list", "archive", "restore"],
+        help="list: closed and archived terms; archive/restore: move one term",
+    )
+    parser.add_argument("term_id", nargs="?", help="Term to archive or restore")
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=500,
+        help="Posts moved per transaction (default: 500)",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Archive a term whose end_date has not passed yet",
+    )
+    args = parser.parse_args()
+    if args.command != "list" and not args.term_id:
+        parser.error(f"{args.command} needs a term_id")
+    return args
+
+
+def ensure_archive_tables(connection) -> None:
+    with connection.cursor() as cursor:
+        archive.create_archive_tables(cursor)
+
+
+def print_terms(connection) -> None:
+    with connection.cursor() as cursor:
+        closed = archive.closed_terms(cursor)
+        archived = archive.archived_terms(cursor)
+    archived_ids = {row[0] for row in archived}
+    for term_id, name, archived_at, posts, comments, requests in archived:
+        print(
+            f"{term_id:<12} {name:<24} archived {archived_at} "
+            f"({posts} posts, {comments} comments, {requests} requests)"
+        )
+    for term_id in closed:
+        if term_id not in archived_ids:
+            print(f"{term_id:<12} closed, not archived")
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        import mysql.connector
+    except ModuleNotFoundError as exc:
+        print(
+            "mysql-connector-python is required. Install it via: pip install mysql-connector-python",
+            file=sys.stderr,
+        )
+        raise SystemExit(1) from exc
+
+    connection = mysql.connector.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        autocommit=False,
+    )
+    try:
+        ensure_archive_tables(connection)
+        if args.command == "list":
+            print_terms(connection)
+            return 0
+
+        restore = args.command == "restore"
+        with connection.cursor() as cursor:
+            try:
+                closed = archive.is_closed(cursor, args.term_id)
+            except ValueError as exc:
+                print(f"[ERROR] {exc}", file=sys.stderr)
+                return 1
+        if not restore and not closed and not args.force:
+            print(
+                f"[ERROR] {args.term_id} has not ended yet (pass --force to archive it anyway)",
+                file=sys.stderr,
+            )
+            return 1
+
+        def progress(totals: dict) -> None:
+            print(
+                "  "
+                + ", ".join(f"{count} {table}" for table, count in totals.items())
+                + (" restored" if restore else " archived")
+            )
+
+        totals = archive.move_term(
+            connection, args.term_id, restore, args.chunk_size, progress
+        )
+    finally:
+        connection.close()
+
+    verb = "Restored" if restore else "Archived"
+    print(
+        f"{verb} {args.term_id}: {totals['Post']} posts, "
+        f"{totals['Comment']} comments, {totals['MatchRequest']} requests"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
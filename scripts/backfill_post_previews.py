@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from previews import make_preview  # noqa: E402
+
+ADD_COLUMN_SQL = (
+    "ALTER TABLE Post ADD COLUMN content_preview VARCHAR(160) NOT NULL DEFAULT '' "
+    "AFTER content"
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Add Post.content_preview if missing and (re)compute previews."
+    )
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help="Recompute every preview, not just empty ones (after changing make_preview)",
+    )
+    return parser.parse_args()
+
+
+def ensure_preview_column(connection) -> bool:
+    """Add Post.content_preview on databases created before it existed."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Post' "
+            "AND COLUMN_NAME = 'content_preview'"
+        )
+        if cursor.fetchone()[0]:
+            return False
+        cursor.execute(ADD_COLUMN_SQL)
+    return True
+
+
+def backfill_previews(connection, batch_size: int = 1000, recompute: bool = False) -> int:
+    """Fill Post.content_preview in post_id order, one commit per batch."""
+    select_sql = (
+        "SELECT post_id, content FROM Post WHERE post_id > %s"
+        + ("" if recompute else " AND content_preview = ''")
+        + " ORDER BY post_id LIMIT %s"
+    )
+    update_sql = "UPDATE Post SET content_preview = %s WHERE post_id = %s"
+
+    updated = 0
+    last_id = -1
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(select_sql, (last_id, batch_size))
+            rows = cursor.fetchall()
+        if not rows:
+            break
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                update_sql, [(make_preview(content), post_id) for post_id, content in rows]
+            )
+        connection.commit()
+        updated += len(rows)
+        last_id = rows[-1][0]
+    return updated
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        import mysql.connector
+    except ModuleNotFoundError as exc:
+        print(
+            "mysql-connector-python is required. Install it via: pip install mysql-connector-python",
+            file=sys.stderr,
+        )
+        raise SystemExit(1) from exc
+
+    connection = mysql.connector.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        autocommit=False,
+    )
+    try:
+        if ensure_preview_column(connection):
+            print("Added Post.content_preview")
+        updated = backfill_previews(connection, args.batch_size, args.all)
+    finally:
+        connection.close()
+
+    print(f"Updated previews for {updated} posts")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
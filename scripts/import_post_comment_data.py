@@ -1,9 +1,16 @@
 #!/usr/bin/env python3
 
 import csv
+import sys
+from pathlib import Path
+
 import mysql.connector
 from mysql.connector import Error
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from previews import make_preview  # noqa: E402
+
 DB_CONFIG = {
     "host": "34.172.159.62",
     "port": 3306,
@@ -36,6 +43,7 @@ def import_posts(cursor, conn, csv_file):
                 "team_id": int(row["team_id"]),
                 "title": row["title"][:128] if row["title"] else None,
                 "content": row["content"][:4000] if row["content"] else None,
+                "content_preview": make_preview(row["content"][:4000]),
                 "created_at": row["created_at"],
                 "updated_at": row["updated_at"],
             }
@@ -44,13 +52,15 @@ def import_posts(cursor, conn, csv_file):
     print(f"Total posts to insert: {len(posts)}")
 
     insert_query = """
-        INSERT INTO Post (post_id, user_id, team_id, title, content, created_at, updated_at)
-        VALUES (%(post_id)s, %(user_id)s, %(team_id)s, %(title)s, %(content)s, %(created_at)s, %(updated_at)s)
+        INSERT INTO Post (post_id, user_id, team_id, title, content, content_preview, created_at, updated_at)
+        VALUES (%(post_id)s, %(user_id)s, %(team_id)s, %(title)s, %(content)s, %(content_preview)s,
+                %(created_at)s, %(updated_at)s)
         ON DUPLICATE KEY UPDATE
             user_id = VALUES(user_id),
             team_id = VALUES(team_id),
             title = VALUES(title),
             content = VALUES(content),
+            content_preview = VALUES(content_preview),
             created_at = VALUES(created_at),
             updated_at = VALUES(updated_at)
     """
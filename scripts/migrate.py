@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+from migrations import Migration, Probe, discover
+
+CREATE_HISTORY_SQL = """
+CREATE TABLE IF NOT EXISTS SchemaMigration (
+    version     INT PRIMARY KEY,
+    name        VARCHAR(128) NOT NULL,
+    applied_at  TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    duration_ms INT NOT NULL DEFAULT 0
+)
+"""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Apply and verify the schema migrations in scripts/migrations/."
+    )
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument(
+        "command",
+        choices=["status", "up", "verify"],
+        help="status: list migrations; up: apply pending ones; "
+        "verify: re-check applied migrations and their plans",
+    )
+    parser.add_argument("--to", type=int, help="Stop after this version (up only)")
+    parser.add_argument(
+        "--strict",
+        action="store_true",
+        help="Fail when a probe's plan doesn't use the migration's index "
+        "(default: warn; small tables often don't)",
+    )
+    return parser.parse_args()
+
+
+def applied_versions(connection) -> dict:
+    with connection.cursor() as cursor:
+        cursor.execute(CREATE_HISTORY_SQL)
+        cursor.execute("SELECT version, applied_at FROM SchemaMigration")
+        return dict(cursor.fetchall())
+
+
+def explain_probe(connection, probe: Probe) -> dict | None:
+    """The plan row for ``probe.table``, or None if the query can't run yet."""
+    from mysql.connector import Error as MySQLError
+
+    with connection.cursor(dictionary=True) as cursor:
+        try:
+            params = ()
+            if probe.sample_sql:
+                cursor.execute(probe.sample_sql)
+                sample = cursor.fetchone()
+                if sample is None:
+                    return None
+                params = tuple(sample.values())
+            cursor.execute("EXPLAIN " + probe.sql, params)
+            plan = cursor.fetchall()
+        except MySQLError:
+            # e.g. the table this migration creates doesn't exist yet
+            return None
+    for row in plan:
+        if row.get("table") == probe.table:
+            return row
+    return None
+
+
+def describe(row: dict | None) -> str:
+    if row is None:
+        return "n/a"
+    return f"type={row['type']} key={row['key']} rows={row['rows']}"
+
+
+def check_probes(connection, migration: Migration, before: list | None, strict: bool) -> bool:
+    """Print each probe's plan (before -> after); False on a strict mismatch."""
+    ok = True
+    for index, probe in enumerate(migration.probes):
+        plan = explain_probe(connection, probe)
+        if before is None:
+            print(f"    plan {probe.table}: {describe(plan)}")
+        else:
+            print(f"    plan {probe.table}: {describe(before[index])} -> {describe(plan)}")
+        if plan is None or plan.get("key") == probe.expected_key:
+            continue
+        print(f"    [{'ERROR' if strict else 'WARN'}] expected key {probe.expected_key}")
+        if strict:
+            ok = False
+    return ok
+
+
+def migrate_up(connection, to: int | None = None, strict: bool = False) -> int:
+    """Apply pending migrations in order; returns how many were recorded."""
+    done = applied_versions(connection)
+    recorded = 0
+    for version, name, migration in discover():
+        if version in done or (to is not None and version > to):
+            continue
+        print(f"{version:04d} {name}: {migration.description}")
+        before = [explain_probe(connection, probe) for probe in migration.probes]
+
+        started = time.perf_counter()
+        if migration.is_applied(connection):
+            print("    already in the schema, recording only")
+        else:
+            migration.apply(connection)
+            if not migration.is_applied(connection):
+                raise RuntimeError(f"Migration {version:04d} did not apply")
+        duration_ms = int((time.perf_counter() - started) * 1000)
+
+        if not check_probes(connection, migration, before, strict):
+            raise RuntimeError(f"Migration {version:04d} failed its plan check")
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO SchemaMigration (version, name, duration_ms) VALUES (%s, %s, %s)",
+                (version, name, duration_ms),
+            )
+        connection.commit()
+        print(f"    done in {duration_ms} ms")
+        recorded += 1
+    return recorded
+
+
+def verify(connection, strict: bool) -> bool:
+    done = applied_versions(connection)
+    ok = True
+    for version, name, migration in discover():
+        if version not in done:
+            continue
+        if not migration.is_applied(connection):
+            print(f"[ERROR] {version:04d} {name} is recorded but missing from the schema")
+            ok = False
+            continue
+        print(f"{version:04d} {name}: ok")
+        ok = check_probes(connection, migration, None, strict) and ok
+    return ok
+
+
+def status(connection) -> None:
+    done = applied_versions(connection)
+    for version, name, migration in discover():
+        state = f"applied {done[version]}" if version in done else "pending"
+        print(f"{version:04d} {name:<40} {state}")
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        import mysql.connector
+    except ModuleNotFoundError as exc:
+        print(
+            "mysql-connector-python is required. Install it via: pip install mysql-connector-python",
+            file=sys.stderr,
+        )
+        raise SystemExit(1) from exc
+
+    connection = mysql.connector.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        autocommit=False,
+    )
+    try:
+        if args.command == "status":
+            status(connection)
+        elif args.command == "verify":
+            return 0 if verify(connection, args.strict) else 1
+        else:
+            try:
+                recorded = migrate_up(connection, args.to, args.strict)
+            except RuntimeError as exc:
+                print(f"[ERROR] {exc}", file=sys.stderr)
+                return 1
+            print(f"Applied {recorded} migrations")
+    finally:
+        connection.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,26 @@
+"""Post.content_preview for list endpoints, filled for existing posts."""
+
+import backfill_post_previews
+from migrations import Migration
+
+
+def is_applied(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.COLUMNS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'Post' "
+            "AND COLUMN_NAME = 'content_preview'"
+        )
+        return cursor.fetchone()[0] > 0
+
+
+def apply(connection) -> None:
+    backfill_post_previews.ensure_preview_column(connection)
+    backfill_post_previews.backfill_previews(connection)
+
+
+MIGRATION = Migration(
+    description="Add and backfill Post.content_preview",
+    is_applied=is_applied,
+    apply=apply,
+)
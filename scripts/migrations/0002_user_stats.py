@@ -0,0 +1,27 @@
+"""UserStats, the per-user profile counters (backend/user_stats.py)."""
+
+import rebuild_user_stats
+from migrations import Migration
+
+
+def is_applied(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'UserStats'"
+        )
+        return cursor.fetchone()[0] > 0
+
+
+def apply(connection) -> None:
+    rebuild_user_stats.ensure_stats_table(connection)
+    with connection.cursor() as cursor:
+        rebuild_user_stats.user_stats.rebuild(cursor)
+    connection.commit()
+
+
+MIGRATION = Migration(
+    description="Create and fill UserStats",
+    is_applied=is_applied,
+    apply=apply,
+)
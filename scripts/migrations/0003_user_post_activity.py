@@ -0,0 +1,36 @@
+"""UserPostActivity, the "my posts" feed (backend/user_activity.py)."""
+
+import rebuild_user_activity
+from migrations import Migration, Probe
+
+
+def is_applied(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'UserPostActivity'"
+        )
+        return cursor.fetchone()[0] > 0
+
+
+def apply(connection) -> None:
+    rebuild_user_activity.ensure_activity_table(connection)
+    with connection.cursor() as cursor:
+        rebuild_user_activity.user_activity.rebuild(cursor)
+    connection.commit()
+
+
+MIGRATION = Migration(
+    description="Create and fill UserPostActivity",
+    is_applied=is_applied,
+    apply=apply,
+    probes=[
+        Probe(
+            sql="SELECT a.post_id FROM UserPostActivity a WHERE a.user_id = %s "
+            "ORDER BY a.ts DESC, a.post_id DESC, a.interaction_type DESC LIMIT 50",
+            table="a",
+            expected_key="idx_activity_feed",
+            sample_sql="SELECT user_id FROM Post LIMIT 1",
+        )
+    ],
+)
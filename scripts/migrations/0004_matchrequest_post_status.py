@@ -0,0 +1,18 @@
+"""Pending-request counts per post (popular posts, delete_post, triggers)."""
+
+from migrations import Probe, index_migration
+
+MIGRATION = index_migration(
+    "MatchRequest",
+    "idx_matchrequest_post_status",
+    ["post_id", "status"],
+    probes=[
+        Probe(
+            sql="SELECT COUNT(*) FROM MatchRequest mr "
+            "WHERE mr.post_id = %s AND mr.status = 'pending'",
+            table="mr",
+            expected_key="idx_matchrequest_post_status",
+            sample_sql="SELECT post_id FROM MatchRequest WHERE post_id IS NOT NULL LIMIT 1",
+        )
+    ],
+)
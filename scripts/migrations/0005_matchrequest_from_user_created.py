@@ -0,0 +1,18 @@
+"""A user's sent requests, newest first (profile, /match-requests)."""
+
+from migrations import Probe, index_migration
+
+MIGRATION = index_migration(
+    "MatchRequest",
+    "idx_matchrequest_from_user_created",
+    ["from_user_id", "created_at"],
+    probes=[
+        Probe(
+            sql="SELECT mr.request_id, mr.status FROM MatchRequest mr "
+            "WHERE mr.from_user_id = %s ORDER BY mr.created_at DESC LIMIT 5",
+            table="mr",
+            expected_key="idx_matchrequest_from_user_created",
+            sample_sql="SELECT from_user_id FROM MatchRequest LIMIT 1",
+        )
+    ],
+)
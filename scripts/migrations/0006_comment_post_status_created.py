@@ -0,0 +1,19 @@
+"""A post's visible comments in thread order (GET /api/posts/{id}/comments)."""
+
+from migrations import Probe, index_migration
+
+MIGRATION = index_migration(
+    "Comment",
+    "idx_comment_post_status_created",
+    ["post_id", "status", "created_at"],
+    probes=[
+        Probe(
+            sql="SELECT c.comment_id FROM Comment c "
+            "WHERE c.post_id = %s AND (c.status IS NULL OR c.status != 'deleted') "
+            "ORDER BY c.created_at ASC, c.comment_id ASC",
+            table="c",
+            expected_key="idx_comment_post_status_created",
+            sample_sql="SELECT post_id FROM Comment LIMIT 1",
+        )
+    ],
+)
@@ -0,0 +1,18 @@
+"""A user's posts, newest first (received requests, profile)."""
+
+from migrations import Probe, index_migration
+
+MIGRATION = index_migration(
+    "Post",
+    "idx_post_user_created",
+    ["user_id", "created_at"],
+    probes=[
+        Probe(
+            sql="SELECT p.post_id FROM Post p WHERE p.user_id = %s "
+            "ORDER BY p.created_at DESC",
+            table="p",
+            expected_key="idx_post_user_created",
+            sample_sql="SELECT user_id FROM Post LIMIT 1",
+        )
+    ],
+)
@@ -0,0 +1,17 @@
+"""Open teams per course (home page, course stats)."""
+
+from migrations import Probe, index_migration
+
+MIGRATION = index_migration(
+    "Team",
+    "idx_team_course_status",
+    ["course_id", "status"],
+    probes=[
+        Probe(
+            sql="SELECT COUNT(*) FROM Team t WHERE t.course_id = %s AND t.status = 'open'",
+            table="t",
+            expected_key="idx_team_course_status",
+            sample_sql="SELECT course_id FROM Team LIMIT 1",
+        )
+    ],
+)
@@ -0,0 +1,18 @@
+"""Course search within a term in catalog order (GET /api/courses/search)."""
+
+from migrations import Probe, index_migration
+
+MIGRATION = index_migration(
+    "Course",
+    "idx_course_term_subject_number",
+    ["term_id", "subject", "number"],
+    probes=[
+        Probe(
+            sql="SELECT c.course_id, c.subject, c.number FROM Course c "
+            "WHERE c.term_id = %s ORDER BY c.subject, c.number",
+            table="c",
+            expected_key="idx_course_term_subject_number",
+            sample_sql="SELECT term_id FROM Course LIMIT 1",
+        )
+    ],
+)
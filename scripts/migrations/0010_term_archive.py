@@ -0,0 +1,29 @@
+"""Archive tables for closed terms (backend/archive.py)."""
+
+import archive_term
+from migrations import Migration
+
+
+def is_applied(connection) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME IN (%s, %s, %s, %s, %s)",
+            tuple(
+                archive_term.archive.archive_table(t)
+                for t in archive_term.archive.ARCHIVED_TABLES
+            )
+            + ("ArchivedTerm",),
+        )
+        return cursor.fetchone()[0] == len(archive_term.archive.ARCHIVED_TABLES) + 1
+
+
+def apply(connection) -> None:
+    archive_term.ensure_archive_tables(connection)
+
+
+MIGRATION = Migration(
+    description="Create the term archive tables",
+    is_applied=is_applied,
+    apply=apply,
+)
@@ -0,0 +1,87 @@
+"""Versioned schema migrations applied by scripts/migrate.py.
+
+Each ``NNNN_<name>.py`` module in this package defines ``MIGRATION``, an
+object with ``is_applied(connection)`` and ``apply(connection)``. Both must be
+safe to repeat: databases created from doc/src/create_table.sql already
+contain some of these changes, and the runner only records those.
+
+``probes`` are EXPLAIN checks the runner prints before and after applying,
+so an index migration shows the plan it was written to fix.
+"""
+
+from __future__ import annotations
+
+import importlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent
+
+
+@dataclass
+class Probe:
+    """A hot-path query and the index it should use once migrated.
+
+    ``sample_sql`` fetches one row of real values for the placeholders, so
+    the plan is taken against data that exists in the database.
+    """
+
+    sql: str
+    table: str
+    expected_key: str
+    sample_sql: Optional[str] = None
+
+
+@dataclass
+class Migration:
+    description: str
+    is_applied: Callable
+    apply: Callable
+    probes: List[Probe] = field(default_factory=list)
+
+
+def _index_exists(connection, table: str, name: str) -> bool:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT COUNT(*) FROM information_schema.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND INDEX_NAME = %s",
+            (table, name),
+        )
+        return cursor.fetchone()[0] > 0
+
+
+def index_migration(
+    table: str, name: str, columns: Sequence[str], probes: Sequence[Probe]
+) -> Migration:
+    """ADD INDEX built online: INPLACE, with reads and writes allowed throughout."""
+
+    def is_applied(connection) -> bool:
+        return _index_exists(connection, table, name)
+
+    def apply(connection) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {table} ADD INDEX {name} ({', '.join(columns)}), "
+                "ALGORITHM=INPLACE, LOCK=NONE"
+            )
+
+    return Migration(
+        description=f"Add index {name} on {table}({', '.join(columns)})",
+        is_applied=is_applied,
+        apply=apply,
+        probes=list(probes),
+    )
+
+
+def discover() -> List[Tuple[int, str, Migration]]:
+    """(version, name, migration) for every module, in version order."""
+    found = []
+    for path in sorted(MIGRATIONS_DIR.glob("[0-9][0-9][0-9][0-9]_*.py")):
+        module = importlib.import_module(f"{__name__}.{path.stem}")
+        version, _, name = path.stem.partition("_")
+        found.append((int(version), name, module.MIGRATION))
+    versions = [version for version, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"Duplicate migration versions in {MIGRATIONS_DIR}")
+    return found
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import argparse
+import gzip
+import sys
+from pathlib import Path
+
+COMPRESSIBLE_SUFFIXES = {".html", ".js", ".mjs", ".css", ".svg", ".json", ".map", ".txt"}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Write .gz/.br siblings for the built frontend assets."
+    )
+    parser.add_argument(
+        "dist",
+        type=Path,
+        nargs="?",
+        default=Path("frontend/dist"),
+        help="Build output directory (default: frontend/dist)",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=int,
+        default=512,
+        help="Skip files smaller than this many bytes (default: 512)",
+    )
+    return parser.parse_args()
+
+
+def write_if_smaller(path: Path, original: bytes, compressed: bytes) -> bool:
+    if len(compressed) >= len(original):
+        path.unlink(missing_ok=True)
+        return False
+    path.write_bytes(compressed)
+    return True
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        import brotli
+    except ModuleNotFoundError:
+        brotli = None
+        print("brotli is not installed; writing .gz files only (pip install brotli)")
+
+    if not args.dist.is_dir():
+        print(f"Build directory not found: {args.dist}", file=sys.stderr)
+        return 1
+
+    written = 0
+    for path in sorted(args.dist.rglob("*")):
+        if not path.is_file() or path.suffix not in COMPRESSIBLE_SUFFIXES:
+            continue
+        data = path.read_bytes()
+        if len(data) < args.min_size:
+            continue
+
+        # mtime=0 keeps the output byte-identical across builds
+        gz = gzip.compress(data, compresslevel=9, mtime=0)
+        written += write_if_smaller(path.with_name(path.name + ".gz"), data, gz)
+        if brotli is not None:
+            br = brotli.compress(data, quality=11)
+            written += write_if_smaller(path.with_name(path.name + ".br"), data, br)
+
+    print(f"Wrote {written} precompressed files under {args.dist}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import user_activity  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Create UserPostActivity if missing and rebuild it from Post and Comment."
+    )
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--user-id", type=int, help="Only this user (default: everyone)")
+    return parser.parse_args()
+
+
+def ensure_activity_table(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(user_activity.CREATE_TABLE_SQL)
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        import mysql.connector
+    except ModuleNotFoundError as exc:
+        print(
+            "mysql-connector-python is required. Install it via: pip install mysql-connector-python",
+            file=sys.stderr,
+        )
+        raise SystemExit(1) from exc
+
+    connection = mysql.connector.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        autocommit=False,
+    )
+    try:
+        ensure_activity_table(connection)
+        with connection.cursor() as cursor:
+            # delete + insert in one transaction: readers see the old feed
+            # until the commit
+            user_activity.rebuild(cursor, args.user_id)
+            rows = cursor.rowcount
+        connection.commit()
+    finally:
+        connection.close()
+
+    print(f"Wrote {rows} activity rows")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+import user_stats  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Create UserStats if missing and rebuild (or verify) the counters."
+    )
+    parser.add_argument("--host", required=True)
+    parser.add_argument("--port", type=int, default=3306)
+    parser.add_argument("--user", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--database", required=True)
+    parser.add_argument("--user-id", type=int, help="Only this user (default: everyone)")
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Compare stored counters with a fresh computation instead of rebuilding; "
+        "exits 1 if any row drifted",
+    )
+    return parser.parse_args()
+
+
+def find_drift(connection, user_id: int | None = None) -> list[tuple[int, str, int, int]]:
+    """(user_id, column, stored, expected) for every counter that disagrees."""
+    with connection.cursor(dictionary=True) as cursor:
+        user_stats.compute(cursor, user_id)
+        expected = {row["user_id"]: row for row in cursor.fetchall()}
+        cursor.execute(
+            f"SELECT user_id, {', '.join(user_stats.STATS_COLUMNS)} FROM UserStats"
+            + ("" if user_id is None else " WHERE user_id = %s"),
+            () if user_id is None else (user_id,),
+        )
+        stored = {row["user_id"]: row for row in cursor.fetchall()}
+
+    drift = []
+    for uid, row in sorted(expected.items()):
+        current = stored.get(uid)
+        if current is None:
+            # rebuilt lazily on the next profile read, not drift
+            continue
+        for column in user_stats.STATS_COLUMNS:
+            if int(current[column]) != int(row[column]):
+                drift.append((uid, column, int(current[column]), int(row[column])))
+    return drift
+
+
+def ensure_stats_table(connection) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(user_stats.CREATE_TABLE_SQL)
+
+
+def main() -> int:
+    args = parse_args()
+
+    try:
+        import mysql.connector
+    except ModuleNotFoundError as exc:
+        print(
+            "mysql-connector-python is required. Install it via: pip install mysql-connector-python",
+            file=sys.stderr,
+        )
+        raise SystemExit(1) from exc
+
+    connection = mysql.connector.connect(
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        database=args.database,
+        autocommit=False,
+    )
+    try:
+        ensure_stats_table(connection)
+        if args.verify:
+            drift = find_drift(connection, args.user_id)
+            for uid, column, stored, expected in drift:
+                print(f"user {uid}: {column} is {stored}, expected {expected}")
+            print(f"{len(drift)} drifted counters")
+            return 1 if drift else 0
+
+        with connection.cursor() as cursor:
+            user_stats.rebuild(cursor, args.user_id)
+        connection.commit()
+    finally:
+        connection.close()
+
+    print("Rebuilt UserStats" + ("" if args.user_id is None else f" for user {args.user_id}"))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,6 +5,10 @@ import csv
 import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
+
+from previews import make_preview  # noqa: E402
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser()
@@ -65,12 +69,15 @@ def main() -> int:
         if team_id not in team_ids:
             skipped.append((row["post_id"], team_id, "team missing"))
             continue
+        row["content_preview"] = make_preview(row["content"])
         valid_rows.append(row)
 
     upsert_sql = (
-        "INSERT INTO Post (post_id, user_id, team_id, title, content, created_at, updated_at) "
-        "VALUES (%(post_id)s, %(user_id)s, %(team_id)s, %(title)s, %(content)s, %(created_at)s, %(updated_at)s) "
+        "INSERT INTO Post (post_id, user_id, team_id, title, content, content_preview, created_at, updated_at) "
+        "VALUES (%(post_id)s, %(user_id)s, %(team_id)s, %(title)s, %(content)s, %(content_preview)s, "
+        "%(created_at)s, %(updated_at)s) "
         "ON DUPLICATE KEY UPDATE title = VALUES(title), content = VALUES(content), "
+        "content_preview = VALUES(content_preview), "
         "created_at = VALUES(created_at), updated_at = VALUES(updated_at)"
     )
 
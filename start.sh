@@ -11,6 +11,11 @@ NC='\033[0m' # No Color
 BACKEND_DIR="backend"
 FRONTEND_DIR="frontend"
 BACKEND_PORT=8000
+# backend worker processes (backend/config.py WEB_WORKERS)
+BACKEND_WORKERS="${WEB_WORKERS:-1}"
+# local development: without a JWT_SECRET, sign sessions with the public dev
+# key (backend/config.py) instead of disabling sign-in
+export JWT_ALLOW_DEV_SECRET="${JWT_ALLOW_DEV_SECRET:-true}"
 FRONTEND_PORT=3000
 BACKEND_URL="http://localhost:${BACKEND_PORT}"
 FRONTEND_URL="http://localhost:${FRONTEND_PORT}"
@@ -156,9 +161,9 @@ if [ ! -d "node_modules" ]; then
 fi
 cd ..
 
-print_info "Starting backend server on port $BACKEND_PORT..."
+print_info "Starting backend server on port $BACKEND_PORT ($BACKEND_WORKERS worker(s))..."
 cd "$BACKEND_DIR"
-python main.py > "$BACKEND_LOG" 2>&1 &
+WEB_WORKERS="$BACKEND_WORKERS" python main.py > "$BACKEND_LOG" 2>&1 &
 BACKEND_PID=$!
 echo $BACKEND_PID > "$BACKEND_PID_FILE"
 cd ..